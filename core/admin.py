@@ -1,14 +1,18 @@
 from django.contrib import admin
-from .models import Cattle, Insemination, BirthRecord, Alert, Farm, TreatmentRecord, VaccinationRecord, PeriodicVaccinationRecord, PeriodicTreatmentRecord
+from .models import Cattle, Insemination, BirthRecord, BirthRecordCalf, Alert, Farm, TreatmentRecord, VaccinationRecord, PeriodicVaccinationRecord, PeriodicTreatmentRecord, HerdSummary, CollectionTombstone, OutboundEmail
 
 admin.site.register(Cattle)
 admin.site.register(Insemination)
 admin.site.register(BirthRecord)
+admin.site.register(BirthRecordCalf)
 admin.site.register(Alert)
 admin.site.register(Farm)
 admin.site.register(TreatmentRecord)
 admin.site.register(VaccinationRecord)
 admin.site.register(PeriodicVaccinationRecord)
-admin.site.register(PeriodicTreatmentRecord)    
+admin.site.register(PeriodicTreatmentRecord)
+admin.site.register(HerdSummary)
+admin.site.register(CollectionTombstone)
+admin.site.register(OutboundEmail)
 
 # Register your models here.
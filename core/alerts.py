@@ -0,0 +1,171 @@
+"""
+Farm-wide alert sweep.
+
+Every rule selects the animals or records it applies to with one date-range
+query for the whole farm and yields unsaved Alert rows. Each alert's dedup key
+is built from its rule, animal, source and due date, so a sweep only upserts
+alerts that do not exist yet and can run as often as needed. The cost is a
+fixed number of queries per farm, whatever the herd size.
+"""
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Alert, Cattle, Farm, PeriodicTreatmentRecord, PeriodicVaccinationRecord
+
+# 15 to 18 months of age inclusive, with months counted as days // 30
+HEIFER_BREEDING_AGE_DAYS = (15 * 30, 19 * 30 - 1)
+# Matches Insemination.create_pregnancy_check_alert so both raise the same alert
+PREGNANCY_CHECK_DAYS = 21
+# How far ahead an alert is raised, and how long an overdue event keeps raising one
+LEAD_DAYS = {'pregnancy_check': 7, 'calving_due': 14, 'insemination_due': 14}
+OVERDUE_DAYS = 30
+
+
+def build_alert(cattle_id, rule, title, description, due_date, priority, alert_type='reproduction',
+                source_type='', source_id=''):
+    return Alert(
+        cattle_id=cattle_id,
+        rule=rule,
+        title=title,
+        description=description,
+        type=alert_type,
+        priority=priority,
+        due_date=due_date,
+        source_type=source_type,
+        source_id=str(source_id),
+    )
+
+
+def heifer_breeding_alerts(farm, herd, today):
+    youngest, oldest = HEIFER_BREEDING_AGE_DAYS
+    heifers = herd.filter(
+        life_stage='heifer',
+        birth_date__range=(today - timedelta(days=oldest), today - timedelta(days=youngest)),
+    )
+    for pk, ear_tag, birth_date in heifers.values_list('id', 'ear_tag_no', 'birth_date'):
+        yield build_alert(
+            pk, 'heifer_breeding', 'Heifer ready for breeding',
+            f"Heifer {ear_tag} is ready for first breeding.", birth_date + timedelta(days=youngest), 'medium',
+        )
+
+
+def pregnancy_check_alerts(farm, herd, today):
+    latest = today - timedelta(days=PREGNANCY_CHECK_DAYS - LEAD_DAYS['pregnancy_check'])
+    earliest = today - timedelta(days=PREGNANCY_CHECK_DAYS + OVERDUE_DAYS)
+    for pk, ear_tag, inseminated in herd.filter(
+        last_insemination_date__range=(earliest, latest)
+    ).values_list('id', 'ear_tag_no', 'last_insemination_date'):
+        check_date = inseminated + timedelta(days=PREGNANCY_CHECK_DAYS)
+        yield build_alert(
+            pk, 'pregnancy_check', 'Pregnancy check due',
+            f"Pregnancy check due for {ear_tag} on {check_date}.", check_date, 'high',
+        )
+
+
+def calving_due_alerts(farm, herd, today):
+    for pk, ear_tag, expected in herd.filter(
+        gestation_status__in=['pregnant', 'calving'],
+        expected_calving_date__range=(
+            today - timedelta(days=OVERDUE_DAYS), today + timedelta(days=LEAD_DAYS['calving_due'])
+        ),
+    ).values_list('id', 'ear_tag_no', 'expected_calving_date'):
+        yield build_alert(
+            pk, 'calving_due', 'Calving due',
+            f"Cattle {ear_tag} is expected to calve on {expected}.", expected, 'high',
+        )
+
+
+def insemination_due_alerts(farm, herd, today):
+    for pk, ear_tag, expected in herd.filter(
+        gestation_status__in=Cattle.OPEN_GESTATION_STATUSES,
+        expected_insemination_date__range=(
+            today - timedelta(days=OVERDUE_DAYS), today + timedelta(days=LEAD_DAYS['insemination_due'])
+        ),
+    ).values_list('id', 'ear_tag_no', 'expected_insemination_date'):
+        yield build_alert(
+            pk, 'insemination_due', 'Insemination due',
+            f"Next insemination recommended around {expected} for {ear_tag}.", expected, 'medium',
+        )
+
+
+def periodic_alerts(model, name_field, date_field, rule_name, title, alert_type):
+    """
+    Rule for periodic records due within the last OVERDUE_DAYS; farm-wide
+    records alert every animal in the herd. ``records`` restricts it to given records, e.g. one just saved.
+    """
+    def rule(farm, herd, today, records=None):
+        if records is None:
+            records = model.objects.filter(
+                Q(cattle__in=herd) | Q(is_farm_wide=True, veterinarian__farm=farm),
+                **{f'{date_field}__range': (today - timedelta(days=OVERDUE_DAYS), today)},
+            ).values_list('id', 'cattle_id', 'is_farm_wide', name_field, date_field)
+        else:
+            records = [
+                (record.pk, record.cattle_id, record.is_farm_wide, getattr(record, name_field), getattr(record, date_field))
+                for record in records
+            ]
+
+        animals = None
+        for pk, cattle_id, farm_wide, name, due_date in records:
+            if farm_wide:
+                if animals is None:
+                    animals = list(herd.values_list('id', 'ear_tag_no'))
+                targets = animals
+                description = f"Farm-wide {title.lower()} '{name}' due on {due_date}."
+            else:
+                targets = [(cattle_id, None)]
+                description = None
+            for target_id, _ in targets:
+                yield build_alert(
+                    target_id, rule_name, title,
+                    description or f"{title} '{name}' due on {due_date}.", due_date, 'high', alert_type,
+                    source_type=model._meta.model_name, source_id=pk,
+                )
+    return rule
+
+
+ALERT_RULES = {
+    'heifer_breeding': heifer_breeding_alerts,
+    'pregnancy_check': pregnancy_check_alerts,
+    'calving_due': calving_due_alerts,
+    'insemination_due': insemination_due_alerts,
+    'periodic_vaccination': periodic_alerts(
+        PeriodicVaccinationRecord, 'vaccination_name', 'next_vaccination_date',
+        'periodic_vaccination', 'Periodic vaccination', 'health',
+    ),
+    'periodic_treatment': periodic_alerts(
+        PeriodicTreatmentRecord, 'treatment_name', 'next_treatment_date',
+        'periodic_treatment', 'Periodic treatment', 'health',
+    ),
+}
+
+
+def sweep_alerts(farm, today=None, herd=None):
+    """
+    Evaluate every rule for ``farm`` (or only the ``herd`` queryset of its
+    cattle) and create the alerts that do not exist yet. Returns the new alerts.
+    """
+    today = today or timezone.now().date()
+    if herd is None:
+        herd = Cattle.objects.filter(farm=farm)
+
+    candidates = {}
+    for rule in ALERT_RULES.values():
+        for alert in rule(farm, herd, today):
+            alert.farm_id = farm.pk
+            candidates.setdefault(alert.assign_dedup_key(), alert)
+    if not candidates:
+        return []
+
+    # Alerts already raised keep their read state and timestamps untouched
+    existing = set(Alert.objects.filter(
+        farm=farm, cattle__in=herd, rule__in=ALERT_RULES
+    ).values_list('dedup_key', flat=True))
+    return Alert.upsert([alert for key, alert in candidates.items() if key not in existing])
+
+
+def sweep_all_farms(today=None):
+    """Run the sweep for every farm; returns {farm_id: alerts created}."""
+    return {farm.pk: len(sweep_alerts(farm, today)) for farm in Farm.objects.all()}
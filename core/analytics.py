@@ -0,0 +1,183 @@
+"""
+Farm-level reproductive KPIs computed from Insemination, BirthRecord and
+Cattle columns.
+
+The columns of a farm are read once with values_list (three queries) and
+grouped per cow in memory; every KPI is then a linear pass over those sorted
+per-cow event lists instead of per-animal queries. The grouped data is kept
+per process until one of the three tables changes for the farm, and results
+are memoised per filter on top of it.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from statistics import mean, median
+
+from .conditional import FarmCache
+from .models import BirthRecord, Cattle, Insemination
+
+# Days after calving before a cow is expected to be served again
+VOLUNTARY_WAITING_PERIOD = 50
+CYCLE_LENGTH = 21
+MAX_CACHED_RESULTS = 64
+# The per-cycle pregnancy rate walks every 21-day cycle of the range in memory
+MAX_RANGE_DAYS = 3 * 366
+
+
+def service_outcome(insemination_status, pregnancy_check_status):
+    """True if the service conceived, False if it failed, None while unknown."""
+    if insemination_status == 'successful' or pregnancy_check_status == 'confirmed':
+        return True
+    if insemination_status == 'failed' or pregnancy_check_status == 'negative':
+        return False
+    return None
+
+
+def percentage(part, whole):
+    return round(100 * part / whole, 1) if whole else None
+
+
+def summarize(days):
+    return {
+        'count': len(days),
+        'mean': round(mean(days), 1) if days else None,
+        'median': median(days) if days else None,
+    }
+
+
+class ReproductionData:
+    def __init__(self, cattle, inseminations, births):
+        """
+        ``cattle`` is an iterable of (id, breed), ``inseminations`` of
+        (cattle_id, date, method, status, pregnancy_check_status) and
+        ``births`` of (cattle_id, calving_date).
+        """
+        self.breeds = {pk: (breed or '').lower() for pk, breed in cattle}
+        self.calvings = defaultdict(list)
+        for cattle_id, calving_date in births:
+            self.calvings[cattle_id].append(calving_date)
+        self.services = defaultdict(list)
+        for cattle_id, service_date, method, service_status, check_status in inseminations:
+            self.services[cattle_id].append((service_date, method, service_outcome(service_status, check_status)))
+        for dates in self.calvings.values():
+            dates.sort()
+        for services in self.services.values():
+            services.sort(key=lambda service: service[0])
+        self._results = {}
+
+    @classmethod
+    def build(cls, farm):
+        return cls(
+            Cattle.objects.filter(farm=farm).values_list('id', 'breed'),
+            Insemination.objects.filter(cattle__farm=farm).values_list(
+                'cattle_id', 'insemination_date', 'insemination_method',
+                'insemination_status', 'pregnancy_check_status'
+            ),
+            BirthRecord.objects.filter(cattle__farm=farm).values_list('cattle_id', 'calving_date'),
+        )
+
+    @classmethod
+    def for_farm(cls, farm):
+        """Return the farm's data, re-reading it only when the source tables changed."""
+        return _data.get(farm)
+
+    def kpis(self, date_from, date_to, breed=None):
+        key = (date_from, date_to, (breed or '').lower())
+        if key not in self._results:
+            if len(self._results) >= MAX_CACHED_RESULTS:
+                self._results.clear()
+            self._results[key] = self._compute(*key)
+        return self._results[key]
+
+    def _compute(self, date_from, date_to, breed):
+        cows = [pk for pk, cow_breed in self.breeds.items() if not breed or cow_breed == breed]
+        cycles = []
+        start = date_from
+        while start + timedelta(days=CYCLE_LENGTH - 1) <= date_to:
+            cycles.append({'start': start, 'eligible': 0, 'inseminated': 0, 'pregnant': 0})
+            start += timedelta(days=CYCLE_LENGTH)
+
+        by_method = defaultdict(lambda: {'services': 0, 'conceptions': 0})
+        services_total = conceptions_total = 0
+        first_service_days = []
+        open_days = []
+
+        for pk in cows:
+            calvings = self.calvings.get(pk, [])
+            services = self.services.get(pk, [])
+            service_dates = [service[0] for service in services]
+
+            lo = bisect_left(service_dates, date_from)
+            hi = bisect_right(service_dates, date_to)
+            for _, method, conceived in services[lo:hi]:
+                if conceived is None:
+                    continue
+                by_method[method]['services'] += 1
+                by_method[method]['conceptions'] += conceived
+                services_total += 1
+                conceptions_total += conceived
+
+            for index, calving in enumerate(calvings):
+                if not date_from <= calving <= date_to:
+                    continue
+                next_calving = calvings[index + 1] if index + 1 < len(calvings) else None
+                lactation = services[bisect_right(service_dates, calving):]
+                lactation = [s for s in lactation if next_calving is None or s[0] < next_calving]
+                if lactation:
+                    first_service_days.append((lactation[0][0] - calving).days)
+                conception = next((s for s in lactation if s[2]), None)
+                if conception:
+                    open_days.append((conception[0] - calving).days)
+
+            if not calvings:
+                # Heat detection and pregnancy rates cover cows that have calved
+                continue
+            for cycle in cycles:
+                cycle_start = cycle['start']
+                cycle_end = cycle_start + timedelta(days=CYCLE_LENGTH)
+                position = bisect_right(calvings, cycle_start - timedelta(days=VOLUNTARY_WAITING_PERIOD))
+                if not position:
+                    continue
+                last_calving = calvings[position - 1]
+                if calvings[position:] and calvings[position] <= cycle_start:
+                    continue  # calved again inside the waiting period
+                since_calving = services[bisect_right(service_dates, last_calving):bisect_left(service_dates, cycle_start)]
+                if any(conceived for _, _, conceived in since_calving):
+                    continue  # already pregnant
+                in_cycle = services[bisect_left(service_dates, cycle_start):bisect_left(service_dates, cycle_end)]
+                cycle['eligible'] += 1
+                cycle['inseminated'] += bool(in_cycle)
+                cycle['pregnant'] += any(conceived for _, _, conceived in in_cycle)
+
+        eligible = sum(cycle['eligible'] for cycle in cycles)
+        return {
+            'date_from': date_from,
+            'date_to': date_to,
+            'breed': breed or None,
+            'cattle': len(cows),
+            'days_open': summarize(open_days),
+            'calving_to_first_service': summarize(first_service_days),
+            'services_per_conception': round(services_total / conceptions_total, 2) if conceptions_total else None,
+            'conception_rate': percentage(conceptions_total, services_total),
+            'conception_rate_by_method': {
+                method: {**counts, 'rate': percentage(counts['conceptions'], counts['services'])}
+                for method, counts in sorted(by_method.items())
+            },
+            'heat_detection_rate': percentage(sum(cycle['inseminated'] for cycle in cycles), eligible),
+            'pregnancy_rate': percentage(sum(cycle['pregnant'] for cycle in cycles), eligible),
+            'cycles': [
+                {
+                    **cycle,
+                    'heat_detection_rate': percentage(cycle['inseminated'], cycle['eligible']),
+                    'pregnancy_rate': percentage(cycle['pregnant'], cycle['eligible']),
+                }
+                for cycle in cycles
+            ],
+        }
+
+
+_data = FarmCache(['cattle', 'inseminations', 'birth_records'], ReproductionData.build)
+
+
+def reproduction_kpis(farm, date_from, date_to, breed=None):
+    return ReproductionData.for_farm(farm).kpis(date_from, date_to, breed)
@@ -0,0 +1,45 @@
+"""
+Token authentication from the query string.
+
+Clients that cannot set an Authorization header (WebSockets, calendar apps
+subscribing to the iCal feed) pass their API token as ?token=. Both JWT
+access tokens and DRF tokens are accepted; long-lived subscriptions should
+use the DRF token, since JWT access tokens expire.
+"""
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+def user_for_token(token):
+    """Return the active user a JWT or DRF token belongs to, or AnonymousUser."""
+    from rest_framework.authtoken.models import Token
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    authentication = JWTAuthentication()
+    try:
+        user = authentication.get_user(authentication.get_validated_token(token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        try:
+            user = Token.objects.select_related('user').get(key=token).user
+        except Token.DoesNotExist:
+            return AnonymousUser()
+    # A deactivated account keeps its tokens until they are deleted
+    return user if user.is_active else AnonymousUser()
+
+
+class QueryTokenAuthentication(BaseAuthentication):
+    """DRF authentication from ?token=; requests without one fall through."""
+
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        user = user_for_token(token)
+        if not user.is_authenticated:
+            raise AuthenticationFailed('Invalid token')
+        return user, token
+
+    def authenticate_header(self, request):
+        return 'Token'
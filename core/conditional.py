@@ -0,0 +1,101 @@
+"""
+Conditional GET (ETag / Last-Modified) for farm-scoped list endpoints.
+
+A collection's validator is its row count plus Max('updated_at'), combined
+with the last delete recorded in CollectionTombstone. It costs one aggregate
+query per collection, so an unchanged list is answered with 304 before
+anything is serialized.
+"""
+import hashlib
+from collections import OrderedDict
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import Alert, BirthRecord, Cattle, CollectionTombstone, Insemination
+
+COLLECTIONS = {
+    'cattle': lambda farm: Cattle.objects.filter(farm=farm),
+    'alerts': lambda farm: Alert.objects.filter(farm=farm),
+    'birth_records': lambda farm: BirthRecord.objects.filter(cattle__farm=farm),
+    'inseminations': lambda farm: Insemination.objects.filter(cattle__farm=farm),
+}
+
+
+def collection_validators(farm, collections):
+    """Return (etag, last_modified) for the given collections of a farm."""
+    parts = [str(farm.pk)]
+    latest = []
+    for name in collections:
+        stats = COLLECTIONS[name](farm).order_by().aggregate(count=Count('id'), latest=Max('updated_at'))
+        parts.append(f"{name}:{stats['count']}:{stats['latest'].isoformat() if stats['latest'] else ''}")
+        if stats['latest']:
+            latest.append(stats['latest'])
+
+    for tombstone in CollectionTombstone.objects.filter(farm=farm, collection__in=collections).order_by('collection'):
+        parts.append(f"deleted:{tombstone.collection}:{tombstone.deleted_at.isoformat()}")
+        latest.append(tombstone.deleted_at)
+
+    etag = '"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+    last_modified = int(max(latest).timestamp()) if latest else None
+    return etag, last_modified
+
+
+class FarmCache:
+    """
+    Per-process cache of objects derived from a farm's collections (e.g. an
+    in-memory index). Each lookup costs one validator query; the object is
+    rebuilt with ``build(farm)`` only when the collections have changed.
+    """
+    def __init__(self, collections, build, max_farms=32):
+        self.collections = collections
+        self.build = build
+        self.max_farms = max_farms
+        self._entries = OrderedDict()
+
+    def get(self, farm):
+        version, _ = collection_validators(farm, self.collections)
+        cached = self._entries.get(farm.pk)
+        if cached and cached[0] == version:
+            self._entries.move_to_end(farm.pk)
+            return cached[1]
+
+        value = self.build(farm)
+        self._entries[farm.pk] = (version, value)
+        self._entries.move_to_end(farm.pk)
+        while len(self._entries) > self.max_farms:
+            self._entries.popitem(last=False)
+        return value
+
+
+def conditional_collection(*collections):
+    """
+    Answer If-None-Match / If-Modified-Since for a list view from the farm's
+    ``collections``. Must sit below @api_view/@permission_classes so the
+    request is already authenticated. ``collections`` must include every
+    model the response serializes (e.g. nested cattle details).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            farm = getattr(request.user, 'farm', None)
+            if request.method not in ('GET', 'HEAD') or farm is None:
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = collection_validators(farm, collections)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified)
+            # Per-user data: browsers may keep it but must revalidate every time
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,37 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .models import Alert
+from .realtime import alert_group
+
+
+class AlertConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes the user's farm alerts as they are created:
+    {"type": "alerts", "alerts": [...], "unread_count": n}.
+    The current unread count is sent right after connecting.
+    """
+    group_name = None
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated or not user.farm_id:
+            await self.close(code=4401)
+            return
+
+        self.group_name = alert_group(user.farm_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        count = await database_sync_to_async(Alert.unread_count)(user.farm_id)
+        await self.send_json({'type': 'unread_count', 'unread_count': count})
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def alerts_created(self, event):
+        await self.send_json({
+            'type': 'alerts',
+            'alerts': event['alerts'],
+            'unread_count': event['unread_count'],
+        })
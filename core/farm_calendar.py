@@ -0,0 +1,184 @@
+"""
+Farm event calendar.
+
+Upcoming work lives in several tables: gestation milestones and checks,
+expected calving and insemination dates on cattle, and the next dates of
+periodic vaccinations and treatments. Each source is read with one date-range
+query ordered by its date column (served by the indexes on those columns) and
+the sorted streams are combined with a k-way heapq.merge, so events come out
+in date order without loading and sorting everything in memory. The same
+stream feeds the JSON endpoint and the iCal feed.
+"""
+import heapq
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Cattle, GestationCheck, GestationMilestone, PeriodicTreatmentRecord, PeriodicVaccinationRecord
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+ICAL_PAST_DAYS = 30
+ICAL_FUTURE_DAYS = MAX_RANGE_DAYS - ICAL_PAST_DAYS
+ICAL_LINE_OCTETS = 75
+MILESTONE_NAMES = dict(GestationMilestone.MILESTONE_TYPES)
+
+
+def parse_range(params, days_before=0, days_after=DEFAULT_RANGE_DAYS):
+    """
+    Read from / to (YYYY-MM-DD) from query params, defaulting to the given
+    window around today. Raises ValueError with a message for the client.
+    """
+    today = timezone.now().date()
+    try:
+        date_from = params.get('from')
+        date_from = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else today - timedelta(days=days_before)
+        date_to = params.get('to')
+        date_to = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else date_from + timedelta(days=days_before + days_after)
+    except ValueError:
+        raise ValueError('Dates must be in YYYY-MM-DD format')
+    if date_from > date_to:
+        raise ValueError("'from' must not be after 'to'")
+    if (date_to - date_from).days > MAX_RANGE_DAYS:
+        raise ValueError(f'The range may span at most {MAX_RANGE_DAYS} days')
+    return date_from, date_to
+
+
+def event(date, event_type, title, description, cattle_id, ear_tag, source_type, source_id):
+    return {
+        'date': date,
+        'type': event_type,
+        'title': title,
+        'description': description,
+        'cattle_id': cattle_id,
+        'ear_tag_no': ear_tag,
+        'source_type': source_type,
+        'source_id': source_id,
+    }
+
+
+def milestone_events(farm, date_from, date_to):
+    milestones = GestationMilestone.objects.filter(
+        cattle__farm=farm, is_completed=False, due_date__range=(date_from, date_to)
+    ).order_by('due_date', 'id').values_list(
+        'id', 'cattle_id', 'cattle__ear_tag_no', 'milestone_type', 'description', 'due_date'
+    )
+    for pk, cattle_id, ear_tag, milestone_type, description, due_date in milestones.iterator():
+        name = MILESTONE_NAMES.get(milestone_type, milestone_type)
+        yield event(due_date, 'gestation_milestone', f"{name}: {ear_tag}", description,
+                    cattle_id, ear_tag, 'gestationmilestone', pk)
+
+
+def check_events(farm, date_from, date_to):
+    checks = GestationCheck.objects.filter(
+        cattle__farm=farm, check_date__range=(date_from, date_to)
+    ).order_by('check_date', 'id').values_list(
+        'id', 'cattle_id', 'cattle__ear_tag_no', 'gestation_week', 'health_status', 'check_date'
+    )
+    for pk, cattle_id, ear_tag, week, health_status, check_date in checks.iterator():
+        yield event(check_date, 'gestation_check', f"Gestation check (week {week}): {ear_tag}",
+                    f"Health status: {health_status}", cattle_id, ear_tag, 'gestationcheck', pk)
+
+
+def calving_events(farm, date_from, date_to):
+    cattle = Cattle.objects.filter(
+        farm=farm,
+        gestation_status__in=['pregnant', 'calving'],
+        expected_calving_date__range=(date_from, date_to),
+    ).order_by('expected_calving_date', 'id').values_list('id', 'ear_tag_no', 'expected_calving_date')
+    for pk, ear_tag, expected in cattle.iterator():
+        yield event(expected, 'expected_calving', f"Expected calving: {ear_tag}",
+                    f"Cattle {ear_tag} is expected to calve.", pk, ear_tag, 'cattle', pk)
+
+
+def insemination_events(farm, date_from, date_to):
+    cattle = Cattle.objects.filter(
+        farm=farm,
+        gestation_status__in=Cattle.OPEN_GESTATION_STATUSES,
+        expected_insemination_date__range=(date_from, date_to),
+    ).order_by('expected_insemination_date', 'id').values_list('id', 'ear_tag_no', 'expected_insemination_date')
+    for pk, ear_tag, expected in cattle.iterator():
+        yield event(expected, 'expected_insemination', f"Insemination due: {ear_tag}",
+                    f"Next insemination recommended for {ear_tag}.", pk, ear_tag, 'cattle', pk)
+
+
+def periodic_events(model, name_field, date_field, event_type, label):
+    """Source for periodic records; farm-wide records are one event without cattle."""
+    def source(farm, date_from, date_to):
+        records = model.objects.filter(
+            Q(cattle__farm=farm) | Q(is_farm_wide=True, veterinarian__farm=farm),
+            **{f'{date_field}__range': (date_from, date_to)},
+        ).order_by(date_field, 'id').values_list('id', 'cattle_id', 'cattle__ear_tag_no', 'is_farm_wide', name_field, date_field)
+        for pk, cattle_id, ear_tag, farm_wide, name, due_date in records.iterator():
+            target = 'Farm-wide' if farm_wide else ear_tag
+            yield event(due_date, event_type, f"{label} '{name}': {target}", f"{label} '{name}' due.",
+                        None if farm_wide else cattle_id, None if farm_wide else ear_tag,
+                        model._meta.model_name, pk)
+    return source
+
+
+EVENT_SOURCES = {
+    'gestation_milestone': milestone_events,
+    'gestation_check': check_events,
+    'expected_calving': calving_events,
+    'expected_insemination': insemination_events,
+    'periodic_vaccination': periodic_events(
+        PeriodicVaccinationRecord, 'vaccination_name', 'next_vaccination_date', 'periodic_vaccination', 'Vaccination',
+    ),
+    'periodic_treatment': periodic_events(
+        PeriodicTreatmentRecord, 'treatment_name', 'next_treatment_date', 'periodic_treatment', 'Treatment',
+    ),
+}
+
+
+def farm_events(farm, date_from, date_to, types=None):
+    """Events of the farm between the two dates (inclusive), in date order."""
+    sources = [
+        source(farm, date_from, date_to)
+        for name, source in EVENT_SOURCES.items() if not types or name in types
+    ]
+    return heapq.merge(*sources, key=lambda item: item['date'])
+
+
+def ical_escape(text):
+    return (
+        str(text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def ical_line(line):
+    """Fold a content line to 75 octets, without splitting UTF-8 characters."""
+    folded, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > ICAL_LINE_OCTETS:
+            folded.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    folded.append(current)
+    return '\r\n'.join(folded) + '\r\n'
+
+
+def ical_events(farm, events):
+    """Yield an iCalendar document for ``events`` one line at a time."""
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+    yield ical_line('BEGIN:VCALENDAR')
+    yield ical_line('VERSION:2.0')
+    yield ical_line('PRODID:-//MooLogic//Farm Calendar//EN')
+    yield ical_line('CALSCALE:GREGORIAN')
+    yield ical_line(f'X-WR-CALNAME:{ical_escape(farm.name)}')
+    for item in events:
+        day = item['date']
+        yield ical_line('BEGIN:VEVENT')
+        yield ical_line(f"UID:{item['type']}-{item['source_type']}-{item['source_id']}-{day:%Y%m%d}@moologic")
+        yield ical_line(f'DTSTAMP:{stamp}')
+        yield ical_line(f'DTSTART;VALUE=DATE:{day:%Y%m%d}')
+        yield ical_line(f'DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}')
+        yield ical_line(f"SUMMARY:{ical_escape(item['title'])}")
+        yield ical_line(f"DESCRIPTION:{ical_escape(item['description'])}")
+        yield ical_line(f"CATEGORIES:{item['type'].upper()}")
+        yield ical_line('END:VEVENT')
+    yield ical_line('END:VCALENDAR')
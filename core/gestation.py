@@ -0,0 +1,143 @@
+"""
+Cached gestation dashboard.
+
+The dashboard payload of a farm (pregnant cattle with milestones, checks,
+health records, unread alerts and precomputed Gantt data) is serialized once
+and stored in the cache together with the farm's dashboard version and the
+day it was built for. Saving or deleting any record it shows bumps the
+version once the change commits (see core.signals), and progress figures
+move with the date, so a payload is served only while both still match. An
+unchanged dashboard costs a single get_many on the cache.
+
+Version and payload must be seen by every worker, so payloads are only
+cached when the default cache is shared (Redis, see settings.CACHES); with
+the per-process cache each request builds the dashboard from the database.
+Photo URLs are stored relative and made absolute for each response.
+"""
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import Alert, Cattle
+
+PAYLOAD_TIMEOUT = 24 * 60 * 60
+
+
+def version_key(farm_id):
+    return f'gestation:version:{farm_id}'
+
+
+def payload_key(farm_id):
+    return f'gestation:payload:{farm_id}'
+
+
+def cache_is_shared():
+    """Whether a version bumped by one worker is seen by all the others."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def bump_version(*farm_ids):
+    """
+    Invalidate the cached dashboards of the given farms once the current
+    transaction commits, so a rebuild can't store data the change isn't in.
+    """
+    farm_ids = {farm_id for farm_id in farm_ids if farm_id}
+    if not farm_ids:
+        return
+
+    def bump():
+        for farm_id in farm_ids:
+            try:
+                cache.incr(version_key(farm_id))
+            except ValueError:
+                # No version yet, or it was evicted: start from a value never used before
+                cache.set(version_key(farm_id), time.time_ns(), None)
+            except Exception as e:
+                print(f"Error bumping gestation dashboard version for farm {farm_id}: {str(e)}")
+
+    transaction.on_commit(bump)
+
+
+def build_payload(farm):
+    """Dashboard payload of the farm, with photo URLs relative to the site."""
+    from .serializers import GestationDataSerializer
+
+    cattle = Cattle.objects.filter(
+        farm=farm,
+        gestation_status__in=['pregnant', 'calving']
+    ).prefetch_related(
+        'gestation_milestones',
+        'gestation_checks',
+        'treatment_records',
+        'vaccination_records',
+        'periodic_treatment_records',
+        'periodic_vaccination_records',
+        Prefetch('alerts', queryset=Alert.objects.filter(read=False), to_attr='unread_alerts'),
+    ).order_by('expected_calving_date')
+
+    gestation_data = [
+        {
+            'cattle': cow,
+            'treatment_records': cow.treatment_records.all(),
+            'vaccination_records': cow.vaccination_records.all(),
+            'periodic_treatment_records': cow.periodic_treatment_records.all(),
+            'periodic_vaccination_records': cow.periodic_vaccination_records.all(),
+            'alerts': cow.unread_alerts,
+        }
+        for cow in cattle
+    ]
+    serializer = GestationDataSerializer(gestation_data, many=True, context={})
+    return {"count": len(gestation_data), "results": list(serializer.data)}
+
+
+def with_absolute_urls(data, request):
+    """Copy of a payload with photo URLs made absolute for ``request``."""
+    if request is None:
+        return data
+
+    def absolute(url):
+        return request.build_absolute_uri(url) if url else url
+
+    return {
+        **data,
+        'results': [
+            {**item, 'cattle': {
+                **item['cattle'],
+                'photo': absolute(item['cattle'].get('photo')),
+                'photo_thumbnail': absolute(item['cattle'].get('photo_thumbnail')),
+            }}
+            for item in data['results']
+        ],
+    }
+
+
+def gestation_dashboard(farm, request=None):
+    """Return the farm's dashboard payload, rebuilding it only when stale."""
+    return with_absolute_urls(cached_payload(farm), request)
+
+
+def cached_payload(farm):
+    if not cache_is_shared():
+        return build_payload(farm)
+
+    today = timezone.now().date().isoformat()
+    cached = cache.get_many([version_key(farm.pk), payload_key(farm.pk)])
+    version = cached.get(version_key(farm.pk))
+    if version is None:
+        cache.add(version_key(farm.pk), time.time_ns(), None)
+        version = cache.get(version_key(farm.pk))
+
+    entry = cached.get(payload_key(farm.pk))
+    if entry and entry['version'] == version and entry['day'] == today:
+        return entry['data']
+
+    data = build_payload(farm)
+    # Stored under the version read before building: a change made meanwhile
+    # bumps the version and the next request rebuilds
+    cache.set(payload_key(farm.pk), {'version': version, 'day': today, 'data': data}, PAYLOAD_TIMEOUT)
+    return data
@@ -0,0 +1,136 @@
+"""
+Resized variants for uploaded photos (Cattle.photo, User.profile_picture).
+
+After an upload is committed the original is capped to MAX_ORIGINAL_SIZE and
+small WebP variants (JPEG where Pillow lacks WebP) are written next to it, on
+a background thread so the upload request does not wait for Pillow. The
+variant names are stored in a JSON field on the model together with the
+source file name, so stale variants of a replaced photo are never served.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .gestation import bump_version as bump_gestation_version
+from .models import Cattle
+
+MAX_ORIGINAL_SIZE = 2048
+VARIANT_SIZES = {
+    'thumbnail': 200,
+    'medium': 800,
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+
+
+def variant_format():
+    if features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def encode(image, image_format):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=82)
+    return ContentFile(buffer.getvalue())
+
+
+def replace_file(storage, name, content):
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def build_variants(field_file):
+    """
+    Cap the stored original and write every variant.
+    Returns (original_name, {variant: name}).
+    """
+    storage = field_file.storage
+    name = field_file.name
+    with storage.open(name, 'rb') as file:
+        image = Image.open(file)
+        original_format = image.format or 'JPEG'
+        image.load()
+    image = ImageOps.exif_transpose(image)
+
+    if max(image.size) > MAX_ORIGINAL_SIZE:
+        capped = image.copy()
+        capped.thumbnail((MAX_ORIGINAL_SIZE, MAX_ORIGINAL_SIZE), Image.LANCZOS)
+        name = replace_file(storage, name, encode(capped, original_format))
+
+    image_format, extension = variant_format()
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    for variant, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        variant_name = os.path.join(directory, 'variants', f"{stem}_{variant}.{extension}")
+        variants[variant] = replace_file(storage, variant_name, encode(resized, image_format))
+    return name, variants
+
+
+def generate_image_variants(model, pk, field_name, variants_field):
+    """Build variants for one row and store them unless the image was replaced meanwhile."""
+    instance = model.objects.filter(pk=pk).first()
+    field_file = getattr(instance, field_name, None)
+    if not field_file:
+        return None
+
+    source = field_file.name
+    previous = getattr(instance, variants_field) or {}
+    name, variants = build_variants(field_file)
+    changes = {field_name: name, variants_field: {'source': name, **variants}}
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        # Let conditional GETs see the new thumbnail
+        changes['updated_at'] = timezone.now()
+    updated = model.objects.filter(pk=pk, **{field_name: source}).update(**changes)
+    if updated and model is Cattle:
+        # update() skips post_save; the gestation dashboard shows cattle photos
+        bump_gestation_version(instance.farm_id)
+
+    # Drop variants of the photo this upload replaced
+    for variant, old_name in previous.items():
+        if variant != 'source' and old_name not in variants.values():
+            field_file.storage.delete(old_name)
+    return changes[variants_field]
+
+
+def _run_in_background(model, pk, field_name, variants_field):
+    try:
+        generate_image_variants(model, pk, field_name, variants_field)
+    except Exception as e:
+        print(f"Error generating image variants for {model.__name__} {pk}: {str(e)}")
+    finally:
+        # Worker threads get their own connection; don't leave it open
+        connection.close()
+
+
+def schedule_image_variants(instance, field_name, variants_field):
+    """Queue variant generation after commit if the image has none for its current file."""
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field) or {}
+    if not field_file or variants.get('source') == field_file.name:
+        return
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(
+        lambda: _executor.submit(_run_in_background, model, pk, field_name, variants_field)
+    )
+
+
+def variant_url(instance, field_name, variants_field, variant, request=None):
+    """URL of a variant, or None while it has not been generated for the current file."""
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field) or {}
+    if not field_file or variants.get('source') != field_file.name or variant not in variants:
+        return None
+    url = field_file.storage.url(variants[variant])
+    return request.build_absolute_uri(url) if request else url
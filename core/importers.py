@@ -0,0 +1,339 @@
+"""
+Streaming bulk import of cattle, milk and finance records from CSV/XLSX.
+
+Files are parsed row by row (csv module / openpyxl read-only mode) and handled
+in chunks: every chunk is validated as a batch, with one IN query per chunk
+for uniqueness and lookups, and its valid rows are written with bulk_create.
+The result is a report listing every rejected row with its errors.
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import serializers
+
+from finance_tracker.models import ExpenseRecord, IncomeRecord
+from milk_tracker.models import Milk_record
+from .gestation import bump_version as bump_gestation_version
+from .models import Cattle, GestationMilestone, HerdSummary
+from .serializers import CattleSerializer
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class CattleImportSerializer(CattleSerializer):
+    class Meta(CattleSerializer.Meta):
+        fields = [
+            'ear_tag_no', 'breed', 'birth_date', 'gender', 'life_stage',
+            'dam_id', 'sire_id', 'is_purchased', 'purchase_date', 'purchase_source',
+            'last_insemination_date', 'last_calving_date', 'expected_insemination_date',
+            'health_status', 'milking_frequency'
+        ]
+        extra_kwargs = {
+            # Uniqueness is checked once per chunk by CattleImporter
+            'ear_tag_no': {'validators': []},
+            'life_stage': {'required': False},
+        }
+
+
+class MilkRecordImportSerializer(serializers.Serializer):
+    ear_tag_no = serializers.CharField(max_length=50)
+    quantity = serializers.DecimalField(max_digits=6, decimal_places=2, min_value=0)
+    date = serializers.DateField(required=False)
+    shift = serializers.CharField(max_length=20)
+    time = serializers.TimeField(required=False)
+
+
+class FinanceRecordImportSerializer(serializers.Serializer):
+    category_name = serializers.CharField(max_length=50)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    description = serializers.CharField(required=False, allow_blank=True)
+    date = serializers.DateField(required=False)
+
+
+def normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def normalize_cell(value):
+    if isinstance(value, str):
+        return value.strip()
+    # openpyxl returns datetimes for date cells; date-only cells have no time part
+    if isinstance(value, datetime) and value.time() == datetime.min.time():
+        return value.date()
+    return value
+
+
+def iter_rows(file, filename):
+    """
+    Yield (row_number, data) for every non-empty row of a CSV or XLSX file.
+    Row numbers match the spreadsheet (the header is row 1).
+    """
+    name = filename.lower()
+    if name.endswith('.csv'):
+        reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    elif name.endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        reader = workbook.active.iter_rows(values_only=True)
+    else:
+        raise ValueError('Unsupported file type, upload a .csv or .xlsx file')
+
+    header = None
+    for row_number, row in enumerate(reader, start=1):
+        if header is None:
+            header = [normalize_header(cell) for cell in row]
+            continue
+        data = {
+            column: normalize_cell(cell)
+            for column, cell in zip(header, row)
+            if column and cell not in (None, '')
+        }
+        if data:
+            yield row_number, data
+
+
+class BaseImporter:
+    """
+    Validates and saves one chunk of rows at a time.
+
+    Subclasses set serializer_class and implement build_instances() (batch
+    checks that need the database) and save_chunk().
+    """
+    serializer_class = None
+
+    def __init__(self, farm, user):
+        self.farm = farm
+        self.user = user
+
+    def validate_rows(self, rows):
+        valid, errors = [], []
+        for row_number, data in rows:
+            serializer = self.serializer_class(data=data)
+            if serializer.is_valid():
+                valid.append((row_number, serializer.validated_data))
+            else:
+                errors.append({'row': row_number, 'errors': serializer.errors})
+        return valid, errors
+
+    def build_instances(self, valid):
+        raise NotImplementedError
+
+    def save_chunk(self, instances):
+        raise NotImplementedError
+
+    def finish(self):
+        """Hook run once after the last chunk has been saved."""
+
+
+class CattleImporter(BaseImporter):
+    serializer_class = CattleImportSerializer
+
+    def __init__(self, farm, user):
+        super().__init__(farm, user)
+        self.seen_tags = set()
+
+    def build_instances(self, valid):
+        tags = [data['ear_tag_no'] for _, data in valid]
+        taken = set(Cattle.objects.filter(ear_tag_no__in=tags).values_list('ear_tag_no', flat=True))
+
+        instances, errors = [], []
+        for row_number, data in valid:
+            ear_tag = data['ear_tag_no']
+            if ear_tag in taken or ear_tag in self.seen_tags:
+                errors.append({'row': row_number, 'errors': {'ear_tag_no': [f"Ear tag {ear_tag} is already in use"]}})
+                continue
+            self.seen_tags.add(ear_tag)
+
+            cattle = Cattle(farm=self.farm, **data)
+            if not cattle.life_stage:
+                cattle.life_stage = cattle.calculate_life_stage_value()
+            if not cattle.life_stage:
+                errors.append({'row': row_number, 'errors': {'life_stage': ['Provide life_stage or birth_date']}})
+                continue
+            if not cattle.expected_insemination_date:
+                cattle.expected_insemination_date = cattle.calculate_expected_insemination_date()
+            cattle.update_gestation_fields()
+            instances.append(cattle)
+        return instances, errors
+
+    def save_chunk(self, instances):
+        Cattle.objects.bulk_create(instances)
+        milestones = [
+            milestone
+            for cattle in instances if cattle.gestation_status == 'pregnant'
+            for milestone in cattle.build_gestation_milestones()
+        ]
+        GestationMilestone.objects.bulk_create(milestones)
+
+    def finish(self):
+        # bulk_create bypasses the signals that maintain the herd summary and
+        # invalidate the gestation dashboard
+        HerdSummary.rebuild(self.farm.id)
+        bump_gestation_version(self.farm.id)
+
+
+class MilkRecordImporter(BaseImporter):
+    serializer_class = MilkRecordImportSerializer
+
+    def __init__(self, farm, user):
+        super().__init__(farm, user)
+        self.seen_keys = set()
+        self.cattle_ids = set()
+
+    def build_instances(self, valid):
+        tags = {data['ear_tag_no'] for _, data in valid}
+        cattle_by_tag = {
+            cattle.ear_tag_no: cattle
+            for cattle in Cattle.objects.filter(farm=self.farm, ear_tag_no__in=tags)
+        }
+        today = timezone.now().date()
+        dates = {data.get('date', today) for _, data in valid}
+        existing = set(Milk_record.objects.filter(
+            cattle_tag__in=cattle_by_tag.values(),
+            date__in=dates
+        ).values_list('cattle_tag_id', 'date', 'shift'))
+
+        instances, errors = [], []
+        for row_number, data in valid:
+            cattle = cattle_by_tag.get(data['ear_tag_no'])
+            if cattle is None:
+                errors.append({'row': row_number, 'errors': {'ear_tag_no': ['Cattle not found or not in your farm']}})
+                continue
+            if not cattle.can_record_milk():
+                errors.append({'row': row_number, 'errors': {
+                    'ear_tag_no': ['Cannot record milk for this cattle - either dry or not lactating']
+                }})
+                continue
+            record_date = data.get('date', today)
+            key = (cattle.id, record_date, data['shift'])
+            if key in existing or key in self.seen_keys:
+                errors.append({'row': row_number, 'errors': {
+                    'shift': [f"Milk record already exists for {data['shift']} shift on {record_date}"]
+                }})
+                continue
+
+            record = Milk_record(
+                cattle_tag=cattle,
+                ear_tag_no=cattle.ear_tag_no,
+                quantity=data['quantity'],
+                date=record_date,
+                shift=data['shift'],
+            )
+            if 'time' in data:
+                record.time = data['time']
+            # Same schedule check Milk_record.clean() applies to API writes
+            try:
+                record.validate_milking_time()
+            except ValidationError as e:
+                errors.append({'row': row_number, 'errors': e.message_dict})
+                continue
+            self.seen_keys.add(key)
+            self.cattle_ids.add(cattle.id)
+            instances.append(record)
+        return instances, errors
+
+    def save_chunk(self, instances):
+        Milk_record.objects.bulk_create(instances)
+
+    def finish(self):
+        """Recompute 30-day average production once for every touched animal."""
+        if not self.cattle_ids:
+            return
+        since = timezone.now().date() - timedelta(days=30)
+        daily_totals = {}
+        for row in Milk_record.objects.filter(
+            cattle_tag_id__in=self.cattle_ids, date__gte=since
+        ).values('cattle_tag_id', 'date').annotate(daily_total=Sum('quantity')):
+            daily_totals.setdefault(row['cattle_tag_id'], []).append(row['daily_total'])
+
+        cattle = list(Cattle.objects.filter(id__in=daily_totals))
+        for animal in cattle:
+            totals = daily_totals[animal.id]
+            animal.avg_daily_milk = sum(totals) / len(totals)
+            animal.milking_frequency = Cattle.milking_frequency_for(animal.avg_daily_milk)
+        Cattle.objects.bulk_update(cattle, ['avg_daily_milk', 'milking_frequency'])
+
+
+class FinanceRecordImporter(BaseImporter):
+    serializer_class = FinanceRecordImportSerializer
+    model = None
+
+    def build_instances(self, valid):
+        instances = []
+        for _, data in valid:
+            record = self.model(
+                category_name=data['category_name'],
+                amount=data['amount'],
+                description=data.get('description'),
+                recorded_by=self.user,
+            )
+            record.import_date = data.get('date')
+            instances.append(record)
+        return instances, []
+
+    def save_chunk(self, instances):
+        self.model.objects.bulk_create(instances)
+        # date is auto_now_add, so historic dates are applied after the insert
+        dated = [record for record in instances if record.import_date and record.pk]
+        for record in dated:
+            record.date = record.import_date
+        self.model.objects.bulk_update(dated, ['date'])
+
+
+class IncomeRecordImporter(FinanceRecordImporter):
+    model = IncomeRecord
+
+
+class ExpenseRecordImporter(FinanceRecordImporter):
+    model = ExpenseRecord
+
+
+IMPORTERS = {
+    'cattle': CattleImporter,
+    'milk': MilkRecordImporter,
+    'income': IncomeRecordImporter,
+    'expense': ExpenseRecordImporter,
+}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_import(kind, file, filename, farm, user, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Import every row of ``file`` as records of ``kind``.
+
+    Each chunk is saved in its own transaction. Returns a report with the
+    number of rows read, valid and created plus per-row errors.
+    """
+    importer = IMPORTERS[kind](farm, user)
+    report = {'kind': kind, 'rows': 0, 'valid': 0, 'created': 0, 'errors': []}
+
+    for chunk in chunked(iter_rows(file, filename), chunk_size):
+        report['rows'] += len(chunk)
+        valid, errors = importer.validate_rows(chunk)
+        instances, batch_errors = importer.build_instances(valid)
+        report['errors'].extend(errors + batch_errors)
+        report['valid'] += len(instances)
+        if dry_run or not instances:
+            continue
+        with transaction.atomic():
+            importer.save_chunk(instances)
+        report['created'] += len(instances)
+
+    if not dry_run:
+        importer.finish()
+    report['errors'].sort(key=lambda error: error['row'])
+    return report
@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import AlertArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move alerts that were read more than --days ago (default "
+        "ALERT_RETENTION_DAYS) from the live alert table into the archive, "
+        "in batches. Intended to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Retention in days for read alerts')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Alerts moved per transaction')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.ALERT_RETENTION_DAYS
+        started = time.monotonic()
+        moved = AlertArchive.archive_read_alerts(days, batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} alert(s) read more than {days} day(s) ago in {elapsed:.2f}s"
+        ))
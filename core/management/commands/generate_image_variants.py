@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.images import generate_image_variants
+from core.models import Cattle
+from userauth.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Cap oversized cattle photos and profile pictures and generate their "
+        "resized variants. Only images without variants for their current file "
+        "are processed unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants for every image')
+
+    def handle(self, *args, **options):
+        targets = [
+            (Cattle, 'photo', 'photo_variants'),
+            (User, 'profile_picture', 'profile_picture_variants'),
+        ]
+        for model, field_name, variants_field in targets:
+            rows = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+            processed = failed = 0
+            for pk, name, variants in rows.values_list('pk', field_name, variants_field).iterator():
+                if not options['force'] and (variants or {}).get('source') == name:
+                    continue
+                try:
+                    generate_image_variants(model, pk, field_name, variants_field)
+                    processed += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: {e}")
+            self.stdout.write(f"{model.__name__}: {processed} image(s) processed, {failed} failed")
@@ -0,0 +1,51 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import DEFAULT_CHUNK_SIZE, IMPORTERS, run_import
+from core.models import Farm
+
+
+class Command(BaseCommand):
+    help = "Bulk import cattle, milk, income or expense records from a CSV/XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='Path to a .csv or .xlsx file')
+        parser.add_argument('--user', required=True, help='Email of the user recording the import')
+        parser.add_argument('--farm', type=int, help="Farm id (defaults to the user's farm)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows without saving')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        farm = user.farm
+        if options['farm']:
+            try:
+                farm = Farm.objects.get(pk=options['farm'])
+            except Farm.DoesNotExist:
+                raise CommandError(f"Farm {options['farm']} does not exist")
+        if farm is None:
+            raise CommandError('No farm given and the user is not assigned to one')
+
+        try:
+            with open(options['path'], 'rb') as file:
+                report = run_import(
+                    options['kind'], file, options['path'], farm, user,
+                    chunk_size=options['chunk_size'], dry_run=options['dry_run']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['rows']} row(s) read, {report['valid']} valid, "
+            f"{report['created']} created, {len(report['errors'])} rejected"
+        ))
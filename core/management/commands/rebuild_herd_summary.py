@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Farm, HerdSummary
+
+
+class Command(BaseCommand):
+    help = "Recount the per-farm herd summary table from the Cattle table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', type=int, help='Only rebuild the summary of this farm id')
+
+    def handle(self, *args, **options):
+        farm_id = options['farm']
+        if farm_id and not Farm.objects.filter(pk=farm_id).exists():
+            raise CommandError(f"Farm {farm_id} does not exist")
+
+        summaries = HerdSummary.rebuild(farm_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt herd summary for {len(summaries)} farm(s)"))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Cattle, Farm
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute calving count, first calving date and average calving "
+        "interval for every animal from its birth records. Run after bulk "
+        "imports of historic birth records."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', type=int, help='Only recompute cattle of this farm id')
+
+    def handle(self, *args, **options):
+        farm = None
+        if options['farm']:
+            try:
+                farm = Farm.objects.get(pk=options['farm'])
+            except Farm.DoesNotExist:
+                raise CommandError(f"Farm {options['farm']} does not exist")
+
+        started = time.monotonic()
+        updated = Cattle.recompute_calving_stats(farm=farm)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated calving stats of {updated} animal(s) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Cattle, Farm
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute life stage, gestation status/stage and expected dates for "
+        "every animal using set-based UPDATEs. Intended to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', type=int, help='Only refresh cattle of this farm id')
+
+    def handle(self, *args, **options):
+        farm = None
+        if options['farm']:
+            try:
+                farm = Farm.objects.get(pk=options['farm'])
+            except Farm.DoesNotExist:
+                raise CommandError(f"Farm {options['farm']} does not exist")
+
+        started = time.monotonic()
+        changed = Cattle.refresh_time_dependent_fields(farm=farm)
+        elapsed = time.monotonic() - started
+
+        for field, count in changed.items():
+            self.stdout.write(f"{field}: {count} row(s) changed")
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed cattle status in {elapsed:.2f}s ({sum(changed.values())} field update(s))"
+        ))
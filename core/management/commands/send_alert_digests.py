@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.notifications import send_alert_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue the hourly and daily alert digest emails that are due and "
+        "advance each user's digest watermark. Intended to run hourly."
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        queued = send_alert_digests()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} digest(s) in {elapsed:.2f}s"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver due emails from the outbox, one connection per batch. "
+        "With --loop it keeps polling and acts as the mail worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Emails sent per connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            sent, failed = OutboundEmail.drain(batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {sent} email(s), {failed} failed in {elapsed:.2f}s"
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.alerts import sweep_alerts
+from core.models import Farm
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate every alert rule (heifer breeding age, pregnancy check, "
+        "calving, insemination, periodic vaccination/treatment) farm by farm "
+        "and create only the new alerts. Intended to run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', type=int, help='Only sweep this farm id')
+
+    def handle(self, *args, **options):
+        farms = Farm.objects.all()
+        if options['farm']:
+            farms = farms.filter(pk=options['farm'])
+            if not farms.exists():
+                raise CommandError(f"Farm {options['farm']} does not exist")
+
+        started = time.monotonic()
+        total = 0
+        for farm in farms:
+            created = len(sweep_alerts(farm))
+            total += created
+            self.stdout.write(f"{farm.name}: {created} new alert(s)")
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Created {total} alert(s) in {elapsed:.2f}s"))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_alter_alert_options_rename_message_alert_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'created_at', 'id'], name='cattle_farm_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_cattle_farm_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HerdSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0)),
+                ('life_stage_calf', models.IntegerField(default=0)),
+                ('life_stage_heifer', models.IntegerField(default=0)),
+                ('life_stage_cow', models.IntegerField(default=0)),
+                ('life_stage_bull', models.IntegerField(default=0)),
+                ('gestation_not_pregnant', models.IntegerField(default=0)),
+                ('gestation_in_oestrus', models.IntegerField(default=0)),
+                ('gestation_missed_oestrus', models.IntegerField(default=0)),
+                ('gestation_pregnant', models.IntegerField(default=0)),
+                ('gestation_dry_off', models.IntegerField(default=0)),
+                ('gestation_calving', models.IntegerField(default=0)),
+                ('health_healthy', models.IntegerField(default=0)),
+                ('health_sick', models.IntegerField(default=0)),
+                ('gender_male', models.IntegerField(default=0)),
+                ('gender_female', models.IntegerField(default=0)),
+                ('active_milking', models.IntegerField(default=0, help_text='Cows that have calved and are not dried off')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('farm', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='herd_summary', to='core.farm')),
+            ],
+            options={
+                'verbose_name_plural': 'Herd summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_herdsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='insemination',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='CollectionTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(choices=[('cattle', 'Cattle'), ('alerts', 'Alerts'), ('birth_records', 'Birth Records'), ('inseminations', 'Inseminations')], max_length=20)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('farm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collection_tombstones', to='core.farm')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='collectiontombstone',
+            constraint=models.UniqueConstraint(fields=('farm', 'collection'), name='unique_farm_collection_tombstone'),
+        ),
+    ]
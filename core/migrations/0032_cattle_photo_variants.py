@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_conditional_get_validators'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cattle',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
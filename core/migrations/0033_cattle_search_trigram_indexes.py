@@ -0,0 +1,34 @@
+from django.db import migrations
+
+SEARCH_FIELDS = ['ear_tag_no', 'breed', 'dam_id', 'sire_id']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes only exist on PostgreSQL; other databases use the
+    # in-memory index in core.search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS cattle_{field}_trgm_idx '
+            f'ON core_cattle USING gin (UPPER({field}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS cattle_{field}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_cattle_photo_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_cattle_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'updated_at'], name='cattle_farm_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_cattle_farm_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='dedup_key',
+            field=models.CharField(blank=True, editable=False, max_length=40, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='due_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='rule',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_cattle_farm(apps, schema_editor):
+    Alert = apps.get_model('core', 'Alert')
+    Cattle = apps.get_model('core', 'Cattle')
+    Alert.objects.update(
+        farm_id=models.Subquery(Cattle.objects.filter(pk=models.OuterRef('cattle_id')).values('farm_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_alert_dedup_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='farm',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='core.farm'),
+        ),
+        migrations.RunPython(copy_cattle_farm, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['farm', 'read', 'priority', '-created_at'], name='alert_farm_read_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('read', False)), fields=['farm', '-created_at'], name='alert_farm_unread_idx'),
+        ),
+    ]
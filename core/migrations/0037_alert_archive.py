@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_alert_farm_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_id', models.BigIntegerField(help_text='Primary key the alert had in the live table')),
+                ('cattle_ear_tag', models.CharField(blank=True, max_length=100)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('type', models.CharField(choices=[('health', 'Health'), ('reproduction', 'Reproduction'), ('production', 'Production'), ('inventory', 'Inventory'), ('financial', 'Financial'), ('maintenance', 'Maintenance')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('rule', models.CharField(blank=True, max_length=50)),
+                ('source_type', models.CharField(blank=True, max_length=50)),
+                ('source_id', models.CharField(blank=True, max_length=50)),
+                ('metadata', models.JSONField(blank=True, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('date', models.DateTimeField()),
+                ('created_at', models.DateTimeField()),
+                ('read_at', models.DateTimeField(help_text='Last update of the live alert, i.e. when it was read')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('cattle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_alerts', to='core.cattle')),
+                ('farm', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_alerts', to='core.farm')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['farm', '-created_at'], name='alert_archive_farm_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'expected_calving_date'], name='cattle_farm_calving_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'expected_insemination_date'], name='cattle_farm_insemination_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gestationcheck',
+            index=models.Index(fields=['check_date'], name='gestation_check_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gestationmilestone',
+            index=models.Index(fields=['due_date'], name='milestone_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='periodictreatmentrecord',
+            index=models.Index(fields=['next_treatment_date'], name='periodic_treat_next_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='periodicvaccinationrecord',
+            index=models.Index(fields=['next_vaccination_date'], name='periodic_vacc_next_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_existing_calves(apps, schema_editor):
+    """Link calves named in BirthRecord.calf_ear_tag to their birth record."""
+    BirthRecord = apps.get_model('core', 'BirthRecord')
+    BirthRecordCalf = apps.get_model('core', 'BirthRecordCalf')
+    Cattle = apps.get_model('core', 'Cattle')
+
+    records = list(BirthRecord.objects.values_list('id', 'calf_ear_tag'))
+    tags = {
+        record_id: [tag.strip() for tag in (calf_ear_tag or '').split(',') if tag.strip()]
+        for record_id, calf_ear_tag in records
+    }
+    calves = dict(Cattle.objects.filter(
+        ear_tag_no__in={tag for record_tags in tags.values() for tag in record_tags}
+    ).values_list('ear_tag_no', 'id'))
+
+    links, linked = [], set()
+    for record_id, record_tags in tags.items():
+        for position, tag in enumerate(record_tags):
+            calf_id = calves.get(tag)
+            if calf_id is None or calf_id in linked:
+                continue
+            linked.add(calf_id)
+            links.append(BirthRecordCalf(birth_record_id=record_id, calf_id=calf_id, position=position))
+    BirthRecordCalf.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0039_calendar_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BirthRecordCalf',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('birth_record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calves', to='core.birthrecord')),
+                ('calf', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='birth_link', to='core.cattle')),
+            ],
+            options={
+                'ordering': ['birth_record', 'position'],
+            },
+        ),
+        migrations.RunPython(link_existing_calves, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0040_birth_record_calf'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cattle',
+            name='cattle_farm_calving_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cattle',
+            name='cattle_farm_insemination_idx',
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['cattle', 'read', '-created_at'], name='alert_cattle_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'gestation_status', 'expected_calving_date'], name='cattle_farm_gest_calving_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'gestation_status', 'expected_insemination_date'], name='cattle_farm_gest_insem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='insemination',
+            index=models.Index(fields=['cattle', 'pregnancy_check_status', 'insemination_date'], name='insemination_cattle_check_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0041_farm_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='alert',
+            name='alert_farm_read_priority_idx',
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['farm', 'read', 'priority', '-created_at', '-id'], name='alert_farm_read_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['farm', 'priority', '-created_at', '-id'], name='alert_farm_priority_idx'),
+        ),
+    ]
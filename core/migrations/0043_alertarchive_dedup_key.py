@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0042_alert_priority_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertarchive',
+            name='dedup_key',
+            field=models.CharField(blank=True, db_index=True, max_length=40, null=True),
+        ),
+    ]
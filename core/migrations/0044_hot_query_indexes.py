@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0043_alertarchive_dedup_key'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='alert',
+            name='alert_cattle_read_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='alert',
+            name='alert_farm_read_priority_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cattle',
+            name='cattle_farm_gest_calving_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cattle',
+            name='cattle_farm_gest_insem_idx',
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('read', False)), fields=['farm', 'priority', '-created_at', '-id'], name='alert_farm_unread_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(condition=models.Q(('read', False)), fields=['cattle', '-created_at'], name='alert_cattle_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'gestation_status', 'expected_calving_date', 'id'], name='cattle_farm_gest_calving_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cattle',
+            index=models.Index(fields=['farm', 'gestation_status', 'expected_insemination_date', 'id'], name='cattle_farm_gest_insem_idx'),
+        ),
+    ]
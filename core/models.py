@@ -1,7 +1,17 @@
-from django.db import models
+import hashlib
+import logging
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, Max, Min, Q, Value, When
+from django.dispatch import Signal
 from django.utils import timezone
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
+
 class Farm(models.Model):
     name = models.CharField(max_length=100, unique=True)
     farm_code = models.CharField(max_length=100, unique=True, blank=True, null=True)
@@ -32,6 +42,8 @@ class Cattle(models.Model):
         ('dry_off', 'Dry Off'),
         ('calving', 'Calving'),
     ]
+    # Statuses of a cow that is open for insemination
+    OPEN_GESTATION_STATUSES = ['not_pregnant', 'in_oestrus', 'missed_oestrus']
     GESTATION_STAGE_CHOICES = [
         ('not_pregnant', 'Not Pregnant'),
         ('first_trimester', 'First Trimester'),
@@ -48,6 +60,17 @@ class Cattle(models.Model):
         ('twice', 'Twice a day'),
         ('thrice', 'Three times a day')
     ]
+    # Gestation milestones, in days after insemination
+    GESTATION_MILESTONES = [
+        {'type': 'health_check', 'days': 30, 'description': 'First trimester health check'},
+        {'type': 'vaccination', 'days': 60, 'description': 'First trimester vaccinations'},
+        {'type': 'trimester_start', 'days': 95, 'description': 'Second trimester begins'},
+        {'type': 'health_check', 'days': 120, 'description': 'Second trimester health check'},
+        {'type': 'nutrition_change', 'days': 150, 'description': 'Adjust nutrition for late pregnancy'},
+        {'type': 'trimester_start', 'days': 190, 'description': 'Third trimester begins'},
+        {'type': 'health_check', 'days': 210, 'description': 'Third trimester health check'},
+        {'type': 'preparation', 'days': 260, 'description': 'Begin calving preparation'},
+    ]
 
     farm = models.ForeignKey('Farm', on_delete=models.CASCADE)
     ear_tag_no = models.CharField(max_length=50, unique=True)
@@ -80,6 +103,7 @@ class Cattle(models.Model):
         default='healthy'
     )
     photo = models.ImageField(upload_to='cattle_photos/', null=True, blank=True)
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)  # Resized copies, see core.images
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     calving_count = models.IntegerField(default=0, help_text="Number of times this animal has given birth")
@@ -105,36 +129,116 @@ class Cattle(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination / streaming of a farm's herd (see core.pagination)
+            models.Index(fields=['farm', 'created_at', 'id'], name='cattle_farm_created_id_idx'),
+            # Max('updated_at') validator for conditional GETs and cached farm indexes
+            models.Index(fields=['farm', 'updated_at'], name='cattle_farm_updated_idx'),
+            # Pregnant / open lists of a farm by due date (gestation views, calendar)
+            models.Index(
+                fields=['farm', 'gestation_status', 'expected_calving_date', 'id'], name='cattle_farm_gest_calving_idx'
+            ),
+            models.Index(
+                fields=['farm', 'gestation_status', 'expected_insemination_date', 'id'], name='cattle_farm_gest_insem_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.ear_tag_no} - {self.breed}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so post_save handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def changed_fields(self):
+        """Attnames whose value differs from what was loaded (every field for a new row)"""
+        loaded = getattr(self, '_loaded_values', None)
+        if self._state.adding or loaded is None:
+            return {field.attname for field in self._meta.concrete_fields}
+        return {attname for attname, value in loaded.items() if getattr(self, attname) != value}
+
+    def recompute_derived_fields(self, changed, explicit=None):
+        """
+        Recompute, in memory, the fields derived from the ``changed`` source
+        fields and return their names. Derived values the caller set itself
+        (``explicit``, default ``changed``) are kept unless empty.
+        """
+        explicit = changed if explicit is None else explicit
+        derived = set()
+        if changed & {'birth_date', 'gender'} and ('life_stage' not in explicit or not self.life_stage):
+            self.life_stage = self.calculate_life_stage_value()
+            derived.add('life_stage')
+        if 'last_calving_date' in changed and (
+            'expected_insemination_date' not in explicit or not self.expected_insemination_date
+        ):
+            self.expected_insemination_date = self.calculate_expected_insemination_date()
+            derived.add('expected_insemination_date')
+        if 'last_insemination_date' in changed:
+            self.update_gestation_fields()
+            derived |= {'gestation_status', 'gestation_stage', 'expected_calving_date'}
+        return derived
+
+    CALVING_STATS_FIELDS = ['calving_count', 'current_lactation', 'first_calving_date', 'average_calving_interval']
+
+    @staticmethod
+    def calving_stats_from(count, first, last):
+        """
+        Calving stats from a birth record count and first/last calving dates.
+        The mean of consecutive calving intervals telescopes to
+        (last - first) / (count - 1), so no per-record pass is needed.
+        """
+        return {
+            'calving_count': count,
+            'current_lactation': count,
+            'first_calving_date': first,
+            'average_calving_interval': (last - first).days / (count - 1) if count > 1 else None,
+        }
+
     def update_calving_stats(self):
         """Update calving statistics when a new birth record is added"""
-        birth_records = self.birthrecord_set.all().order_by('calving_date')
-        
-        # Update calving count
-        self.calving_count = birth_records.count()
-        
-        # Update current lactation
-        self.current_lactation = self.calving_count
-        
-        # Update first calving date
-        if birth_records.exists():
-            self.first_calving_date = birth_records.first().calving_date
-        
-        # Calculate average calving interval
-        if self.calving_count > 1:
-            intervals = []
-            previous_date = None
-            for record in birth_records:
-                if previous_date:
-                    interval = (record.calving_date - previous_date).days
-                    intervals.append(interval)
-                previous_date = record.calving_date
-            self.average_calving_interval = sum(intervals) / len(intervals)
-        
-        self.save()
+        totals = BirthRecord.objects.filter(cattle=self).aggregate(
+            count=Count('id'), first=Min('calving_date'), last=Max('calving_date')
+        )
+        for field, value in self.calving_stats_from(totals['count'], totals['first'], totals['last']).items():
+            setattr(self, field, value)
+        self.save(update_fields=self.CALVING_STATS_FIELDS)
+
+    @classmethod
+    def recompute_calving_stats(cls, farm=None, batch_size=1000):
+        """
+        Recompute calving stats for every animal (or one farm's) from one
+        grouped BirthRecord query and write the changed rows with bulk_update.
+        Returns the number of animals updated.
+        """
+        records = BirthRecord.objects.all()
+        cattle = cls.objects.all()
+        if farm is not None:
+            records = records.filter(cattle__farm=farm)
+            cattle = cattle.filter(farm=farm)
+
+        totals = {
+            row['cattle_id']: cls.calving_stats_from(row['count'], row['first'], row['last'])
+            for row in records.values('cattle_id').annotate(
+                count=Count('id'), first=Min('calving_date'), last=Max('calving_date')
+            ).order_by()
+        }
+        no_calvings = cls.calving_stats_from(0, None, None)
+
+        now = timezone.now()
+        changed = []
+        for animal in cattle.only('id', *cls.CALVING_STATS_FIELDS).iterator(chunk_size=batch_size):
+            stats = totals.get(animal.id, no_calvings)
+            if any(getattr(animal, field) != value for field, value in stats.items()):
+                for field, value in stats.items():
+                    setattr(animal, field, value)
+                animal.updated_at = now
+                changed.append(animal)
+
+        cls.objects.bulk_update(changed, cls.CALVING_STATS_FIELDS + ['updated_at'], batch_size=batch_size)
+        return len(changed)
 
     def get_lactation_status(self):
         """Get detailed lactation status including days in milk"""
@@ -178,7 +282,7 @@ class Cattle(models.Model):
                         'ear_tag': record.calf_ear_tag
                     }
                 }
-                for record in self.birthrecord_set.all().order_by('calving_date')
+                for record in self.birth_records.all().order_by('calving_date')
             ]
         }
 
@@ -243,6 +347,144 @@ class Cattle(models.Model):
             return self.last_calving_date + timedelta(days=60)
         return None
 
+    # Gestation statuses that follow from last_insemination_date alone; other
+    # statuses are set explicitly (negative check, dry-off) and kept
+    DERIVED_GESTATION_STATUSES = ['pregnant', 'calving']
+
+    @classmethod
+    def refresh_time_dependent_fields(cls, farm=None, today=None):
+        """
+        Recompute date-derived fields for the whole herd (or one farm) with a
+        few set-based UPDATEs instead of a per-row save().
+
+        Uses the same thresholds as save() and calculate_life_stage_value().
+        Gestation fields are only advanced for cattle whose status is derived
+        from the insemination date ('pregnant'/'calving'); a 'not_pregnant'
+        status set by a negative check and 'dry_off' are kept.
+        expected_insemination_date is only filled in when missing, so dates
+        set after a negative pregnancy check are kept.
+        Returns a dict mapping each field to the number of rows changed.
+        """
+        today = today or timezone.now().date()
+        now = timezone.now()
+        cattle = cls.objects.all()
+        if farm is not None:
+            cattle = cattle.filter(farm=farm)
+
+        def days_ago(days):
+            return today - timedelta(days=days)
+
+        life_stage = Case(
+            When(gender='female', birth_date__gt=days_ago(360), then=Value('calf')),
+            When(gender='female', birth_date__gt=days_ago(720), then=Value('heifer')),
+            When(gender='female', birth_date__isnull=False, then=Value('cow')),
+            When(gender='male', birth_date__gt=days_ago(360), then=Value('calf')),
+            When(gender='male', birth_date__isnull=False, then=Value('bull')),
+            default=F('life_stage'),
+        )
+        gestation_status = Case(
+            When(last_insemination_date__isnull=True, then=Value('not_pregnant')),
+            When(last_insemination_date__lt=days_ago(280), then=Value('calving')),
+            When(last_insemination_date__lte=today, then=Value('pregnant')),
+            default=F('gestation_status'),
+        )
+        gestation_stage = Case(
+            When(last_insemination_date__isnull=True, then=Value('not_pregnant')),
+            When(last_insemination_date__gt=today, then=F('gestation_stage')),
+            When(last_insemination_date__gte=days_ago(95), then=Value('first_trimester')),
+            When(last_insemination_date__gte=days_ago(190), then=Value('second_trimester')),
+            When(last_insemination_date__gte=days_ago(280), then=Value('third_trimester')),
+            default=Value('calving'),
+        )
+        expected_calving_date = ExpressionWrapper(
+            F('last_insemination_date') + timedelta(days=280),
+            output_field=models.DateField()
+        )
+        expected_insemination_date = ExpressionWrapper(
+            F('last_calving_date') + timedelta(days=60),
+            output_field=models.DateField()
+        )
+
+        pregnant = cattle.filter(gestation_status__in=cls.DERIVED_GESTATION_STATUSES)
+
+        changed = {
+            'life_stage': cattle.exclude(life_stage=life_stage).update(
+                life_stage=life_stage, updated_at=now
+            ),
+            'gestation_status': pregnant.exclude(gestation_status=gestation_status).update(
+                gestation_status=gestation_status, updated_at=now
+            ),
+            'gestation_stage': pregnant.exclude(gestation_stage=gestation_stage).update(
+                gestation_stage=gestation_stage, updated_at=now
+            ),
+            'expected_calving_date': (
+                cattle.filter(last_insemination_date__isnull=True, expected_calving_date__isnull=False).update(
+                    expected_calving_date=None, updated_at=now
+                )
+                + pregnant.filter(last_insemination_date__isnull=False).filter(
+                    Q(expected_calving_date__isnull=True) | ~Q(expected_calving_date=expected_calving_date)
+                ).update(expected_calving_date=expected_calving_date, updated_at=now)
+            ),
+            'expected_insemination_date': cattle.filter(
+                last_calving_date__isnull=False, expected_insemination_date__isnull=True
+            ).update(expected_insemination_date=expected_insemination_date, updated_at=now),
+        }
+        if changed['life_stage'] or changed['gestation_status']:
+            # Bulk UPDATEs bypass the signals that keep the herd summary current
+            HerdSummary.rebuild(farm.id if farm is not None else None)
+        if any(changed.values()):
+            from .gestation import bump_version as bump_gestation_version
+            bump_gestation_version(*([farm.id] if farm is not None else Farm.objects.values_list('id', flat=True)))
+        return changed
+
+    @classmethod
+    def bulk_apply_changes(cls, changes):
+        """
+        Apply validated field changes to many cattle with one bulk_update.
+
+        ``changes`` is a list of (cattle, data) pairs. Derived fields are only
+        recomputed for animals whose source columns actually changed, and
+        milestones are only regenerated when the insemination date moved.
+        Returns the list of cattle that were updated.
+        """
+        now = timezone.now()
+        updated = []
+        columns = set()
+        rescheduled = []
+        for cattle, data in changes:
+            changed = {field for field, value in data.items() if getattr(cattle, field) != value}
+            if not changed:
+                continue
+            for field in changed:
+                setattr(cattle, field, data[field])
+
+            changed |= cattle.recompute_derived_fields(changed, explicit=set(data))
+            if 'last_insemination_date' in changed:
+                rescheduled.append(cattle)
+
+            cattle.updated_at = now
+            columns |= changed
+            updated.append(cattle)
+
+        if not updated:
+            return []
+
+        with transaction.atomic():
+            cls.objects.bulk_update(updated, sorted(columns | {'updated_at'}))
+            if rescheduled:
+                GestationMilestone.objects.filter(cattle__in=rescheduled, is_completed=False).delete()
+                GestationMilestone.objects.bulk_create([
+                    milestone
+                    for cattle in rescheduled if cattle.gestation_status == 'pregnant'
+                    for milestone in cattle.build_gestation_milestones()
+                ])
+
+        if columns & (set(HerdSummary.DIMENSIONS) | {'last_calving_date'}):
+            # bulk_update bypasses the signals that keep the herd summary current
+            for farm_id in {cattle.farm_id for cattle in updated}:
+                HerdSummary.rebuild(farm_id)
+        return updated
+
     def generate_alerts(self):
         alerts = []
         today = timezone.now().date()
@@ -299,14 +541,6 @@ class Cattle(models.Model):
 
         return alerts
 
-    def save(self, *args, **kwargs):
-        self.life_stage = self.calculate_life_stage_value()
-        self.gestation_status = self.calculate_gestation_status_value()
-        self.gestation_stage = self.calculate_gestation_stage_value()
-        self.expected_calving_date = self.calculate_expected_calving_date()
-        self.expected_insemination_date = self.calculate_expected_insemination_date()
-        super().save(*args, **kwargs)
-
     def get_gestation_progress(self):
         """Calculate gestation progress as a percentage"""
         if not self.last_insemination_date or self.gestation_status == 'not_pregnant':
@@ -334,6 +568,24 @@ class Cattle(models.Model):
             return None
         return (self.expected_calving_date - timezone.now().date()).days
 
+    def build_gestation_milestones(self):
+        """Return unsaved GestationMilestone rows still ahead for this pregnancy"""
+        if not self.last_insemination_date or self.gestation_status == 'not_pregnant':
+            return []
+
+        today = timezone.now().date()
+        milestones = []
+        for milestone in self.GESTATION_MILESTONES:
+            due_date = self.last_insemination_date + timedelta(days=milestone['days'])
+            if due_date >= today:
+                milestones.append(GestationMilestone(
+                    cattle=self,
+                    milestone_type=milestone['type'],
+                    due_date=due_date,
+                    description=milestone['description']
+                ))
+        return milestones
+
     def generate_gestation_milestones(self):
         """Generate or update gestation milestones based on insemination date"""
         if not self.last_insemination_date or self.gestation_status == 'not_pregnant':
@@ -342,63 +594,11 @@ class Cattle(models.Model):
         # Clear existing incomplete milestones
         self.gestation_milestones.filter(is_completed=False).delete()
 
-        # Define milestones
-        milestones = [
-            {
-                'type': 'health_check',
-                'days': 30,
-                'description': 'First trimester health check'
-            },
-            {
-                'type': 'vaccination',
-                'days': 60,
-                'description': 'First trimester vaccinations'
-            },
-            {
-                'type': 'trimester_start',
-                'days': 95,
-                'description': 'Second trimester begins'
-            },
-            {
-                'type': 'health_check',
-                'days': 120,
-                'description': 'Second trimester health check'
-            },
-            {
-                'type': 'nutrition_change',
-                'days': 150,
-                'description': 'Adjust nutrition for late pregnancy'
-            },
-            {
-                'type': 'trimester_start',
-                'days': 190,
-                'description': 'Third trimester begins'
-            },
-            {
-                'type': 'health_check',
-                'days': 210,
-                'description': 'Third trimester health check'
-            },
-            {
-                'type': 'preparation',
-                'days': 260,
-                'description': 'Begin calving preparation'
-            },
-        ]
-
         # Create milestones
-        for milestone in milestones:
-            due_date = self.last_insemination_date + timedelta(days=milestone['days'])
-            if due_date >= timezone.now().date():
-                GestationMilestone.objects.create(
-                    cattle=self,
-                    milestone_type=milestone['type'],
-                    due_date=due_date,
-                    description=milestone['description']
-                )
+        GestationMilestone.objects.bulk_create(self.build_gestation_milestones())
 
-    def save(self, *args, **kwargs):
-        # Update gestation status and stage
+    def update_gestation_fields(self):
+        """Recompute gestation status, stage and expected calving date in memory"""
         if self.last_insemination_date:
             days_pregnant = (timezone.now().date() - self.last_insemination_date).days
             if days_pregnant >= 0:
@@ -420,10 +620,40 @@ class Cattle(models.Model):
             self.gestation_stage = 'not_pregnant'
             self.expected_calving_date = None
 
+    # Fields whose changes trigger derived-field and milestone recomputation
+    DERIVED_SOURCE_FIELDS = {'last_insemination_date', 'last_calving_date', 'birth_date', 'gender'}
+
+    def save(self, *args, **kwargs):
+        """
+        Recompute derived fields and milestones only when one of
+        DERIVED_SOURCE_FIELDS changed. With update_fields only those columns
+        (plus any derived ones and updated_at) are written; time-driven
+        changes are applied by refresh_time_dependent_fields() nightly.
+        """
+        update_fields = kwargs.get('update_fields')
+        changed = self.changed_fields()
+        if update_fields is not None:
+            changed &= {self._meta.get_field(name).attname for name in update_fields}
+
+        sources = changed & self.DERIVED_SOURCE_FIELDS
+        derived = self.recompute_derived_fields(changed) if sources else set()
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | derived | {'updated_at'}
+
         super().save(*args, **kwargs)
 
-        # Generate milestones after save if pregnant
-        if self.gestation_status == 'pregnant':
+        saved = kwargs.get('update_fields')
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{
+                field.attname: getattr(self, field.attname)
+                for field in self._meta.concrete_fields
+                if saved is None or field.name in saved or field.attname in saved
+            },
+        }
+
+        # Reschedule milestones only when the pregnancy dates moved
+        if 'last_insemination_date' in sources and self.gestation_status == 'pregnant':
             self.generate_gestation_milestones()
 
     def get_milking_schedule(self):
@@ -438,15 +668,19 @@ class Cattle(models.Model):
         }
         return default_schedules.get(self.milking_frequency, ['06:00', '18:00'])
 
+    @staticmethod
+    def milking_frequency_for(avg_daily_milk):
+        """Milking frequency suited to an average daily production"""
+        if avg_daily_milk > 25:  # High production
+            return 'thrice'
+        elif avg_daily_milk > 15:  # Medium production
+            return 'twice'
+        return 'once'  # Low production
+
     def update_milking_frequency(self):
         """Updates milking frequency based on average daily production"""
-        if self.avg_daily_milk > 25:  # High production
-            self.milking_frequency = 'thrice'
-        elif self.avg_daily_milk > 15:  # Medium production
-            self.milking_frequency = 'twice'
-        else:  # Low production
-            self.milking_frequency = 'once'
-        self.save()
+        self.milking_frequency = self.milking_frequency_for(self.avg_daily_milk)
+        self.save(update_fields=['avg_daily_milk', 'milking_frequency'])
 
     def can_record_milk(self):
         """Check if milk can be recorded for this cattle"""
@@ -540,6 +774,11 @@ class PeriodicVaccinationRecord(models.Model):
             return f"{self.vaccination_name} (Farm-wide) - (Next: {self.next_vaccination_date})"
         return f"{self.vaccination_name} for {self.cattle.ear_tag_no} - (Next: {self.next_vaccination_date})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_vaccination_date'], name='periodic_vacc_next_date_idx'),
+        ]
+
 class PeriodicTreatmentRecord(models.Model):
     cattle = models.ForeignKey(Cattle, on_delete=models.CASCADE, related_name='periodic_treatment_records', null=True, blank=True)
     veterinarian = models.ForeignKey('userauth.User', on_delete=models.CASCADE, related_name='periodic_treatment_records')
@@ -575,6 +814,11 @@ class PeriodicTreatmentRecord(models.Model):
             return f"{self.treatment_name} (Farm-wide) - (Next: {self.next_treatment_date})"
         return f"{self.treatment_name} for {self.cattle.ear_tag_no} - (Next: {self.next_treatment_date})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_treatment_date'], name='periodic_treat_next_date_idx'),
+        ]
+
 class Insemination(models.Model):
     cattle = models.ForeignKey(Cattle, on_delete=models.CASCADE, related_name='inseminations', null=True, blank=True)
     bull_id = models.CharField(max_length=100, blank=True, null=True)
@@ -600,6 +844,15 @@ class Insemination(models.Model):
     expected_calving_date = models.DateField(null=True, blank=True)
     pregnancy_check_reminder_sent = models.BooleanField(default=False)
     notes = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Pending pregnancy checks of a farm's cattle
+            models.Index(
+                fields=['cattle', 'pregnancy_check_status', 'insemination_date'], name='insemination_cattle_check_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Insemination for {self.cattle.ear_tag_no} on {self.insemination_date}"
@@ -608,12 +861,12 @@ class Insemination(models.Model):
         """Create an alert for pregnancy check (21 days after insemination)"""
         if not self.pregnancy_check_reminder_sent and self.insemination_date:
             check_date = self.insemination_date + timedelta(days=21)
-            Alert.objects.create(
-                cattle=self.cattle,
-                message=f"Pregnancy check due for insemination performed on {self.insemination_date}",
+            Alert.raise_alert(
+                self.cattle, 'pregnancy_check',
+                title=f"Pregnancy check due for {self.cattle.ear_tag_no}",
+                description=f"Pregnancy check due for insemination performed on {self.insemination_date}",
                 due_date=check_date,
-                priority='High',
-                alert_type='pregnancy_check'
+                priority='high',
             )
             self.pregnancy_check_reminder_sent = True
             self.save()
@@ -631,13 +884,12 @@ class Insemination(models.Model):
             self.cattle.expected_calving_date = self.expected_calving_date
             
             # Create alert for next vaccination/treatment if needed
-            Alert.objects.create(
-                cattle=self.cattle,
+            Alert.raise_alert(
+                self.cattle, 'first_trimester_checkup',
                 title=f"Schedule first trimester check-up for {self.cattle.ear_tag_no}",
                 description=f"First trimester check-up due for {self.cattle.ear_tag_no}",
-                date=timezone.now(),
-                type='reproduction',
-                priority='Medium'
+                due_date=self.insemination_date + timedelta(days=30),
+                priority='medium',
             )
 
         elif self.pregnancy_check_status == 'negative':
@@ -651,13 +903,12 @@ class Insemination(models.Model):
             self.cattle.expected_insemination_date = next_insemination_date
             
             # Create alert for next insemination
-            Alert.objects.create(
-                cattle=self.cattle,
+            Alert.raise_alert(
+                self.cattle, 'next_insemination',
                 title=f"Schedule next insemination for {self.cattle.ear_tag_no}",
                 description=f"Next insemination attempt due for {self.cattle.ear_tag_no}",
-                date=timezone.now(),
-                type='reproduction',
-                priority='Medium'
+                due_date=next_insemination_date,
+                priority='medium',
             )
 
         self.cattle.save()
@@ -703,108 +954,172 @@ class BirthRecord(models.Model):
     def __str__(self):
         return f"Birth Record for {self.cattle.ear_tag_no} on {self.calving_date}"
 
+    def build_calves(self):
+        """Unsaved calves named in calf_ear_tag / calf_gender, derived fields computed in memory"""
+        mother = self.cattle
+        ear_tags = [tag.strip() for tag in self.calf_ear_tag.split(',')]
+        genders = [gender.strip().lower() for gender in self.calf_gender.split(',')]
+
+        calves = []
+        for ear_tag, gender in zip(ear_tags, genders):
+            calf = Cattle(
+                ear_tag_no=ear_tag,
+                birth_date=self.calving_date,
+                gender=gender,
+                life_stage='calf',
+                dam_id=mother.ear_tag_no,  # Set dam_id to mother's ear tag
+                breed=mother.breed,  # Inherit breed from mother
+                farm_id=mother.farm_id,
+                health_status='healthy',
+            )
+            # Same derivation Cattle.save() applies to a new animal
+            calf.recompute_derived_fields(calf.changed_fields())
+            calves.append(calf)
+        return calves
+
     def register_calf(self):
-        """Register a new calf in the system"""
-        try:
-            # Debug logging
-            print(f"Registering new calf with ear tag: {self.calf_ear_tag}")
-            print(f"Mother's ear tag: {self.cattle.ear_tag_no}")
-            print(f"Mother's ID: {self.cattle.id}")
-            
-            # For multiple births, handle each calf
-            ear_tags = [tag.strip() for tag in self.calf_ear_tag.split(',')]
-            genders = [gender.strip().lower() for gender in self.calf_gender.split(',')]
-            
-            registered_calves = []
-            for i, (ear_tag, gender) in enumerate(zip(ear_tags, genders)):
-                print(f"Creating calf {i+1}: Tag={ear_tag}, Gender={gender}")
-                
-                calf = Cattle.objects.create(
-                    ear_tag_no=ear_tag,
-                    birth_date=self.calving_date,
-                    gender=gender,
-                    life_stage='calf',
-                    dam_id=self.cattle.ear_tag_no,  # Set dam_id to mother's ear tag
-                    breed=self.cattle.breed,  # Inherit breed from mother
-                    farm=self.cattle.farm,
-                    health_status='healthy',
-                    gestation_status='open'
-                )
-                print(f"Successfully created calf: ID={calf.id}, Tag={calf.ear_tag_no}, Dam={calf.dam_id}")
-                registered_calves.append(calf)
-                
-                # Create an alert for the new calf
-                Alert.objects.create(
-                    cattle=calf,
-                    message=f"New calf registered with ear tag {ear_tag}. Born to {self.cattle.ear_tag_no}.",
-                    due_date=self.calving_date,
-                    priority='Low',
-                    alert_type='general'
-                )
-            
-            return registered_calves
-        except Exception as e:
-            print(f"Error registering calf: {str(e)}")
-            raise
+        """
+        Register the new calves with one bulk insert, link them to this
+        record and count them in the herd summary. Returns the calves; their
+        alerts come from calf_alerts(). Call inside the record's transaction.
+        """
+        calves = Cattle.objects.bulk_create(self.build_calves())
+        BirthRecordCalf.objects.bulk_create([
+            BirthRecordCalf(birth_record=self, calf=calf, position=position)
+            for position, calf in enumerate(calves)
+        ])
+        # bulk_create bypasses the post_save handler that keeps the summary current
+        HerdSummary.apply_delta(self.cattle.farm_id, Counter(
+            column
+            for calf in calves
+            for column in HerdSummary.columns_for(
+                {field: getattr(calf, field) for field in [*HerdSummary.DIMENSIONS, 'last_calving_date']}
+            )
+        ))
+        return calves
+
+    def calf_alerts(self, calves):
+        return [
+            Alert(
+                cattle=calf,
+                farm_id=calf.farm_id,
+                rule='calf_registered',
+                title=f"New calf {calf.ear_tag_no} registered",
+                description=f"New calf registered with ear tag {calf.ear_tag_no}. Born to {self.cattle.ear_tag_no}.",
+                due_date=self.calving_date,
+                priority='low',
+                type='reproduction',
+                source_type='birthrecord',
+                source_id=str(self.pk),
+            )
+            for calf in calves
+        ]
 
     def update_mother_status(self):
-        """Update the mother's status after calving"""
-        self.cattle.last_calving_date = self.calving_date
-        self.cattle.gestation_status = 'not_pregnant'
-        self.cattle.gestation_stage = 'not_pregnant'
-        self.cattle.last_insemination_date = None
-        self.cattle.expected_calving_date = None
-        self.cattle.expected_insemination_date = self.calving_date + timedelta(days=60)  # Set next insemination date to 60 days after calving
-        self.cattle.save()
+        """Update the mother's status and calving stats after calving, in one save"""
+        mother = self.cattle
+        mother.last_calving_date = self.calving_date
+        mother.gestation_status = 'not_pregnant'
+        mother.gestation_stage = 'not_pregnant'
+        mother.last_insemination_date = None
+        mother.expected_calving_date = None
+        mother.expected_insemination_date = self.calving_date + timedelta(days=60)  # Set next insemination date to 60 days after calving
+        totals = BirthRecord.objects.filter(cattle=mother).aggregate(
+            count=Count('id'), first=Min('calving_date'), last=Max('calving_date')
+        )
+        for field, value in Cattle.calving_stats_from(totals['count'], totals['first'], totals['last']).items():
+            setattr(mother, field, value)
+        mother.save()
 
-    def create_health_alerts(self):
-        """Create health-related alerts based on calving outcome"""
+    def health_alerts(self):
+        """Unsaved health-related alerts based on calving outcome"""
         alerts = []
         
         # Alert for successful calving
-        alerts.append(Alert.objects.create(
+        alerts.append(Alert(
             cattle=self.cattle,
-            message=f"Successful calving recorded for {self.cattle.ear_tag_no}. Next insemination recommended after {self.cattle.expected_insemination_date}",
+            rule='calving_recorded',
+            title=f"Calving recorded for {self.cattle.ear_tag_no}",
+            description=f"Successful calving recorded for {self.cattle.ear_tag_no}. Next insemination recommended after {self.cattle.expected_insemination_date}",
             due_date=self.cattle.expected_insemination_date,
-            priority='Medium',
-            alert_type='general'
+            priority='medium',
+            type='reproduction'
         ))
 
         # Alert for complications
         if self.calving_outcome in ['complications', 'stillborn', 'died_shortly_after']:
-            alerts.append(Alert.objects.create(
-                cattle=self.cattle,
-                message=f"Complications reported during calving for {self.cattle.ear_tag_no}. Veterinary attention required.",
-                due_date=timezone.now().date(),
-                priority='High',
-                alert_type='general'
-            ))
+            alerts.append(self.complications_alert())
 
         # Alert for post-calving checkup
-        alerts.append(Alert.objects.create(
+        alerts.append(Alert(
             cattle=self.cattle,
-            message=f"Schedule post-calving checkup for {self.cattle.ear_tag_no}",
+            rule='post_calving_checkup',
+            title=f"Post-calving checkup for {self.cattle.ear_tag_no}",
+            description=f"Schedule post-calving checkup for {self.cattle.ear_tag_no}",
             due_date=self.calving_date + timedelta(days=7),
-            priority='High',
-            alert_type='general'
+            priority='high',
+            type='health'
         ))
 
+        for alert in alerts:
+            alert.source_type, alert.source_id = 'birthrecord', str(self.pk)
         return alerts
 
+    def complications_alert(self):
+        return Alert(
+            cattle=self.cattle,
+            rule='calving_complications',
+            title=f"Calving complications for {self.cattle.ear_tag_no}",
+            description=f"Complications reported during calving for {self.cattle.ear_tag_no} on {self.calving_date}. Veterinary attention required.",
+            due_date=self.calving_date,
+            priority='high',
+            type='health',
+            source_type='birthrecord',
+            source_id=str(self.pk),
+        )
+
     def save(self, *args, **kwargs):
+        """
+        A new record registers its calves, updates the mother and raises its
+        alerts in the same transaction, with a fixed number of writes.
+        """
         is_new = self._state.adding  # Check if this is a new record
-        super().save(*args, **kwargs)
-        
-        if is_new:
-            # Register the new calf if calving was successful
-            if self.calving_outcome == 'successful':
-                self.register_calf()
-            
-            # Update mother's status
-            self.update_mother_status()
-            
-            # Create relevant alerts
-            self.create_health_alerts()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if is_new:
+                # Register the new calves if calving was successful
+                calves = self.register_calf() if self.calving_outcome == 'successful' else []
+
+                # Update mother's status
+                self.update_mother_status()
+
+                # Create relevant alerts
+                Alert.upsert(self.calf_alerts(calves) + self.health_alerts())
+
+
+class BirthRecordCalf(models.Model):
+    """
+    Calf registered from a birth record. Replaces matching the
+    comma-separated BirthRecord.calf_ear_tag, so a calf's mother and
+    siblings are an indexed join.
+    """
+    birth_record = models.ForeignKey(BirthRecord, on_delete=models.CASCADE, related_name='calves')
+    calf = models.OneToOneField(Cattle, on_delete=models.CASCADE, related_name='birth_link')
+    # Order of the calf in the record's calf_ear_tag list
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['birth_record', 'position']
+
+    def __str__(self):
+        return f"{self.calf.ear_tag_no} born in {self.birth_record}"
+
+
+# Sent by Alert.upsert with the alerts it created, and with the existing alerts
+# it refreshed, since bulk_create skips post_save
+alerts_created = Signal()
+alerts_refreshed = Signal()
 
 class Alert(models.Model):
     PRIORITY_CHOICES = [
@@ -823,6 +1138,11 @@ class Alert(models.Model):
     ]
 
     cattle = models.ForeignKey(Cattle, on_delete=models.CASCADE, related_name='alerts')
+    # Copy of cattle.farm so farm alert lists are served by the indexes below,
+    # which also cover lookups on farm alone
+    farm = models.ForeignKey(
+        Farm, on_delete=models.CASCADE, related_name='alerts', null=True, editable=False, db_index=False
+    )
     title = models.CharField(max_length=200)
     description = models.TextField()
     date = models.DateTimeField(auto_now_add=True)
@@ -832,15 +1152,396 @@ class Alert(models.Model):
     source_type = models.CharField(max_length=50, blank=True)  # e.g., 'treatment', 'vaccination', etc.
     source_id = models.CharField(max_length=50, blank=True)    # ID of the source record
     metadata = models.JSONField(null=True, blank=True)         # Additional data
+    rule = models.CharField(max_length=50, blank=True)         # Condition that raised the alert, e.g. 'calving_due'
+    due_date = models.DateField(null=True, blank=True)
+    # Hash of (rule, cattle, source_type, source_id, due_date); alerts created
+    # before keys existed have none
+    dedup_key = models.CharField(max_length=40, unique=True, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Refreshed when an alert is raised again; read state and dates are kept
+    UPSERT_FIELDS = ['farm', 'title', 'description', 'type', 'priority', 'metadata', 'updated_at']
+    PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+    # Cached unread counters are recounted from the table at least this often
+    UNREAD_COUNT_TIMEOUT = 15 * 60
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # One priority of a farm's alerts, newest first (see Alert.priority_segments).
+            # read=False is rendered as NOT read, which SQLite can't match against
+            # an index column, so the unread indexes are partial instead
+            models.Index(fields=['farm', 'priority', '-created_at', '-id'], name='alert_farm_priority_idx'),
+            models.Index(
+                fields=['farm', 'priority', '-created_at', '-id'], condition=Q(read=False),
+                name='alert_farm_unread_priority_idx'
+            ),
+            models.Index(fields=['farm', '-created_at'], condition=Q(read=False), name='alert_farm_unread_idx'),
+            # Unread alerts of given animals (gestation dashboard, cattle detail)
+            models.Index(fields=['cattle', '-created_at'], condition=Q(read=False), name='alert_cattle_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.cattle.ear_tag_no} ({self.type})"
 
+    @staticmethod
+    def build_dedup_key(rule, cattle_id, source_type, source_id, due_date):
+        parts = [rule, cattle_id, source_type, source_id, due_date.isoformat() if due_date else '']
+        return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def assign_dedup_key(self):
+        if self.rule:
+            self.dedup_key = self.build_dedup_key(
+                self.rule, self.cattle_id, self.source_type, self.source_id, self.due_date
+            )
+        return self.dedup_key
+
+    def save(self, *args, **kwargs):
+        if self.farm_id is None:
+            self.farm_id = self.cattle.farm_id
+        if not self.dedup_key:
+            self.assign_dedup_key()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def priority_counts(cls, queryset):
+        """Number of alerts of ``queryset`` per priority, with one grouped count."""
+        return dict(queryset.order_by().values_list('priority').annotate(n=Count('id')))
+
+    @classmethod
+    def priority_segments(cls, queryset, counts, offset=0, limit=None):
+        """
+        Querysets that together hold ``queryset[offset:offset + limit]`` in
+        priority order (high to low, newest first). Each one reads a single
+        priority ordered by (created_at, id), which the (farm, priority,
+        created_at, id) indexes (all alerts, or unread only) return in order,
+        instead of sorting the farm's alerts on a CASE over priority. ``counts`` comes from
+        priority_counts() and tells which priorities the page spans.
+        """
+        ranked = sorted(cls.PRIORITY_RANK, key=cls.PRIORITY_RANK.get)
+        groups = [(priority, counts.get(priority, 0)) for priority in ranked]
+        # Values outside PRIORITY_CHOICES (legacy rows) rank last, together
+        groups.append((None, sum(n for priority, n in counts.items() if priority not in cls.PRIORITY_RANK)))
+
+        end = None if limit is None else offset + limit
+        segments, start = [], 0
+        for priority, size in groups:
+            first, last = max(offset - start, 0), size if end is None else min(end - start, size)
+            start += size
+            if first >= last:
+                continue
+            group = (
+                queryset.filter(priority=priority) if priority is not None
+                else queryset.exclude(priority__in=ranked)
+            )
+            segments.append(group.order_by('-created_at', '-id')[first:last])
+        return segments
+
+    @classmethod
+    def upsert(cls, alerts, batch_size=500):
+        """
+        Insert keyed alerts in bulk. An alert whose key already exists updates
+        that row's UPSERT_FIELDS instead of adding a duplicate, and one whose
+        key was archived (read and retired) is skipped. Returns the alerts that
+        did not exist before.
+        """
+        unique = {}
+        for alert in alerts:
+            unique[alert.assign_dedup_key()] = alert
+        archived = set()
+        keys = list(unique)
+        for start in range(0, len(keys), batch_size):
+            archived.update(AlertArchive.objects.filter(
+                dedup_key__in=keys[start:start + batch_size]
+            ).values_list('dedup_key', flat=True))
+        alerts = [alert for key, alert in unique.items() if key not in archived]
+
+        missing = {alert.cattle_id for alert in alerts if alert.farm_id is None}
+        if missing:
+            farms = dict(Cattle.objects.filter(pk__in=missing).values_list('id', 'farm_id'))
+            for alert in alerts:
+                if alert.farm_id is None:
+                    alert.farm_id = farms.get(alert.cattle_id)
+
+        existing = set()
+        for start in range(0, len(alerts), batch_size):
+            keys = [alert.dedup_key for alert in alerts[start:start + batch_size]]
+            existing.update(cls.objects.filter(dedup_key__in=keys).values_list('dedup_key', flat=True))
+        cls.objects.bulk_create(
+            alerts, batch_size=batch_size,
+            update_conflicts=True, unique_fields=['dedup_key'], update_fields=cls.UPSERT_FIELDS,
+        )
+
+        created = [alert for alert in alerts if alert.dedup_key not in existing]
+        for farm_id, count in Counter(alert.farm_id for alert in created if not alert.read).items():
+            cls.adjust_unread_count(farm_id, count)
+        if created:
+            alerts_created.send(sender=cls, alerts=created)
+        if len(created) < len(alerts):
+            alerts_refreshed.send(sender=cls, alerts=[alert for alert in alerts if alert.dedup_key in existing])
+        return created
+
+    @staticmethod
+    def unread_count_key(farm_id):
+        return f'alerts:unread:{farm_id}'
+
+    @classmethod
+    def unread_count(cls, farm_id, store=True):
+        """
+        Unread alerts of a farm from the cache, counted from the table only on a miss.
+        Callers running after commit pass store=False: deltas of the same
+        transaction may still be queued and would be added to a stored recount.
+        """
+        count = cache.get(cls.unread_count_key(farm_id))
+        if count is None:
+            if not store:
+                return cls.objects.filter(farm_id=farm_id, read=False).count()
+            count = cls.reconcile_unread_count(farm_id)
+        return max(count, 0)
+
+    @classmethod
+    def reconcile_unread_count(cls, farm_id):
+        count = cls.objects.filter(farm_id=farm_id, read=False).count()
+        cache.set(cls.unread_count_key(farm_id), count, cls.UNREAD_COUNT_TIMEOUT)
+        return count
+
+    @classmethod
+    def reconcile_unread_counts(cls):
+        """Recount every farm's unread alerts with one grouped query."""
+        counts = dict.fromkeys(Farm.objects.values_list('id', flat=True), 0)
+        counts.update(
+            cls.objects.filter(read=False, farm__isnull=False).values('farm_id')
+            .annotate(count=Count('id')).order_by().values_list('farm_id', 'count')
+        )
+        cache.set_many({cls.unread_count_key(farm_id): count for farm_id, count in counts.items()},
+                       cls.UNREAD_COUNT_TIMEOUT)
+        return counts
+
+    @classmethod
+    def adjust_unread_count(cls, farm_id, delta):
+        """Move the cached counter once the current transaction commits."""
+        if not farm_id or not delta:
+            return
+
+        def apply():
+            try:
+                cache.incr(cls.unread_count_key(farm_id), delta)
+            except ValueError:
+                # Not cached: the next read counts from the table
+                pass
+
+        transaction.on_commit(apply)
+
+    @classmethod
+    def raise_alert(cls, cattle, rule, title, description, due_date=None, priority='medium',
+                    alert_type='reproduction', source=None, metadata=None):
+        """
+        Create the alert for ``rule`` on ``cattle``, or refresh it if it was
+        already raised. Pass ``source`` only when the alert belongs to that
+        record rather than to the animal's state, since it is part of the key.
+        """
+        alert = cls(
+            cattle=cattle, farm_id=cattle.farm_id, rule=rule, title=title, description=description, due_date=due_date,
+            priority=priority, type=alert_type, metadata=metadata,
+            source_type=source._meta.model_name if source is not None else '',
+            source_id=str(source.pk) if source is not None else '',
+        )
+        cls.upsert([alert])
+        return cls.objects.get(dedup_key=alert.dedup_key)
+
+class AlertArchive(models.Model):
+    """
+    Read alerts moved out of the live Alert table by the retention job
+    (see AlertArchive.archive_read_alerts), kept for history queries.
+    """
+    alert_id = models.BigIntegerField(help_text="Primary key the alert had in the live table")
+    farm = models.ForeignKey(Farm, on_delete=models.CASCADE, related_name='archived_alerts', null=True)
+    cattle = models.ForeignKey(Cattle, on_delete=models.SET_NULL, related_name='archived_alerts', null=True, blank=True)
+    cattle_ear_tag = models.CharField(max_length=100, blank=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    type = models.CharField(max_length=20, choices=Alert.TYPE_CHOICES)
+    priority = models.CharField(max_length=10, choices=Alert.PRIORITY_CHOICES)
+    rule = models.CharField(max_length=50, blank=True)
+    source_type = models.CharField(max_length=50, blank=True)
+    source_id = models.CharField(max_length=50, blank=True)
+    metadata = models.JSONField(null=True, blank=True)
+    due_date = models.DateField(null=True, blank=True)
+    # Key of the live alert, so the same condition is not raised again once archived
+    dedup_key = models.CharField(max_length=40, null=True, blank=True, db_index=True)
+    date = models.DateTimeField()
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(help_text="Last update of the live alert, i.e. when it was read")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    COPIED_FIELDS = [
+        'farm_id', 'cattle_id', 'title', 'description', 'type', 'priority', 'rule',
+        'source_type', 'source_id', 'metadata', 'due_date', 'dedup_key', 'date', 'created_at',
+    ]
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['farm', '-created_at'], name='alert_archive_farm_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.cattle_ear_tag} (archived)"
+
+    @classmethod
+    def archive_read_alerts(cls, older_than_days, batch_size=1000):
+        """
+        Move alerts read more than ``older_than_days`` ago into the archive,
+        one transaction per batch. Returns the number of alerts moved.
+        """
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        candidates = Alert.objects.filter(read=True, updated_at__lt=cutoff)
+        moved = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    candidates.order_by('id')
+                    .values('id', 'updated_at', 'cattle__ear_tag_no', *cls.COPIED_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    return moved
+                cls.objects.bulk_create([
+                    cls(
+                        alert_id=row['id'],
+                        cattle_ear_tag=row['cattle__ear_tag_no'] or '',
+                        read_at=row['updated_at'],
+                        **{field: row[field] for field in cls.COPIED_FIELDS},
+                    )
+                    for row in rows
+                ])
+                Alert.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            moved += len(rows)
+
+
+class OutboundEmail(models.Model):
+    """
+    Outbox for all outbound mail. Requests only insert a row (OutboundEmail.queue);
+    send_due() drains the queue over one connection per batch and retries
+    failures with exponential backoff.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    MAX_ATTEMPTS = 6
+    RETRY_BASE_SECONDS = 60
+    # A claimed email is retried after this long if its worker died mid-batch
+    CLAIM_SECONDS = 10 * 60
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
+
+    @classmethod
+    def queue(cls, subject, body, to, html_body='', from_email=None):
+        from django.conf import settings
+        return cls.objects.create(
+            subject=subject, body=body, html_body=html_body or '',
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL, to=list(to),
+        )
+
+    def to_message(self, connection):
+        from django.core.mail import EmailMultiAlternatives
+        message = EmailMultiAlternatives(
+            self.subject, self.body, self.from_email, self.to, connection=connection
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, 'text/html')
+        return message
+
+    def retry_delay(self):
+        return timedelta(seconds=self.RETRY_BASE_SECONDS * 2 ** (self.attempts - 1))
+
+    @classmethod
+    def send_due(cls, batch_size=100):
+        """
+        Send up to ``batch_size`` due emails over a single connection.
+        Returns (sent, failed) counts for the batch.
+        """
+        from django.core.mail import get_connection
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Claim the batch so concurrent workers skip it
+            emails = list(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            cls.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=now + timedelta(seconds=cls.CLAIM_SECONDS)
+            )
+        if not emails:
+            return 0, 0
+
+        sent = failed = 0
+        attempted = set()
+        try:
+            with get_connection() as connection:
+                for email in emails:
+                    email.attempts += 1
+                    attempted.add(email.pk)
+                    try:
+                        connection.send_messages([email.to_message(connection)])
+                    except Exception as e:
+                        email.last_error = str(e)
+                    else:
+                        email.status, email.sent_at, email.last_error = 'sent', timezone.now(), ''
+        except Exception as e:
+            # The connection failed: every email it did not get to failed this attempt
+            logger.exception('Email connection failed')
+            for email in emails:
+                if email.pk not in attempted:
+                    email.attempts += 1
+                    email.last_error = str(e)
+
+        for email in emails:
+            if email.status == 'sent':
+                sent += 1
+                continue
+            failed += 1
+            if email.attempts >= cls.MAX_ATTEMPTS:
+                email.status = 'failed'
+            else:
+                email.next_attempt_at = timezone.now() + email.retry_delay()
+        cls.objects.bulk_update(emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+        return sent, failed
+
+    @classmethod
+    def drain(cls, batch_size=100):
+        """Send batches until nothing is due; returns total (sent, failed)."""
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed = cls.send_due(batch_size)
+            if not batch_sent and not batch_failed:
+                return sent, failed
+            sent += batch_sent
+            failed += batch_failed
+
+
 class GestationMilestone(models.Model):
     MILESTONE_TYPES = [
         ('health_check', 'Health Check'),
@@ -864,6 +1565,9 @@ class GestationMilestone(models.Model):
 
     class Meta:
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['due_date'], name='milestone_due_date_idx'),
+        ]
 
 class GestationCheck(models.Model):
     HEALTH_STATUS_CHOICES = [
@@ -887,4 +1591,202 @@ class GestationCheck(models.Model):
         return f"Week {self.gestation_week} check for {self.cattle.ear_tag_no}"
 
     class Meta:
-        ordering = ['-check_date']
\ No newline at end of file
+        ordering = ['-check_date']
+        indexes = [
+            models.Index(fields=['check_date'], name='gestation_check_date_idx'),
+        ]
+
+class HerdSummary(models.Model):
+    """
+    Herd composition counters for one farm.
+
+    Kept up to date by the Cattle post_save/post_delete handlers in
+    core.signals and rebuilt from scratch by the rebuild_herd_summary command,
+    so the dashboard reads a single row instead of counting the herd.
+    """
+    # Cattle field -> column prefix
+    DIMENSIONS = {
+        'life_stage': 'life_stage',
+        'gestation_status': 'gestation',
+        'health_status': 'health',
+        'gender': 'gender',
+    }
+
+    farm = models.OneToOneField(Farm, on_delete=models.CASCADE, related_name='herd_summary')
+    total = models.IntegerField(default=0)
+    life_stage_calf = models.IntegerField(default=0)
+    life_stage_heifer = models.IntegerField(default=0)
+    life_stage_cow = models.IntegerField(default=0)
+    life_stage_bull = models.IntegerField(default=0)
+    gestation_not_pregnant = models.IntegerField(default=0)
+    gestation_in_oestrus = models.IntegerField(default=0)
+    gestation_missed_oestrus = models.IntegerField(default=0)
+    gestation_pregnant = models.IntegerField(default=0)
+    gestation_dry_off = models.IntegerField(default=0)
+    gestation_calving = models.IntegerField(default=0)
+    health_healthy = models.IntegerField(default=0)
+    health_sick = models.IntegerField(default=0)
+    gender_male = models.IntegerField(default=0)
+    gender_female = models.IntegerField(default=0)
+    active_milking = models.IntegerField(
+        default=0,
+        help_text="Cows that have calved and are not dried off"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Herd summaries'
+
+    def __str__(self):
+        return f"Herd summary for {self.farm.name}: {self.total} cattle"
+
+    @classmethod
+    def counter_fields(cls):
+        return [
+            field.name for field in cls._meta.concrete_fields
+            if isinstance(field, models.IntegerField) and not field.primary_key
+        ]
+
+    @staticmethod
+    def is_active_milking(values):
+        return (
+            values.get('gender') == 'female'
+            and values.get('life_stage') == 'cow'
+            and values.get('gestation_status') != 'dry_off'
+            and values.get('last_calving_date') is not None
+        )
+
+    @classmethod
+    def columns_for(cls, values):
+        """Counter columns one animal with the given field values contributes to."""
+        counter_fields = set(cls.counter_fields())
+        columns = ['total']
+        for field, prefix in cls.DIMENSIONS.items():
+            column = f"{prefix}_{values.get(field)}"
+            if column in counter_fields:
+                columns.append(column)
+        if cls.is_active_milking(values):
+            columns.append('active_milking')
+        return columns
+
+    @classmethod
+    def aggregates(cls):
+        """Conditional COUNTs that compute every counter column in one pass."""
+        aggregates = {'total': models.Count('id')}
+        counter_fields = set(cls.counter_fields())
+        for field, prefix in cls.DIMENSIONS.items():
+            for value, _ in Cattle._meta.get_field(field).choices:
+                column = f"{prefix}_{value}"
+                if column in counter_fields:
+                    aggregates[column] = models.Count('id', filter=Q(**{field: value}))
+        aggregates['active_milking'] = models.Count('id', filter=Q(
+            gender='female', life_stage='cow', last_calving_date__isnull=False
+        ) & ~Q(gestation_status='dry_off'))
+        return aggregates
+
+    @classmethod
+    def rebuild(cls, farm_id=None):
+        """Recount one farm (or every farm) from the Cattle table."""
+        counts_by_farm = {
+            row.pop('farm'): row
+            for row in Cattle.objects.filter(
+                **({'farm_id': farm_id} if farm_id is not None else {})
+            ).order_by().values('farm').annotate(**cls.aggregates())
+        }
+        farm_ids = [farm_id] if farm_id is not None else list(Farm.objects.values_list('id', flat=True))
+        empty = dict.fromkeys(cls.counter_fields(), 0)
+        summaries = [
+            cls(farm_id=pk, **{**empty, **counts_by_farm.get(pk, {})})
+            for pk in farm_ids
+        ]
+        cls.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['farm'],
+            update_fields=cls.counter_fields() + ['updated_at'],
+        )
+        return summaries
+
+    @classmethod
+    def apply_delta(cls, farm_id, deltas):
+        """
+        Atomically add ``deltas`` ({column: +n/-n}) to a farm's counters.
+        Falls back to a full recount when the farm has no summary row yet.
+        """
+        deltas = {column: n for column, n in deltas.items() if n}
+        if not deltas:
+            return
+        updated = cls.objects.filter(farm_id=farm_id).update(
+            updated_at=timezone.now(),
+            **{column: F(column) + n for column, n in deltas.items()}
+        )
+        if not updated:
+            cls.rebuild(farm_id)
+
+    @classmethod
+    def for_farm(cls, farm):
+        summary = cls.objects.filter(farm=farm).first()
+        if summary is None:
+            summary = cls.rebuild(farm.id)[0]
+        return summary
+
+    def to_dict(self):
+        data = {'total': self.total, 'active_milking': self.active_milking}
+        for field, prefix in self.DIMENSIONS.items():
+            data[field] = {
+                value: getattr(self, f"{prefix}_{value}")
+                for value, _ in Cattle._meta.get_field(field).choices
+                if hasattr(self, f"{prefix}_{value}")
+            }
+        data['updated_at'] = self.updated_at
+        return data
+
+
+class CollectionTombstone(models.Model):
+    """
+    Last time a row was removed from one of a farm's collections.
+
+    Row counts and Max('updated_at') describe inserts and edits, but a delete
+    leaves no timestamp behind; the post_delete handlers in core.signals record
+    it here so Last-Modified (see core.conditional) moves forward on deletes too.
+    """
+    COLLECTION_CHOICES = [
+        ('cattle', 'Cattle'),
+        ('alerts', 'Alerts'),
+        ('birth_records', 'Birth Records'),
+        ('inseminations', 'Inseminations'),
+    ]
+
+    farm = models.ForeignKey(Farm, on_delete=models.CASCADE, related_name='collection_tombstones')
+    collection = models.CharField(max_length=20, choices=COLLECTION_CHOICES)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['farm', 'collection'], name='unique_farm_collection_tombstone'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection} of {self.farm} last deleted at {self.deleted_at}"
+
+    @classmethod
+    def mark(cls, farm_id, collection):
+        """Record that a row of ``collection`` was just deleted for a farm"""
+        cls.mark_many([(farm_id, collection)])
+
+    @classmethod
+    def mark_many(cls, marks):
+        """Record deletes for (farm_id, collection) pairs with a single upsert"""
+        now = timezone.now()
+        tombstones = [
+            cls(farm_id=farm_id, collection=collection, deleted_at=now)
+            for farm_id, collection in set(marks) if farm_id is not None
+        ]
+        if not tombstones:
+            return
+        cls.objects.bulk_create(
+            tombstones,
+            update_conflicts=True,
+            unique_fields=['farm', 'collection'],
+            update_fields=['deleted_at'],
+        )
@@ -0,0 +1,222 @@
+"""
+Alert email delivery.
+
+High priority alerts are emailed as soon as the transaction that created them
+commits, to every farm user who wants email. Other alerts wait for the user's
+hourly or daily digest (User.email_digest_frequency; 'immediate' users get
+every alert at once instead). A digest covers the unread alerts created since
+the user's alert_digest_sent_at watermark, which is advanced in the same
+transaction that queues the digest, so no alert is sent twice. The watermark
+trails the run by DIGEST_COMMIT_LAG: created_at is stamped at insert, so an
+alert whose transaction commits after the digest query is still picked up by
+the next digest. Digests are
+rendered once per farm and watermark and shared by every user that matches.
+"""
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Alert, OutboundEmail
+
+DIGEST_INTERVALS = {'hourly': timedelta(hours=1), 'daily': timedelta(days=1)}
+# Lets a digest run that starts a little early still pick up users due this period
+DIGEST_GRACE = timedelta(minutes=5)
+# Alerts newer than this may belong to transactions that have not committed yet
+DIGEST_COMMIT_LAG = timedelta(minutes=2)
+PRIORITY_COLORS = {
+    'High': ('#fee2e2', '#dc2626'),
+    'Medium': ('#fef3c7', '#d97706'),
+}
+DEFAULT_COLORS = ('#f3f4f6', '#374151')
+
+logger = logging.getLogger(__name__)
+
+
+def render_alert_email(subject, message, priority):
+    """Return (plain, html) bodies for a single alert email."""
+    priority = priority.capitalize()
+    background, color = PRIORITY_COLORS.get(priority, DEFAULT_COLORS)
+    html_message = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #2563eb;">Loonko Alert: {subject}</h2>
+                <div style="margin: 20px 0; padding: 15px; border-radius: 5px; background-color: {background};">
+                    <p style="margin: 0; color: {color};">
+                        Priority: {priority}
+                    </p>
+                    <p>{message}</p>
+                </div>
+                <hr style="border: none; border-top: 1px solid #e5e7eb; margin: 20px 0;">
+                <p style="color: #6b7280; font-size: 0.875rem;">This is an automated message from Loonko Farm Management System.</p>
+            </div>
+        </body>
+    </html>
+    """
+
+    # Plain text version
+    plain_message = f"""
+    Loonko Alert: {subject}
+    Priority: {priority}
+
+    {message}
+
+    This is an automated message from Loonko Farm Management System.
+    """
+    return plain_message, html_message
+
+
+def render_digest(alerts):
+    """
+    Return (subject, plain, html) for a digest of ``alerts``, given as
+    (priority, title, description, ear_tag_no) tuples, oldest first. They are
+    listed most urgent first, newest first within a priority.
+    """
+    rank = len(Alert.PRIORITY_RANK)
+    alerts = sorted(reversed(alerts), key=lambda alert: Alert.PRIORITY_RANK.get(alert[0], rank))
+    subject = f"Loonko Alerts: {len(alerts)} new alert{'s' if len(alerts) != 1 else ''}"
+    plain_lines, html_items = [], []
+    for priority, title, description, ear_tag in alerts:
+        priority = priority.capitalize()
+        background, color = PRIORITY_COLORS.get(priority, DEFAULT_COLORS)
+        tag = f" ({ear_tag})" if ear_tag else ''
+        plain_lines.append(f"    [{priority}] {title}{tag}: {description}")
+        html_items.append(
+            f'<li style="margin: 10px 0; padding: 10px; border-radius: 5px; background-color: {background};">'
+            f'<strong style="color: {color};">{priority}</strong> {title}{tag}<br>{description}</li>'
+        )
+    html_message = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #2563eb;">{subject}</h2>
+                <ul style="list-style: none; padding: 0;">{''.join(html_items)}</ul>
+                <hr style="border: none; border-top: 1px solid #e5e7eb; margin: 20px 0;">
+                <p style="color: #6b7280; font-size: 0.875rem;">This is an automated message from Loonko Farm Management System.</p>
+            </div>
+        </body>
+    </html>
+    """
+    plain_message = f"""
+    {subject}
+
+{chr(10).join(plain_lines)}
+
+    This is an automated message from Loonko Farm Management System.
+    """
+    return subject, plain_message, html_message
+
+
+def email_recipients():
+    """Farm users who receive alert emails."""
+    return get_user_model().objects.filter(
+        farm__isnull=False, is_active=True, get_email_notifications=True
+    ).exclude(email='')
+
+
+def email_new_alerts(alert_ids=(), dedup_keys=()):
+    """
+    After commit, email the given alerts to farm users who get them at once:
+    high priority alerts to everyone, the rest to 'immediate' users only.
+    Alerts created together are sent to a user as one email.
+    """
+    alert_ids, dedup_keys = list(alert_ids), list(dedup_keys)
+    if not alert_ids and not dedup_keys:
+        return
+
+    def send():
+        alerts = defaultdict(list)
+        for alert in Alert.objects.filter(
+            Q(pk__in=alert_ids) | Q(dedup_key__in=dedup_keys), read=False
+        ).select_related('cattle').order_by('created_at'):
+            alerts[alert.farm_id].append(alert)
+        if not alerts:
+            return
+
+        emails = []
+        for user in email_recipients().filter(farm_id__in=alerts).only('email', 'farm_id', 'email_digest_frequency'):
+            immediate = user.email_digest_frequency == 'immediate'
+            to_send = [alert for alert in alerts[user.farm_id] if immediate or alert.priority == 'high']
+            if len(to_send) == 1:
+                alert = to_send[0]
+                plain, html = render_alert_email(alert.title, alert.description, alert.priority)
+                subject = f"Loonko Alert: {alert.title}"
+            elif to_send:
+                subject, plain, html = render_digest(
+                    [(a.priority, a.title, a.description, a.cattle.ear_tag_no) for a in to_send]
+                )
+            else:
+                continue
+            emails.append(OutboundEmail(
+                subject=subject[:255], body=plain, html_body=html,
+                from_email=settings.DEFAULT_FROM_EMAIL, to=[user.email],
+            ))
+        try:
+            OutboundEmail.objects.bulk_create(emails)
+        except Exception:
+            # The alerts are committed already; don't fail the request over their email
+            logger.exception("Error queueing emails for alerts %s / %s", alert_ids, dedup_keys)
+
+    transaction.on_commit(send)
+
+
+def send_alert_digests(now=None):
+    """
+    Queue the digest of every user whose hourly or daily digest is due and
+    advance their watermark to DIGEST_COMMIT_LAG before ``now``. Returns the
+    number of digests queued.
+    """
+    now = now or timezone.now()
+    cutoff = now - DIGEST_COMMIT_LAG
+    due = Q()
+    for frequency, interval in DIGEST_INTERVALS.items():
+        due |= Q(email_digest_frequency=frequency) & (
+            Q(alert_digest_sent_at__isnull=True) | Q(alert_digest_sent_at__lte=now - interval + DIGEST_GRACE)
+        )
+    users = list(email_recipients().filter(due).values_list(
+        'id', 'email', 'farm_id', 'email_digest_frequency', 'alert_digest_sent_at'
+    ))
+    if not users:
+        return 0
+
+    def watermark(frequency, sent_at):
+        return sent_at or cutoff - DIGEST_INTERVALS[frequency]
+
+    # One query for the pending alerts of every due farm, oldest first
+    since = min(watermark(frequency, sent_at) for _, _, _, frequency, sent_at in users)
+    created = defaultdict(list)
+    rows = defaultdict(list)
+    for farm_id, created_at, priority, title, description, ear_tag in Alert.objects.filter(
+        farm_id__in={farm_id for _, _, farm_id, _, _ in users},
+        read=False, created_at__gt=since, created_at__lte=cutoff,
+    ).exclude(priority='high').order_by('created_at').values_list(
+        'farm_id', 'created_at', 'priority', 'title', 'description', 'cattle__ear_tag_no'
+    ):
+        created[farm_id].append(created_at)
+        rows[farm_id].append((priority, title, description, ear_tag))
+
+    rendered = {}
+    emails = []
+    for user_id, email, farm_id, frequency, sent_at in users:
+        start = bisect_right(created[farm_id], watermark(frequency, sent_at))
+        if start == len(rows[farm_id]):
+            continue
+        if (farm_id, start) not in rendered:
+            rendered[farm_id, start] = render_digest(rows[farm_id][start:])
+        subject, plain, html = rendered[farm_id, start]
+        emails.append(OutboundEmail(
+            subject=subject, body=plain, html_body=html,
+            from_email=settings.DEFAULT_FROM_EMAIL, to=[email],
+        ))
+
+    with transaction.atomic():
+        OutboundEmail.objects.bulk_create(emails)
+        get_user_model().objects.filter(pk__in=[user[0] for user in users]).update(alert_digest_sent_at=cutoff)
+    return len(emails)
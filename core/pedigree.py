@@ -0,0 +1,165 @@
+"""
+In-memory pedigree graph built from Cattle.dam_id / sire_id ear tags.
+
+The graph for a farm is built with one query and kept per process until the
+farm's cattle collection changes (same validator as the conditional GETs), so
+ancestry and inbreeding queries never walk the database row by row. Parents
+that are not in the herd (e.g. AI bulls) stay in the graph as founder tags,
+which still lets half-siblings by the same bull share a common ancestor.
+"""
+from collections import defaultdict, deque
+
+from .conditional import FarmCache
+from .models import Cattle
+
+MAX_GENERATIONS = 20
+
+
+class Pedigree:
+    def __init__(self, animals):
+        """``animals`` is an iterable of (id, ear_tag_no, dam_id, sire_id, gender, birth_date)."""
+        self.animals = {}
+        self.parents = {}
+        self.children = defaultdict(list)
+        for pk, ear_tag, dam, sire, gender, birth_date in animals:
+            self.animals[ear_tag] = {'id': pk, 'gender': gender, 'birth_date': birth_date}
+            dam, sire = dam or None, sire or None
+            self.parents[ear_tag] = (dam, sire)
+            if dam:
+                self.children[dam].append(ear_tag)
+            if sire:
+                self.children[sire].append(ear_tag)
+        self._depths = self._compute_depths()
+        self._kinship = {}
+
+    @classmethod
+    def build(cls, farm):
+        return cls(Cattle.objects.filter(farm=farm).values_list(
+            'id', 'ear_tag_no', 'dam_id', 'sire_id', 'gender', 'birth_date'
+        ))
+
+    @classmethod
+    def for_farm(cls, farm):
+        """Return the farm's pedigree, rebuilding it only when its cattle changed."""
+        return _pedigrees.get(farm)
+
+    def _compute_depths(self):
+        """
+        Generation depth of every tag (founders are 0, children are deeper
+        than both parents). A parent link that would close a cycle, which only
+        bad data can produce, is dropped so the recursion below terminates.
+        """
+        depths = {}
+        for root in list(self.parents):
+            if root in depths:
+                continue
+            stack = [(root, False)]
+            visiting = set()
+            while stack:
+                tag, expanded = stack.pop()
+                if tag in depths:
+                    continue
+                parents = [p for p in self.parents.get(tag, (None, None)) if p]
+                if expanded:
+                    visiting.discard(tag)
+                    depths[tag] = 1 + max((depths.get(p, 0) for p in parents), default=-1)
+                    continue
+                visiting.add(tag)
+                stack.append((tag, True))
+                for parent in parents:
+                    if parent in visiting:
+                        dam, sire = self.parents[tag]
+                        self.parents[tag] = (None if dam == parent else dam, None if sire == parent else sire)
+                    elif parent not in depths:
+                        stack.append((parent, False))
+        return depths
+
+    def __contains__(self, ear_tag):
+        return ear_tag in self.parents or ear_tag in self.children
+
+    def _node(self, ear_tag, generation, relation, relative):
+        animal = self.animals.get(ear_tag)
+        return {
+            'ear_tag_no': ear_tag,
+            'id': animal['id'] if animal else None,
+            'in_herd': animal is not None,
+            'gender': animal['gender'] if animal else None,
+            'birth_date': animal['birth_date'] if animal else None,
+            'generation': generation,
+            'relation': relation,
+            'relative': relative,
+        }
+
+    def ancestors(self, ear_tag, generations):
+        """Ancestors up to ``generations`` back, nearest first, each listed once."""
+        found = []
+        seen = {ear_tag}
+        queue = deque([(ear_tag, 0)])
+        while queue:
+            tag, generation = queue.popleft()
+            if generation == generations:
+                continue
+            for relation, parent in zip(('dam', 'sire'), self.parents.get(tag, (None, None))):
+                if parent and parent not in seen:
+                    seen.add(parent)
+                    found.append(self._node(parent, generation + 1, relation, tag))
+                    queue.append((parent, generation + 1))
+        return found
+
+    def descendants(self, ear_tag, generations):
+        """Descendants up to ``generations`` forward, nearest first, each listed once."""
+        found = []
+        seen = {ear_tag}
+        queue = deque([(ear_tag, 0)])
+        while queue:
+            tag, generation = queue.popleft()
+            if generation == generations:
+                continue
+            for child in self.children.get(tag, []):
+                if child not in seen:
+                    seen.add(child)
+                    found.append(self._node(child, generation + 1, 'offspring', tag))
+                    queue.append((child, generation + 1))
+        return found
+
+    def kinship(self, a, b):
+        """
+        Coefficient of coancestry between two tags (tabular method): the
+        probability that alleles drawn at random from each are identical by
+        descent. Unknown parents count as unrelated founders.
+        """
+        if not a or not b:
+            return 0.0
+        key = (a, b) if a <= b else (b, a)
+        if key in self._kinship:
+            return self._kinship[key]
+
+        if a == b:
+            dam, sire = self.parents.get(a, (None, None))
+            value = (1 + self.kinship(dam, sire)) / 2
+        else:
+            # Expand the younger animal: it cannot be an ancestor of the other
+            if self._depths.get(a, 0) < self._depths.get(b, 0):
+                a, b = b, a
+            dam, sire = self.parents.get(a, (None, None))
+            value = (self.kinship(dam, b) + self.kinship(sire, b)) / 2
+
+        self._kinship[key] = value
+        return value
+
+    def inbreeding(self, ear_tag):
+        """Wright's inbreeding coefficient F of an animal."""
+        dam, sire = self.parents.get(ear_tag, (None, None))
+        return self.kinship(dam, sire)
+
+    def mating_inbreeding(self, sire, dam):
+        """Inbreeding coefficient of a calf from the proposed mating."""
+        return self.kinship(sire, dam)
+
+    def common_ancestors(self, a, b, generations=MAX_GENERATIONS):
+        ancestors_a = {node['ear_tag_no'] for node in self.ancestors(a, generations)} | {a}
+        ancestors_b = {node['ear_tag_no'] for node in self.ancestors(b, generations)} | {b}
+        return sorted(ancestors_a & ancestors_b)
+
+
+_pedigrees = FarmCache(['cattle'], Pedigree.build)
@@ -0,0 +1,65 @@
+"""
+Real-time alert delivery over WebSockets (Django Channels).
+
+Each farm has a channel layer group; AlertConsumer subscribes an
+authenticated user to their farm's group and new alerts are pushed to it once
+the transaction that created them commits. Browsers cannot set headers on a
+WebSocket, so the API token (JWT or DRF token) may be passed as ?token=.
+"""
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.middleware import BaseMiddleware
+from django.db import transaction
+from django.db.models import Q
+
+from .authentication import user_for_token
+from .models import Alert
+
+
+def alert_group(farm_id):
+    return f'farm-{farm_id}-alerts'
+
+
+def broadcast_alerts(alert_ids=(), dedup_keys=()):
+    """
+    After commit, push the given alerts to their farms' groups. Upserted
+    alerts may lack a primary key, so they can be passed by dedup key.
+    """
+    alert_ids, dedup_keys = list(alert_ids), list(dedup_keys)
+    if not alert_ids and not dedup_keys:
+        return
+
+    def send():
+        from .serializers import AlertSerializer
+
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        by_farm = defaultdict(list)
+        for alert in Alert.objects.filter(Q(pk__in=alert_ids) | Q(dedup_key__in=dedup_keys)).order_by('created_at'):
+            by_farm[alert.farm_id].append(alert)
+        for farm_id, alerts in by_farm.items():
+            try:
+                async_to_sync(layer.group_send)(alert_group(farm_id), {
+                    'type': 'alerts.created',
+                    'alerts': AlertSerializer(alerts, many=True).data,
+                    'unread_count': Alert.unread_count(farm_id, store=False),
+                })
+            except Exception as e:
+                print(f"Error pushing alerts to farm {farm_id}: {str(e)}")
+
+    transaction.on_commit(send)
+
+
+class QueryTokenAuthMiddleware(BaseMiddleware):
+    """Authenticate a WebSocket from ?token=, leaving the session user otherwise."""
+
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        if token:
+            scope = dict(scope, user=await database_sync_to_async(user_for_token)(token[0]))
+        return await super().__call__(scope, receive, send)
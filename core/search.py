@@ -0,0 +1,170 @@
+"""
+Ranked prefix + trigram search over cattle ear tags, breed and parentage.
+
+On PostgreSQL the query runs in the database using pg_trgm: the `%`
+operator and case-insensitive prefixes are served by the GIN trigram indexes
+on UPPER(column) created in migration 0033. Other databases (SQLite in
+development) use an in-memory trigram index per farm that mirrors pg_trgm's
+similarity and is rebuilt only when the farm's cattle change.
+
+Ranking is the same on both: exact ear tag, then ear tag prefix, then a
+prefix on breed/dam/sire, then by best trigram similarity.
+"""
+import heapq
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+
+from .conditional import FarmCache
+from .models import Cattle
+
+SEARCH_FIELDS = ['ear_tag_no', 'breed', 'dam_id', 'sire_id']
+# pg_trgm's default similarity threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(value):
+    """Trigram set of a string, padded per word the way pg_trgm does."""
+    grams = set()
+    for word in ''.join(c if c.isalnum() else ' ' for c in value.lower()).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CattleSearchIndex:
+    """
+    In-memory trigram and prefix index of one farm's cattle.
+
+    Postings map each trigram to keys ``pk * 4 + field`` so one Counter pass
+    gives the shared-trigram count per animal and field, which with the
+    stored trigram counts is enough for pg_trgm's similarity.
+    """
+
+    def __init__(self, rows):
+        self.tags = {}
+        self.sizes = {}
+        self.postings = defaultdict(list)
+        self.sorted_tags = []
+        self.sorted_others = []
+        for pk, *values in rows:
+            values = [(value or '').lower() for value in values]
+            self.tags[pk] = values[0]
+            for field, value in enumerate(values):
+                if not value:
+                    continue
+                grams = trigrams(value)
+                key = pk * 4 + field
+                self.sizes[key] = len(grams)
+                for gram in grams:
+                    self.postings[gram].append(key)
+                if field == 0:
+                    self.sorted_tags.append((value, pk))
+                else:
+                    self.sorted_others.append((value, pk))
+        self.sorted_tags.sort()
+        self.sorted_others.sort()
+
+    @classmethod
+    def build(cls, farm):
+        return cls(Cattle.objects.filter(farm=farm).values_list('id', *SEARCH_FIELDS))
+
+    @staticmethod
+    def prefix_matches(sorted_values, q):
+        position = bisect_left(sorted_values, (q,))
+        while position < len(sorted_values) and sorted_values[position][0].startswith(q):
+            yield sorted_values[position][1]
+            position += 1
+
+    def similarities(self, q):
+        """Best trigram similarity per animal, for animals at or above the threshold."""
+        query_grams = trigrams(q)
+        if not query_grams:
+            return {}
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        size = len(query_grams)
+        minimum = SIMILARITY_THRESHOLD * size  # similarity >= t implies shared >= t * |q|
+        best = {}
+        for key, count in shared.items():
+            if count < minimum:
+                continue
+            score = count / (size + self.sizes[key] - count)
+            if score >= SIMILARITY_THRESHOLD:
+                pk = key >> 2
+                if score > best.get(pk, 0.0):
+                    best[pk] = score
+        return best
+
+    def search(self, q, limit):
+        """Return the best ``limit`` hits as [(pk, prefix_rank, similarity)]."""
+        q = q.lower()
+        scores = self.similarities(q)
+        ranks = dict.fromkeys(self.prefix_matches(self.sorted_others, q), 1)
+        for pk in self.prefix_matches(self.sorted_tags, q):
+            ranks[pk] = 3 if self.tags[pk] == q else 2
+
+        candidates = set(scores) | set(ranks)
+        best = heapq.nsmallest(
+            limit, candidates,
+            key=lambda pk: (-ranks.get(pk, 0), -scores.get(pk, 0.0), self.tags[pk])
+        )
+        return [(pk, ranks.get(pk, 0), scores.get(pk, 0.0)) for pk in best]
+
+
+_indexes = FarmCache(['cattle'], CattleSearchIndex.build)
+
+
+def postgres_search(farm, q, offset, limit):
+    from django.contrib.postgres.lookups import TrigramSimilar
+    from django.contrib.postgres.search import TrigramSimilarity
+    from django.db.models.functions import Greatest, Upper
+
+    # istartswith compiles to UPPER(col) LIKE UPPER(q%); matching on UPPER(col)
+    # for `%` too lets one GIN index per column serve both
+    match = Q()
+    for field in SEARCH_FIELDS:
+        match |= Q(**{f'{field}__istartswith': q}) | Q(TrigramSimilar(Upper(F(field)), q.upper()))
+
+    prefix = Q()
+    for field in SEARCH_FIELDS[1:]:
+        prefix |= Q(**{f'{field}__istartswith': q})
+
+    queryset = Cattle.objects.filter(farm=farm).filter(match).annotate(
+        rank=Case(
+            When(ear_tag_no__iexact=q, then=Value(3)),
+            When(ear_tag_no__istartswith=q, then=Value(2)),
+            When(prefix, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        score=Greatest(
+            *[TrigramSimilarity(field, q) for field in SEARCH_FIELDS],
+            output_field=FloatField(),
+        ),
+    ).order_by('-rank', '-score', 'ear_tag_no')
+    return list(queryset[offset:offset + limit])
+
+
+def search_cattle(farm, q, offset=0, limit=50):
+    """
+    Return up to ``limit`` ranked Cattle matching ``q`` starting at ``offset``.
+    Each result has ``rank`` and ``score`` attributes.
+    """
+    q = q.strip()
+    if connection.vendor == 'postgresql':
+        return postgres_search(farm, q, offset, limit)
+
+    hits = _indexes.get(farm).search(q, offset + limit)[offset:]
+    cattle = Cattle.objects.in_bulk([pk for pk, _, _ in hits])
+    results = []
+    for pk, rank, score in hits:
+        if pk in cattle:
+            animal = cattle[pk]
+            animal.rank, animal.score = rank, score
+            results.append(animal)
+    return results
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from .models import (
-    Cattle, Insemination, BirthRecord, Alert, Farm,
+    Cattle, Insemination, BirthRecord, Alert, AlertArchive, Farm,
     TreatmentRecord, VaccinationRecord, PeriodicVaccinationRecord, PeriodicTreatmentRecord,
     GestationMilestone, GestationCheck
 )
 from django.utils import timezone
+from .images import variant_url
 from datetime import timedelta
 
 class CattleSerializer(serializers.ModelSerializer):
@@ -42,10 +43,25 @@ class CattleSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
+        request = self.context.get('request')
         if instance.photo:
-            data['photo'] = self.context['request'].build_absolute_uri(instance.photo.url)
+            data['photo'] = request.build_absolute_uri(instance.photo.url) if request else instance.photo.url
+        # Small resized copy for list views; None until it has been generated
+        data['photo_thumbnail'] = variant_url(
+            instance, 'photo', 'photo_variants', 'thumbnail', request
+        )
         return data
 
+class CattleBulkUpdateSerializer(CattleSerializer):
+    """Fields that may be changed through the cattle bulk-update endpoint"""
+    class Meta(CattleSerializer.Meta):
+        fields = [
+            'breed', 'birth_date', 'gender', 'life_stage',
+            'dam_id', 'sire_id', 'is_purchased', 'purchase_date', 'purchase_source',
+            'last_insemination_date', 'last_calving_date', 'expected_insemination_date',
+            'health_status', 'milking_frequency', 'custom_milking_times'
+        ]
+
 class InseminationSerializer(serializers.ModelSerializer):
     cattle_details = CattleSerializer(source='cattle', read_only=True)
     pregnancy_check_date = serializers.DateField(
@@ -136,6 +152,8 @@ class BirthRecordSerializer(serializers.ModelSerializer):
 
         # Validate ear tag format and uniqueness
         ear_tags = data.get('calf_ear_tag', '').split(',')
+        if len({ear_tag.strip() for ear_tag in ear_tags}) != len(ear_tags):
+            raise serializers.ValidationError("Each calf needs a different ear tag")
         for ear_tag in ear_tags:
             ear_tag = ear_tag.strip()
             if Cattle.objects.filter(ear_tag_no=ear_tag).exists():
@@ -155,11 +173,21 @@ class AlertSerializer(serializers.ModelSerializer):
         model = Alert
         fields = [
             'id', 'title', 'description', 'date', 'type', 'priority',
-            'read', 'source_type', 'source_id', 'metadata',
+            'read', 'source_type', 'source_id', 'metadata', 'rule', 'due_date',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
+class AlertArchiveSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AlertArchive
+        fields = [
+            'id', 'alert_id', 'cattle', 'cattle_ear_tag', 'title', 'description', 'date', 'type',
+            'priority', 'rule', 'source_type', 'source_id', 'metadata', 'due_date',
+            'created_at', 'read_at', 'archived_at'
+        ]
+        read_only_fields = fields
+
 class FarmSerializer(serializers.ModelSerializer):
     class Meta:
         model = Farm
@@ -0,0 +1,224 @@
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .images import schedule_image_variants
+from .gestation import bump_version as bump_gestation_version
+from .models import (
+    Alert, BirthRecord, Cattle, CollectionTombstone, GestationCheck, GestationMilestone, HerdSummary, Insemination,
+    PeriodicTreatmentRecord, PeriodicVaccinationRecord, TreatmentRecord, VaccinationRecord, alerts_created,
+    alerts_refreshed,
+)
+from .notifications import email_new_alerts
+from .realtime import broadcast_alerts
+
+# Cattle fields that feed the herd summary counters
+SUMMARY_FIELDS = ['farm_id', 'life_stage', 'gestation_status', 'health_status', 'gender', 'last_calving_date']
+
+
+def summary_values(cattle):
+    return {field: getattr(cattle, field) for field in SUMMARY_FIELDS}
+
+
+@receiver(post_save, sender=Cattle)
+def update_herd_summary_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(SUMMARY_FIELDS + ['farm']):
+        # Narrow saves (e.g. milk averages) can't move any counter
+        return
+
+    new = summary_values(instance)
+    if created:
+        HerdSummary.apply_delta(new['farm_id'], Counter(HerdSummary.columns_for(new)))
+        return
+
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None:
+        # Saved without being loaded first: we cannot diff, so recount
+        HerdSummary.rebuild(new['farm_id'])
+        return
+
+    old = {field: loaded.get(field, new[field]) for field in SUMMARY_FIELDS}
+    if old == new:
+        return
+
+    removed = Counter(HerdSummary.columns_for(old))
+    added = Counter(HerdSummary.columns_for(new))
+    if old['farm_id'] != new['farm_id']:
+        HerdSummary.apply_delta(old['farm_id'], {column: -n for column, n in removed.items()})
+        # The animal and its records left the old farm's lists
+        CollectionTombstone.mark_many(
+            (old['farm_id'], collection) for collection, _ in CollectionTombstone.COLLECTION_CHOICES
+        )
+        Alert.objects.filter(cattle=instance).update(farm_id=new['farm_id'], updated_at=timezone.now())
+        unread_keys = [Alert.unread_count_key(old['farm_id']), Alert.unread_count_key(new['farm_id'])]
+        transaction.on_commit(lambda: cache.delete_many(unread_keys))
+        HerdSummary.apply_delta(new['farm_id'], added)
+    else:
+        added.subtract(removed)
+        HerdSummary.apply_delta(new['farm_id'], added)
+
+
+@receiver(post_delete, sender=Cattle)
+def update_herd_summary_on_delete(sender, instance, **kwargs):
+    values = summary_values(instance)
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is not None:
+        values.update({field: loaded[field] for field in SUMMARY_FIELDS if field in loaded})
+    removed = Counter(HerdSummary.columns_for(values))
+    HerdSummary.apply_delta(values['farm_id'], {column: -n for column, n in removed.items()})
+
+
+# Collections with deletes not yet recorded in CollectionTombstone, per thread:
+# (farm_id, collection) pairs, and collection -> cattle ids for records that
+# only know their cattle. The first on_commit callback of a transaction writes
+# them all, so a cascade over many rows costs one upsert; the callbacks after
+# it find nothing left to do.
+_pending_tombstones = threading.local()
+
+
+def pending_tombstones():
+    if not hasattr(_pending_tombstones, 'farms'):
+        _pending_tombstones.farms = set()
+        _pending_tombstones.cattle = {}
+    return _pending_tombstones
+
+
+def flush_tombstones():
+    pending = pending_tombstones()
+    marks, by_cattle = pending.farms, pending.cattle
+    pending.farms, pending.cattle = set(), {}
+    cattle_ids = set().union(*by_cattle.values())
+    if cattle_ids:
+        farm_of = dict(Cattle.objects.filter(pk__in=cattle_ids).values_list('id', 'farm_id'))
+        # Cattle gone by now were deleted with their records and marked every collection
+        marks |= {
+            (farm_of[cattle_id], collection)
+            for collection, ids in by_cattle.items() for cattle_id in ids if cattle_id in farm_of
+        }
+    CollectionTombstone.mark_many(marks)
+
+
+def defer_tombstone(collection, farm_id=None, cattle_id=None):
+    """Mark ``collection`` of the farm (or of the cattle's farm) after commit."""
+    pending = pending_tombstones()
+    if farm_id is not None:
+        pending.farms.add((farm_id, collection))
+    elif cattle_id is not None:
+        pending.cattle.setdefault(collection, set()).add(cattle_id)
+    else:
+        return
+    transaction.on_commit(flush_tombstones)
+
+
+@receiver(post_delete, sender=Cattle)
+def mark_cattle_deleted(sender, instance, **kwargs):
+    # The animal's alerts, birth records and inseminations go with it
+    for collection, _ in CollectionTombstone.COLLECTION_CHOICES:
+        defer_tombstone(collection, farm_id=instance.farm_id)
+
+
+@receiver(post_delete, sender=Alert, dispatch_uid='mark_alert_deleted')
+@receiver(post_delete, sender=BirthRecord, dispatch_uid='mark_birth_record_deleted')
+@receiver(post_delete, sender=Insemination, dispatch_uid='mark_insemination_deleted')
+def mark_record_deleted(sender, instance, **kwargs):
+    collection = {Alert: 'alerts', BirthRecord: 'birth_records', Insemination: 'inseminations'}[sender]
+    defer_tombstone(collection, farm_id=getattr(instance, 'farm_id', None), cattle_id=instance.cattle_id)
+
+
+@receiver(post_save, sender=Alert, dispatch_uid='count_new_unread_alert')
+def count_new_unread_alert(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.read:
+        Alert.adjust_unread_count(instance.farm_id, 1)
+
+
+@receiver(post_save, sender=Alert, dispatch_uid='push_new_alert')
+def push_new_alert(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        broadcast_alerts(alert_ids=[instance.pk])
+
+
+@receiver(alerts_created, sender=Alert, dispatch_uid='push_upserted_alerts')
+def push_upserted_alerts(sender, alerts, **kwargs):
+    broadcast_alerts(dedup_keys=[alert.dedup_key for alert in alerts])
+
+
+@receiver(post_save, sender=Alert, dispatch_uid='email_new_alert')
+def email_new_alert(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        email_new_alerts(alert_ids=[instance.pk])
+
+
+@receiver(alerts_created, sender=Alert, dispatch_uid='email_upserted_alerts')
+def email_upserted_alerts(sender, alerts, **kwargs):
+    email_new_alerts(dedup_keys=[alert.dedup_key for alert in alerts])
+
+
+@receiver(post_delete, sender=Alert, dispatch_uid='uncount_deleted_unread_alert')
+def uncount_deleted_unread_alert(sender, instance, **kwargs):
+    if not instance.read:
+        Alert.adjust_unread_count(instance.farm_id, -1)
+
+
+@receiver(post_save, sender=Cattle, dispatch_uid='cattle_photo_variants')
+def generate_cattle_photo_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_image_variants(instance, 'photo', 'photo_variants')
+
+
+# Everything the gestation dashboard shows for a cow
+GESTATION_RECORDS = [
+    Insemination, GestationCheck, GestationMilestone, TreatmentRecord, VaccinationRecord,
+    PeriodicTreatmentRecord, PeriodicVaccinationRecord,
+]
+
+
+@receiver(post_save, sender=Cattle, dispatch_uid='cattle_saved_gestation_dashboard')
+@receiver(post_delete, sender=Cattle, dispatch_uid='cattle_deleted_gestation_dashboard')
+def invalidate_gestation_dashboard_for_cattle(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    bump_gestation_version(instance.farm_id, loaded.get('farm_id'))
+
+
+@receiver(post_save, sender=Alert, dispatch_uid='alert_saved_gestation_dashboard')
+def invalidate_gestation_dashboard_for_alert(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_gestation_version(instance.farm_id)
+
+
+@receiver(post_delete, sender=Alert, dispatch_uid='alert_deleted_gestation_dashboard')
+def invalidate_gestation_dashboard_for_deleted_alert(sender, instance, **kwargs):
+    # The dashboard only lists unread alerts; archiving read ones changes nothing
+    if not instance.read:
+        bump_gestation_version(instance.farm_id)
+
+
+@receiver(alerts_created, sender=Alert, dispatch_uid='alerts_upserted_gestation_dashboard')
+@receiver(alerts_refreshed, sender=Alert, dispatch_uid='alerts_refreshed_gestation_dashboard')
+def invalidate_gestation_dashboard_for_upsert(sender, alerts, **kwargs):
+    bump_gestation_version(*{alert.farm_id for alert in alerts})
+
+
+def invalidate_gestation_dashboard_for_record(sender, instance, raw=False, **kwargs):
+    if raw or not instance.cattle_id:
+        return
+    bump_gestation_version(Cattle.objects.filter(pk=instance.cattle_id).values_list('farm_id', flat=True).first())
+
+
+for model in GESTATION_RECORDS:
+    post_save.connect(
+        invalidate_gestation_dashboard_for_record, sender=model,
+        dispatch_uid=f'{model._meta.model_name}_saved_gestation_dashboard',
+    )
+    post_delete.connect(
+        invalidate_gestation_dashboard_for_record, sender=model,
+        dispatch_uid=f'{model._meta.model_name}_deleted_gestation_dashboard',
+    )
@@ -0,0 +1,53 @@
+from celery import shared_task
+from django.conf import settings
+from .alerts import sweep_all_farms
+from .models import Alert, AlertArchive, Cattle, OutboundEmail
+from .notifications import send_alert_digests
+
+@shared_task
+def refresh_cattle_status():
+    """
+    Nightly Celery task that recomputes time-dependent cattle fields
+    (life stage, gestation status/stage, expected dates) for every farm.
+    """
+    return Cattle.refresh_time_dependent_fields()
+
+@shared_task
+def sweep_farm_alerts():
+    """
+    Daily Celery task that evaluates every alert rule for every farm and
+    creates only the alerts that do not exist yet.
+    """
+    return sweep_all_farms()
+
+@shared_task
+def reconcile_unread_alert_counts():
+    """
+    Periodic Celery task that recounts every farm's cached unread alert
+    counter from the database, correcting any drift.
+    """
+    return Alert.reconcile_unread_counts()
+
+@shared_task
+def archive_read_alerts():
+    """
+    Nightly Celery task that moves alerts read more than
+    ALERT_RETENTION_DAYS ago from the live table into AlertArchive.
+    """
+    return AlertArchive.archive_read_alerts(settings.ALERT_RETENTION_DAYS)
+
+@shared_task
+def send_queued_emails():
+    """
+    Frequent Celery task that delivers due emails from the outbox over one
+    connection per batch; failed sends are retried with backoff.
+    """
+    return OutboundEmail.drain()
+
+@shared_task
+def send_alert_digest_emails():
+    """
+    Hourly Celery task that queues the hourly and daily alert digests that
+    are due and advances each user's digest watermark.
+    """
+    return send_alert_digests()
@@ -1,3 +1,791 @@
-from django.test import TestCase
+import re
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from milk_tracker.models import Milk_record
+from userauth.models import User
+
+from .alerts import sweep_alerts
+from .authentication import user_for_token
+from .farm_calendar import ICAL_LINE_OCTETS, farm_events, ical_line
+from .gestation import gestation_dashboard
+from .models import (
+    Alert, AlertArchive, BirthRecord, Cattle, CollectionTombstone, Farm, GestationMilestone, HerdSummary, Insemination,
+    OutboundEmail, PeriodicVaccinationRecord,
+)
+from .notifications import DIGEST_COMMIT_LAG, send_alert_digests
+from .views import BULK_UPDATE_LIMIT
+
+GESTATION_STATUSES = ['not_pregnant', 'pregnant', 'calving', 'dry_off']
+EXPLAIN = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+SEEK_PATTERNS = {
+    'sqlite': r'{index} \(farm_id=\? AND {column}<\?\)',
+    'postgresql': r'{index}[\s\S]*Index Cond: .*{column} <',
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE'),
+    'postgresql': re.compile(r'\bSort\b'),
+}
+
+
+def add_cow(farm, ear_tag, gestation_status='not_pregnant', **fields):
+    cow = Cattle.objects.create(
+        farm=farm, ear_tag_no=ear_tag, gender='female', life_stage='cow',
+        birth_date=timezone.now().date() - timedelta(days=1500), **fields,
+    )
+    # save() derives the status from the insemination date; set it as a check would
+    Cattle.objects.filter(pk=cow.pk).update(gestation_status=gestation_status)
+    return cow
+
+
+class FarmAPITestCase(TestCase):
+    """A farm with a signed-in user of it."""
+
+    def setUp(self):
+        self.farm = Farm.objects.create(name=f'{type(self).__name__} farm', location='test', contact='test')
+        self.user = User.objects.create_user(
+            email='farmer@example.com', username='farmer', password='farmer', farm=self.farm
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = timezone.now().date()
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    The farm-scoped list queries must be answered by the index built for them.
+
+    Each test runs a real endpoint, EXPLAINs the SQL it sent and checks that
+    the plan of every matching query names the expected index and, unless
+    the query filters on an IN list, reads it in order without a sort step.
+    Dropping or reshaping one of these indexes fails here, even though the
+    foreign-key indexes would still keep the queries off a full table scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.now().date()
+        farms = Farm.objects.bulk_create([
+            Farm(name=f'Plan farm {n}', location='test', contact='test') for n in range(3)
+        ])
+        Cattle.objects.bulk_create([
+            Cattle(
+                farm=farm,
+                ear_tag_no=f'PLAN-{farm.pk}-{n}',
+                gender='female',
+                life_stage='cow',
+                birth_date=today - timedelta(days=900 + n),
+                last_calving_date=today - timedelta(days=10 + n),
+                gestation_status=GESTATION_STATUSES[n % len(GESTATION_STATUSES)],
+                expected_calving_date=today + timedelta(days=n % 280),
+                expected_insemination_date=today + timedelta(days=n % 60),
+            )
+            for farm in farms for n in range(40)
+        ])
+        cattle = list(Cattle.objects.filter(farm__in=farms).order_by('id'))
+        Alert.objects.bulk_create([
+            Alert(
+                cattle=cow, farm_id=cow.farm_id, title='Plan alert', description='test',
+                priority=('low', 'medium', 'high')[n], read=bool((cow.pk + n) % 2),
+            )
+            for cow in cattle for n in range(3)
+        ])
+        Insemination.objects.bulk_create([
+            Insemination(
+                cattle=cow, insemination_date=today - timedelta(days=index % 60),
+                pregnancy_check_status=('pending', 'confirmed', 'negative')[index % 3],
+            )
+            for index, cow in enumerate(cattle)
+        ])
+        Milk_record.objects.bulk_create([
+            Milk_record(
+                cattle_tag=cow, ear_tag_no=cow.ear_tag_no, quantity=10,
+                date=today - timedelta(days=day), shift='morning',
+            )
+            for cow in cattle for day in range(3)
+        ])
+        cls.farm = farms[0]
+        cls.cow = cattle[0]
+        cls.user = User.objects.create_user(
+            email='plans@example.com', username='plans', password='plans', farm=cls.farm
+        )
+        # Planner statistics, as a database in use has them
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        if connection.vendor not in EXPLAIN:
+            self.skipTest(f'No plan checks for {connection.vendor}')
+        if connection.vendor == 'postgresql':
+            # Make any plan that cannot use the index in order visibly worse
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(EXPLAIN[connection.vendor] + sql)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assertPlansUse(self, url, checks):
+        """
+        GET ``url`` and check its queries. ``checks`` are (pattern, index,
+        sort allowed) triples; the plan of every query matching the pattern
+        must match ``index`` (an index name, or a regex over the plan), and at
+        least one query must match each pattern.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+
+        for pattern, index, sort_allowed in checks:
+            matched = [query['sql'] for query in queries if re.search(pattern, query['sql'])]
+            self.assertTrue(matched, f'{url} sent no query matching {pattern}')
+            for sql in matched:
+                plan = self.explain(sql)
+                self.assertRegex(plan, index, f'{url} does not use {index}:\n{sql}\n{plan}')
+                if not sort_allowed:
+                    self.assertIsNone(
+                        SORT_PATTERNS[connection.vendor].search(plan),
+                        f'{url} sorts instead of reading {index} in order:\n{sql}\n{plan}'
+                    )
+
+    def test_cattle_list_page(self):
+        self.assertPlansUse(f"{reverse('list_cattle')}?page_size=20", [
+            (r'FROM "core_cattle" WHERE .*ORDER BY "core_cattle"."created_at" DESC', 'cattle_farm_created_id_idx', False),
+        ])
+
+    def test_cattle_list_deep_page(self):
+        first = self.client.get(f"{reverse('list_cattle')}?page_size=20").json()
+        self.assertPlansUse(f"{reverse('list_cattle')}?page_size=20&cursor={first['next_cursor']}", [
+            (r'FROM "core_cattle" WHERE .*"core_cattle"."created_at" <= .*ORDER BY "core_cattle"."created_at" DESC',
+             # The cursor must bound the index range, not be filtered row by row
+             SEEK_PATTERNS[connection.vendor].format(index='cattle_farm_created_id_idx', column='created_at'), False),
+        ])
+
+    def test_calendar_expected_dates(self):
+        self.assertPlansUse(f"{reverse('get_farm_calendar')}?types=expected_calving,expected_insemination", [
+            # Several status ranges of each index, so their rows are merged with a sort
+            (r'ORDER BY "core_cattle"."expected_calving_date"', 'cattle_farm_gest_calving_idx', True),
+            (r'ORDER BY "core_cattle"."expected_insemination_date"', 'cattle_farm_gest_insem_idx', True),
+        ])
+
+    def test_alert_list_by_priority(self):
+        self.assertPlansUse(f"{reverse('list_alerts')}?page=2&page_size=20", [
+            (r'GROUP BY "core_alert"."priority"', 'alert_farm_priority_idx', False),
+            (r'FROM "core_alert" WHERE .*ORDER BY "core_alert"."created_at" DESC', 'alert_farm_priority_idx', False),
+        ])
+
+    def test_unread_alert_list_by_priority(self):
+        self.assertPlansUse(f"{reverse('list_alerts')}?read=false&page_size=20", [
+            (r'GROUP BY "core_alert"."priority"', 'alert_farm_unread_priority_idx', False),
+            (r'FROM "core_alert" WHERE .*ORDER BY "core_alert"."created_at" DESC', 'alert_farm_unread_priority_idx', False),
+        ])
+
+    def test_alert_list_of_one_priority(self):
+        self.assertPlansUse(f"{reverse('list_alerts')}?read=false&priority=high&page_size=20", [
+            (r'FROM "core_alert" WHERE .*ORDER BY "core_alert"."created_at" DESC', 'alert_farm_unread_priority_idx', False),
+        ])
+
+    def test_unread_alerts_of_an_animal(self):
+        self.assertPlansUse(reverse('generate_cattle_alerts', args=[self.cow.pk]), [
+            (r'FROM "core_alert" WHERE \("core_alert"."cattle_id" = \d+ AND NOT "core_alert"."read"\)',
+             'alert_cattle_unread_idx', False),
+        ])
+
+    def test_gestation_dashboard_unread_alerts(self):
+        self.assertPlansUse(reverse('list_gestation_data'), [
+            # One prefetch for all the farm's pregnant cattle, sorted across them
+            (r'FROM "core_alert" WHERE \(NOT "core_alert"."read" AND "core_alert"."cattle_id" IN',
+             'alert_cattle_unread_idx', True),
+        ])
+
+    def test_pending_pregnancy_checks(self):
+        self.assertPlansUse(reverse('get_pending_pregnancy_checks'), [
+            (r'FROM "core_insemination" INNER JOIN', 'insemination_cattle_check_idx', False),
+        ])
+
+    def test_farm_milk_for_a_day(self):
+        self.assertPlansUse(reverse('get_today_production_stats'), [
+            (r'FROM "milk_tracker_milk_record" INNER JOIN', 'milk_record_date_cattle_idx', False),
+        ])
+
+
+class CalvingHistoryTests(TestCase):
+    def setUp(self):
+        self.farm = Farm.objects.create(name='Calving farm', location='test', contact='test')
+        self.cow = Cattle.objects.create(
+            farm=self.farm, ear_tag_no='CALV-1', gender='female', life_stage='cow',
+            birth_date=date(2018, 1, 1),
+        )
+
+    def test_recompute_and_history(self):
+        # bulk_create skips the save hooks, so the stats only come from the recompute
+        BirthRecord.objects.bulk_create([
+            BirthRecord(cattle=self.cow, calving_date=date(2022, 3, 1), calving_outcome='successful',
+                        calf_gender='female', calf_ear_tag='CALV-1-A'),
+            BirthRecord(cattle=self.cow, calving_date=date(2021, 1, 1), calving_outcome='successful',
+                        calf_gender='male', calf_ear_tag='CALV-1-B'),
+            BirthRecord(cattle=self.cow, calving_date=date(2023, 7, 1), calving_outcome='stillborn',
+                        calf_gender='male', calf_ear_tag='CALV-1-C'),
+        ])
+
+        self.assertEqual(Cattle.recompute_calving_stats(farm=self.farm), 1)
+        self.assertEqual(Cattle.recompute_calving_stats(farm=self.farm), 0)
+
+        self.cow.refresh_from_db()
+        history = self.cow.get_calving_history()
+        self.assertEqual(history['total_calvings'], 3)
+        self.assertEqual(history['current_lactation'], 3)
+        self.assertEqual(history['first_calving_date'], date(2021, 1, 1))
+        self.assertEqual(history['average_interval'], (date(2023, 7, 1) - date(2021, 1, 1)).days / 2)
+        self.assertEqual(
+            [(record['calving_date'], record['calf_details']['ear_tag']) for record in history['records']],
+            [(date(2021, 1, 1), 'CALV-1-B'), (date(2022, 3, 1), 'CALV-1-A'), (date(2023, 7, 1), 'CALV-1-C')],
+        )
+
+    def test_history_without_calvings(self):
+        history = self.cow.get_calving_history()
+        self.assertEqual(history['total_calvings'], 0)
+        self.assertIsNone(history['average_interval'])
+        self.assertEqual(history['records'], [])
+
+
+class AlertSweepTests(TestCase):
+    def setUp(self):
+        self.farm = Farm.objects.create(name='Sweep farm', location='test', contact='test')
+        self.today = timezone.now().date()
+
+    def test_insemination_due_for_every_open_status(self):
+        due = self.today + timedelta(days=3)
+        open_cows = {
+            status: add_cow(self.farm, f'OPEN-{status}', gestation_status=status, expected_insemination_date=due)
+            for status in Cattle.OPEN_GESTATION_STATUSES
+        }
+        add_cow(self.farm, 'PREGNANT', gestation_status='pregnant', expected_insemination_date=due)
+
+        sweep_alerts(self.farm, self.today)
+
+        self.assertCountEqual(
+            Alert.objects.filter(farm=self.farm, rule='insemination_due').values_list('cattle_id', flat=True),
+            [cow.pk for cow in open_cows.values()],
+        )
+
+    def test_sweep_again_creates_nothing(self):
+        cow = add_cow(self.farm, 'DUE', expected_insemination_date=self.today + timedelta(days=3))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(len(sweep_alerts(self.farm, self.today)), 1)
+        Alert.objects.filter(cattle=cow).update(read=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(sweep_alerts(self.farm, self.today), [])
+
+        # The alert raised again keeps its read state
+        self.assertEqual(list(Alert.objects.filter(cattle=cow).values_list('rule', 'read')), [('insemination_due', True)])
+
+    def test_upsert_refreshes_existing_alert(self):
+        cow = add_cow(self.farm, 'UPSERT')
+
+        def alert(title):
+            return Alert(cattle=cow, rule='test_rule', title=title, description='test',
+                         due_date=self.today, priority='low')
+
+        self.assertEqual(len(Alert.upsert([alert('First'), alert('Same key')])), 1)
+        self.assertEqual(Alert.upsert([alert('Raised again')]), [])
+
+        [stored] = Alert.objects.filter(cattle=cow)
+        self.assertEqual((stored.title, stored.farm_id), ('Raised again', self.farm.pk))
+
+    def test_archived_alert_not_raised_again(self):
+        cow = add_cow(self.farm, 'ARCHIVED', expected_insemination_date=self.today + timedelta(days=3))
+        sweep_alerts(self.farm, self.today)
+        Alert.objects.filter(cattle=cow).update(read=True, updated_at=timezone.now() - timedelta(days=40))
+        self.assertEqual(AlertArchive.archive_read_alerts(older_than_days=30), 1)
+
+        self.assertEqual(sweep_alerts(self.farm, self.today), [])
+        self.assertFalse(Alert.objects.filter(cattle=cow).exists())
+
+
+class FarmCalendarTests(TestCase):
+    def setUp(self):
+        self.farm = Farm.objects.create(name='Calendar farm', location='test', contact='test')
+        self.today = timezone.now().date()
+
+    def test_insemination_events_for_every_open_status(self):
+        due = self.today + timedelta(days=3)
+        open_cows = [
+            add_cow(self.farm, f'OPEN-{status}', status, expected_insemination_date=due)
+            for status in Cattle.OPEN_GESTATION_STATUSES
+        ]
+        add_cow(self.farm, 'PREGNANT', 'pregnant', expected_insemination_date=due)
+
+        events = farm_events(self.farm, self.today, due, types=['expected_insemination'])
+
+        self.assertEqual([item['cattle_id'] for item in events], [cow.pk for cow in open_cows])
+
+    def add_events(self):
+        """One event of each kind, on days that interleave the sources."""
+        def day(n):
+            return self.today + timedelta(days=n)
+
+        pregnant = add_cow(self.farm, 'CAL-PREGNANT', 'pregnant', last_insemination_date=day(2) - timedelta(days=280))
+        # Only the milestones made below
+        GestationMilestone.objects.filter(cattle=pregnant).delete()
+        GestationMilestone.objects.bulk_create([
+            GestationMilestone(cattle=pregnant, milestone_type='health_check', due_date=day(5), description='Late check'),
+            GestationMilestone(cattle=pregnant, milestone_type='vaccination', due_date=day(1), description='Early shot'),
+        ])
+        add_cow(self.farm, 'CAL-OPEN', expected_insemination_date=day(3))
+        vet = User.objects.create_user(email='vet@example.com', username='vet', password='vet', farm=self.farm)
+        PeriodicVaccinationRecord.objects.create(
+            cattle=pregnant, veterinarian=vet, vaccination_name='Brucellosis',
+            last_vaccination_date=day(-26), interval_days=30,
+        )
+        PeriodicVaccinationRecord.objects.create(
+            veterinarian=vet, vaccination_name='Anthrax', is_farm_wide=True,
+            last_vaccination_date=day(-29), interval_days=30,
+        )
+        return day
+
+    def test_events_merged_in_date_order(self):
+        day = self.add_events()
+
+        events = list(farm_events(self.farm, self.today, day(30)))
+
+        self.assertEqual([(item['date'], item['type']) for item in events], [
+            (day(1), 'gestation_milestone'),
+            (day(1), 'periodic_vaccination'),
+            (day(2), 'expected_calving'),
+            (day(3), 'expected_insemination'),
+            (day(4), 'periodic_vaccination'),
+            (day(5), 'gestation_milestone'),
+        ])
+        self.assertEqual(list(farm_events(self.farm, day(2), day(3))), events[2:4])
+
+    def test_ical_lines_folded(self):
+        day = self.add_events()
+        GestationMilestone.objects.filter(due_date=day(5)).update(description='Kälberkontrolle und Übergabe, ' * 8)
+        user = User.objects.create_user(email='ical@example.com', username='ical', password='ical', farm=self.farm)
+        token = Token.objects.create(user=user).key
+
+        response = self.client.get(f"{reverse('farm_calendar_ics')}?token={token}")
+
+        self.assertEqual(response.status_code, 200)
+        document = b''.join(response.streaming_content)
+        self.assertTrue(document.endswith(b'END:VCALENDAR\r\n'))
+        lines = document.split(b'\r\n')[:-1]
+        self.assertTrue(all(len(line) <= ICAL_LINE_OCTETS for line in lines))
+        # Unfolding gives back whole UTF-8 lines
+        unfolded = document.decode().replace('\r\n ', '').split('\r\n')
+        self.assertEqual(sum(line == 'BEGIN:VEVENT' for line in unfolded), 6)
+        self.assertIn('DESCRIPTION:' + 'Kälberkontrolle und Übergabe\\, ' * 8, unfolded)
+
+    def test_ical_line(self):
+        self.assertEqual(ical_line('SUMMARY:short'), 'SUMMARY:short\r\n')
+        line = 'DESCRIPTION:' + 'ü' * 100
+        folded = ical_line(line)
+        parts = folded[:-2].split('\r\n')
+        # Two-octet characters: the first line stops at 74 rather than split one
+        self.assertEqual([len(part.encode()) for part in parts], [74, 75, 65])
+        self.assertEqual(folded[:-2].replace('\r\n ', ''), line)
+
+
+class QueryTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        self.farm = Farm.objects.create(name='Token farm', location='test', contact='test')
+        self.user = User.objects.create_user(
+            email='token@example.com', username='token', password='token', farm=self.farm
+        )
+        self.tokens = {
+            'drf': Token.objects.create(user=self.user).key,
+            'jwt': str(RefreshToken.for_user(self.user).access_token),
+        }
+
+    def test_active_user(self):
+        for kind, token in self.tokens.items():
+            with self.subTest(kind):
+                self.assertEqual(user_for_token(token), self.user)
+                response = self.client.get(f"{reverse('farm_calendar_ics')}?token={token}")
+                self.assertEqual(response.status_code, 200)
+
+    def test_inactive_user(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        for kind, token in self.tokens.items():
+            with self.subTest(kind):
+                self.assertIsInstance(user_for_token(token), AnonymousUser)
+                response = self.client.get(f"{reverse('farm_calendar_ics')}?token={token}")
+                self.assertEqual(response.status_code, 401)
+
+    def test_unknown_token(self):
+        self.assertIsInstance(user_for_token('not-a-token'), AnonymousUser)
+
+
+class OutboundEmailTests(TestCase):
+    def setUp(self):
+        self.email = OutboundEmail.queue('Subject', 'Body', ['farmer@example.com'])
+
+    def make_due(self):
+        OutboundEmail.objects.filter(pk=self.email.pk).update(next_attempt_at=timezone.now())
+
+    def test_send(self):
+        self.assertEqual(OutboundEmail.send_due(), (1, 0))
+        self.assertEqual(OutboundEmail.send_due(), (0, 0))
+
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts), ('sent', 1))
+        self.assertEqual([message.to for message in mail.outbox], [['farmer@example.com']])
+
+    def test_connection_down_until_given_up(self):
+        with mock.patch('django.core.mail.get_connection', side_effect=OSError('Connection refused')):
+            for attempt in range(1, OutboundEmail.MAX_ATTEMPTS + 1):
+                with self.assertLogs('core.models', 'ERROR'):
+                    self.assertEqual(OutboundEmail.send_due(), (0, 1))
+                self.email.refresh_from_db()
+                self.assertEqual(self.email.attempts, attempt)
+                self.assertEqual(self.email.last_error, 'Connection refused')
+                if attempt < OutboundEmail.MAX_ATTEMPTS:
+                    self.assertEqual(self.email.status, 'pending')
+                    self.assertGreater(self.email.next_attempt_at, timezone.now())
+                    self.make_due()
+
+        self.assertEqual(self.email.status, 'failed')
+        self.assertEqual(OutboundEmail.send_due(), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+    def test_retry_after_connection_comes_back(self):
+        with mock.patch('django.core.mail.get_connection', side_effect=OSError('Connection refused')):
+            with self.assertLogs('core.models', 'ERROR'):
+                OutboundEmail.send_due()
+        # Not due again before the backoff has passed
+        self.assertEqual(OutboundEmail.send_due(), (0, 0))
+
+        self.make_due()
+        self.assertEqual(OutboundEmail.send_due(), (1, 0))
+        self.email.refresh_from_db()
+        self.assertEqual((self.email.status, self.email.attempts, self.email.last_error), ('sent', 2, ''))
+
+
+@override_settings(CACHES={'default': {
+    # Any cache shared between processes; file-based needs no server
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': tempfile.mkdtemp(prefix='gestation-cache-'),
+}})
+class GestationDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.farm = Farm.objects.create(name='Gestation farm', location='test', contact='test')
+        today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cow = Cattle.objects.create(
+                farm=self.farm, ear_tag_no='GEST-1', gender='female', life_stage='cow',
+                birth_date=today - timedelta(days=1500), last_insemination_date=today - timedelta(days=100),
+            )
+
+    def raise_alert(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            Alert.upsert([Alert(
+                cattle=self.cow, farm_id=self.farm.pk, rule='test_rule', title=title, description='test',
+                due_date=timezone.now().date(), priority='high',
+            )])
+
+    def alert_titles(self):
+        [item] = gestation_dashboard(self.farm)['results']
+        return [alert['title'] for alert in item['alerts']]
+
+    def test_cached_until_changed(self):
+        self.raise_alert('First')
+        self.assertEqual(self.alert_titles(), ['First'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.alert_titles(), ['First'])
+
+    def test_refreshed_alert_rebuilds(self):
+        self.raise_alert('First')
+        self.assertEqual(self.alert_titles(), ['First'])
+
+        self.raise_alert('Raised again')
+
+        self.assertEqual(Alert.objects.filter(cattle=self.cow).count(), 1)
+        self.assertEqual(self.alert_titles(), ['Raised again'])
+
+
+class UnreadAlertCountTests(FarmAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cow = add_cow(self.farm, 'UNREAD')
+        # Start from the alerts below only, counted from the table
+        Alert.objects.filter(cattle=cow).delete()
+        cache.clear()
+        # One transaction: the push after commit runs between the alerts' deltas
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alerts = [
+                Alert.objects.create(cattle=cow, title=f'Alert {n}', description='test', priority='low')
+                for n in range(4)
+            ]
+
+    def unread_count(self):
+        return self.client.get(reverse('get_unread_alert_count')).json()['count']
+
+    def assertCounted(self, count):
+        self.assertEqual(self.unread_count(), count)
+        # Served from the counter, which the deltas kept equal to the table
+        self.assertEqual(cache.get(Alert.unread_count_key(self.farm.pk)), count)
+        self.assertEqual(Alert.objects.filter(farm=self.farm, read=False).count(), count)
+
+    def test_deltas(self):
+        self.assertCounted(4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('mark_alert_as_read', args=[self.alerts[0].pk]))
+        self.assertCounted(3)
+
+        # Reading it again moves nothing
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('mark_alert_as_read', args=[self.alerts[0].pk]))
+        self.assertCounted(3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('delete_alert', args=[self.alerts[0].pk]))
+            self.client.delete(reverse('delete_alert', args=[self.alerts[1].pk]))
+        self.assertCounted(2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('mark_all_alerts_as_read'))
+        self.assertCounted(0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Alert.objects.create(cattle=self.alerts[0].cattle, title='New', description='test', priority='low')
+        self.assertCounted(1)
+
+    def test_not_counted_before_commit(self):
+        self.assertCounted(4)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse('mark_all_alerts_as_read'))
+        self.assertEqual(cache.get(Alert.unread_count_key(self.farm.pk)), 4)
+        for callback in callbacks:
+            callback()
+        self.assertCounted(0)
+
+
+class HerdSummaryTests(FarmAPITestCase):
+    def assertSummaryMatchesHerd(self):
+        summary = HerdSummary.objects.get(farm=self.farm)
+        counted = Cattle.objects.filter(farm=self.farm).aggregate(**HerdSummary.aggregates())
+        self.assertEqual({field: getattr(summary, field) for field in counted}, counted)
+        return summary
+
+    def test_deltas(self):
+        cow = add_cow(self.farm, 'SUMMARY-1', last_calving_date=self.today - timedelta(days=30))
+        Cattle.objects.create(
+            farm=self.farm, ear_tag_no='SUMMARY-2', gender='male', birth_date=self.today - timedelta(days=100),
+        )
+        summary = self.assertSummaryMatchesHerd()
+        self.assertEqual((summary.total, summary.gender_male, summary.active_milking), (2, 1, 1))
+
+        cow = Cattle.objects.get(pk=cow.pk)
+        cow.health_status = 'sick'
+        cow.gestation_status = 'dry_off'
+        cow.save()
+        summary = self.assertSummaryMatchesHerd()
+        self.assertEqual((summary.health_sick, summary.gestation_dry_off, summary.active_milking), (1, 1, 0))
+
+        # A save that moves no counter leaves the row alone
+        updated_at = summary.updated_at
+        Cattle.objects.get(pk=cow.pk).save()
+        self.assertEqual(HerdSummary.objects.get(farm=self.farm).updated_at, updated_at)
+
+        Cattle.objects.get(pk=cow.pk).delete()
+        summary = self.assertSummaryMatchesHerd()
+        self.assertEqual(summary.total, 1)
+
+        response = self.client.get(reverse('get_herd_summary')).json()
+        self.assertEqual((response['total'], response['active_milking']), (1, 0))
+
+    def test_move_to_another_farm(self):
+        other = Farm.objects.create(name='Other summary farm', location='test', contact='test')
+        cow = add_cow(self.farm, 'MOVED')
+        cow = Cattle.objects.get(pk=cow.pk)
+        cow.farm = other
+        with self.captureOnCommitCallbacks(execute=True):
+            cow.save()
+
+        self.assertEqual(HerdSummary.objects.get(farm=self.farm).total, 0)
+        self.assertEqual(HerdSummary.objects.get(farm=other).total, 1)
+
+
+class BulkUpdateCattleTests(FarmAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.cattle = [add_cow(self.farm, f'BULK-{n}') for n in range(3)]
+
+    def bulk_update(self, updates):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(reverse('bulk_update_cattle'), updates, format='json')
+
+    def test_update(self):
+        response = self.bulk_update([
+            {'id': self.cattle[0].pk, 'fields': {'health_status': 'sick'}},
+            {'id': self.cattle[1].pk, 'fields': {'breed': 'Boran', 'health_status': 'sick'}},
+        ])
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(
+            dict(Cattle.objects.filter(farm=self.farm).values_list('ear_tag_no', 'health_status')),
+            {'BULK-0': 'sick', 'BULK-1': 'sick', 'BULK-2': 'healthy'},
+        )
+        self.assertEqual(HerdSummary.objects.get(farm=self.farm).health_sick, 2)
+
+    def test_nothing_saved_unless_all_valid(self):
+        other = Farm.objects.create(name='Other bulk farm', location='test', contact='test')
+        stranger = add_cow(other, 'STRANGER')
+        response = self.bulk_update({'updates': [
+            {'id': self.cattle[0].pk, 'fields': {'health_status': 'sick'}},
+            {'id': self.cattle[1].pk, 'fields': {'health_status': 'not-a-status'}},
+            {'id': self.cattle[2].pk, 'fields': {'ear_tag_no': 'RENAMED'}},
+            {'id': self.cattle[0].pk, 'fields': {'breed': 'Boran'}},
+            {'id': stranger.pk, 'fields': {'health_status': 'sick'}},
+            {'fields': {'health_status': 'sick'}},
+        ]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['details']], [1, 2, 3, 4, 5])
+        self.assertFalse(Cattle.objects.filter(health_status='sick').exists())
+        self.assertFalse(Cattle.objects.filter(ear_tag_no='RENAMED').exists())
+
+    def test_rejects_empty_and_oversized_requests(self):
+        self.assertEqual(self.bulk_update([]).status_code, 400)
+        self.assertEqual(self.bulk_update({'updates': 'all'}).status_code, 400)
+        too_many = [{'id': self.cattle[0].pk, 'fields': {}}] * (BULK_UPDATE_LIMIT + 1)
+        self.assertEqual(self.bulk_update(too_many).status_code, 400)
+
+
+class AlertDigestTests(FarmAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.cow = add_cow(self.farm, 'DIGEST')
+        Alert.objects.filter(cattle=self.cow).delete()
+
+    def add_alert(self, title, age, priority='low', read=False):
+        alert = Alert.objects.create(
+            cattle=self.cow, title=title, description='test', priority=priority, read=read
+        )
+        Alert.objects.filter(pk=alert.pk).update(created_at=self.now - age)
+
+    def digest_bodies(self):
+        return [email.body for email in OutboundEmail.objects.filter(to=[self.user.email]).order_by('id')]
+
+    def test_watermark(self):
+        self.add_alert('Old news', timedelta(minutes=30))
+        self.add_alert('Already read', timedelta(minutes=20), read=True)
+        self.add_alert('Sent at once', timedelta(minutes=20), priority='high')
+        # May belong to a transaction that had not committed when the digest ran
+        self.add_alert('Just in', DIGEST_COMMIT_LAG / 2)
+
+        self.assertEqual(send_alert_digests(self.now), 1)
+        [body] = self.digest_bodies()
+        self.assertIn('Old news', body)
+        self.assertNotIn('Already read', body)
+        self.assertNotIn('Sent at once', body)
+        self.assertNotIn('Just in', body)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.alert_digest_sent_at, self.now - DIGEST_COMMIT_LAG)
+
+        # Not due again within the hour
+        self.assertEqual(send_alert_digests(self.now + timedelta(minutes=10)), 0)
+
+        self.assertEqual(send_alert_digests(self.now + timedelta(hours=1)), 1)
+        body = self.digest_bodies()[-1]
+        self.assertIn('Just in', body)
+        self.assertNotIn('Old news', body)
+
+    def test_nothing_new(self):
+        self.assertEqual(send_alert_digests(self.now), 0)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.alert_digest_sent_at, self.now - DIGEST_COMMIT_LAG)
+
+
+class KeysetPaginationTests(FarmAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cattle = [add_cow(self.farm, f'PAGE-{n}') for n in range(7)]
+        created = timezone.now() - timedelta(days=1)
+        # Three rows share a timestamp, so pages must break ties on id
+        for cow, offset in zip(cattle, [0, 1, 1, 1, 2, 3, 4]):
+            Cattle.objects.filter(pk=cow.pk).update(created_at=created - timedelta(hours=offset))
+
+    def test_round_trip(self):
+        ids, cursor, pages = [], None, 0
+        while True:
+            url = f"{reverse('list_cattle')}?page_size=3" + (f'&cursor={cursor}' if cursor else '')
+            page = self.client.get(url).json()
+            ids += [row['id'] for row in page['results']]
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, list(Cattle.objects.filter(farm=self.farm).order_by('-created_at', '-id')
+                                   .values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{reverse('list_cattle')}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+
+class ConditionalGetTests(FarmAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.cattle = [add_cow(self.farm, f'ETAG-{n}') for n in range(3)]
+
+    def get(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse('list_cattle'), **headers)
+
+    def test_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        Cattle.objects.get(pk=self.cattle[0].pk).save()
+        self.assertEqual(self.get(etag).status_code, 200)
+
+    def test_delete_leaves_tombstone(self):
+        etag = self.get()['ETag']
+        oldest = min(Cattle.objects.filter(farm=self.farm), key=lambda cow: cow.updated_at)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.delete(reverse('delete_cattle', args=[oldest.pk]))
+        self.assertFalse(CollectionTombstone.objects.filter(farm=self.farm, collection='cattle').exists())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(CollectionTombstone.objects.filter(farm=self.farm, collection='cattle').exists())
+
+        # A row added without moving the count or latest update: only the tombstone tells
+        replacement = add_cow(self.farm, 'ETAG-REPLACEMENT')
+        Cattle.objects.filter(pk=replacement.pk).update(updated_at=oldest.updated_at)
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get(response['ETag']).status_code, 304)
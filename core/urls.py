@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    list_cattle, list_pregnant_cattle, list_gestation_data, get_cattle_by_id, create_cattle, update_cattle, delete_cattle,
+    list_cattle, search_cattle_view, list_pregnant_cattle, bulk_update_cattle, list_gestation_data, get_cattle_by_id, create_cattle, update_cattle, delete_cattle,
     generate_cattle_alerts, list_inseminations, create_insemination, list_birth_records, create_birth_record,
     list_alerts, get_farms, create_farm,
     create_treatment_record, get_all_treatment_records, get_treatment_record_by_id, update_treatment_record, delete_treatment_record,
@@ -12,16 +12,20 @@ from .views import (
     get_cattle_health_records, get_pending_pregnancy_checks, update_insemination, delete_insemination,
     get_birth_record, update_birth_record, delete_birth_record, get_cattle_birth_history,
     get_cattle_gestation_timeline, create_gestation_check, update_milestone,
-    get_unread_alerts, mark_alert_as_read, mark_all_alerts_as_read, delete_alert,
+    get_unread_alerts, get_unread_alert_count, list_archived_alerts, mark_alert_as_read, mark_all_alerts_as_read, delete_alert,
+    get_herd_summary, get_reproduction_analytics, import_records, get_farm_calendar, farm_calendar_ics,
+    get_cattle_ancestors, get_cattle_descendants, get_mating_inbreeding,
 )
 
 urlpatterns = [
     # Cattle URLs
     path('cattle/', list_cattle, name='list_cattle'),
+    path('cattle/search/', search_cattle_view, name='search_cattle'),
     path('cattle/pregnant/', list_pregnant_cattle, name='list_pregnant_cattle'),
     path('cattle/gestation-data/', list_gestation_data, name='list_gestation_data'),
     path('cattle/<int:pk>/', get_cattle_by_id, name='get_cattle_by_id'),
     path('cattle/create/', create_cattle, name='create_cattle'),
+    path('cattle/bulk-update/', bulk_update_cattle, name='bulk_update_cattle'),
     path('cattle/<int:pk>/update/', update_cattle, name='update_cattle'),
     path('cattle/<int:pk>/delete/', delete_cattle, name='delete_cattle'),
     path('cattle/<int:cattle_id>/alerts/', generate_cattle_alerts, name='generate_cattle_alerts'),
@@ -42,6 +46,11 @@ urlpatterns = [
     path('birth-records/<int:pk>/delete/', delete_birth_record, name='delete_birth_record'),
     path('cattle/<int:cattle_id>/birth-history/', get_cattle_birth_history, name='get_cattle_birth_history'),
 
+    # Pedigree URLs
+    path('cattle/<int:cattle_id>/ancestors/', get_cattle_ancestors, name='get_cattle_ancestors'),
+    path('cattle/<int:cattle_id>/descendants/', get_cattle_descendants, name='get_cattle_descendants'),
+    path('pedigree/inbreeding/', get_mating_inbreeding, name='get_mating_inbreeding'),
+
     # TreatmentRecord URLs
     path('treatments/', get_all_treatment_records, name='get_all_treatment_records'),
     path('treatments/create/', create_treatment_record, name='create_treatment_record'),
@@ -73,6 +82,8 @@ urlpatterns = [
     # Alert URLs
     path('alerts/', list_alerts, name='list_alerts'),
     path('alerts/unread/', get_unread_alerts, name='get_unread_alerts'),
+    path('alerts/unread-count/', get_unread_alert_count, name='get_unread_alert_count'),
+    path('alerts/archive/', list_archived_alerts, name='list_archived_alerts'),
     path('alerts/<int:alert_id>/mark-read/', mark_alert_as_read, name='mark_alert_as_read'),
     path('alerts/mark-all-read/', mark_all_alerts_as_read, name='mark_all_alerts_as_read'),
     path('alerts/<int:alert_id>/', delete_alert, name='delete_alert'),
@@ -80,6 +91,13 @@ urlpatterns = [
     # Farm URLs
     path('farms/', get_farms, name='get_farms'),
     path('farms/create/', create_farm, name='create_farm'),
+    path('herd-summary/', get_herd_summary, name='get_herd_summary'),
+    path('analytics/reproduction/', get_reproduction_analytics, name='get_reproduction_analytics'),
+    path('calendar/', get_farm_calendar, name='get_farm_calendar'),
+    path('calendar.ics', farm_calendar_ics, name='farm_calendar_ics'),
+
+    # Bulk import URLs
+    path('import/<str:kind>/', import_records, name='import_records'),
 
     # Gestation Management URLs
     path('cattle/<int:cattle_id>/gestation-timeline/', get_cattle_gestation_timeline, name='get_cattle_gestation_timeline'),
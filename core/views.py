@@ -1,29 +1,106 @@
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.settings import api_settings
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.shortcuts import get_object_or_404
-from .models import Cattle, Insemination, BirthRecord, Alert, Farm, TreatmentRecord, VaccinationRecord, PeriodicVaccinationRecord, PeriodicTreatmentRecord, GestationMilestone, GestationCheck
+from .models import Cattle, Insemination, BirthRecord, Alert, AlertArchive, Farm, TreatmentRecord, VaccinationRecord, PeriodicVaccinationRecord, PeriodicTreatmentRecord, GestationMilestone, GestationCheck, HerdSummary, OutboundEmail
 from .serializers import (
-    CattleSerializer, InseminationSerializer, BirthRecordSerializer, AlertSerializer,
+    CattleSerializer, CattleBulkUpdateSerializer, InseminationSerializer, BirthRecordSerializer, AlertSerializer,
+    AlertArchiveSerializer,
     FarmSerializer, TreatmentRecordSerializer, VaccinationRecordSerializer,
     PeriodicVaccinationRecordSerializer, PeriodicTreatmentRecordSerializer,
-    GestationDataSerializer, GestationCheckSerializer, GestationMilestoneSerializer
+    GestationCheckSerializer, GestationMilestoneSerializer
 )
+from .pagination import STREAM_CONTENT_TYPES, keyset_page, parse_page_size, stream_serialized
+from .importers import DEFAULT_CHUNK_SIZE, IMPORTERS, run_import
+from .conditional import conditional_collection
+from .pedigree import MAX_GENERATIONS, Pedigree
+from .search import search_cattle
+from .analytics import MAX_RANGE_DAYS as MAX_ANALYTICS_RANGE_DAYS, reproduction_kpis
+from .alerts import ALERT_RULES, sweep_alerts
+from .notifications import render_alert_email
+from .farm_calendar import EVENT_SOURCES, ICAL_FUTURE_DAYS, ICAL_PAST_DAYS, farm_events, ical_events, parse_range
+from .authentication import QueryTokenAuthentication
+from .gestation import bump_version as bump_gestation_version, gestation_dashboard
 from django.db.models import Q
-from django.core.mail import send_mail
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_collection('cattle')
 def list_cattle(request):
+    """
+    List cattle for the user's farm.
+    Supports:
+    - cursor / page_size (query params): keyset pagination on (created_at, id)
+    - stream=ndjson|json (query param): stream every row as it is fetched
+    Without either parameter the whole herd is returned, as before.
+    """
     cattle = Cattle.objects.filter(farm=request.user.farm)
+
+    stream_format = request.query_params.get('stream')
+    if stream_format:
+        if stream_format not in STREAM_CONTENT_TYPES:
+            return Response(
+                {'error': f"stream must be one of: {', '.join(STREAM_CONTENT_TYPES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = CattleSerializer(context={'request': request})
+        return stream_serialized(cattle.order_by('-created_at', '-id'), serializer, stream_format)
+
+    if 'cursor' in request.query_params or 'page_size' in request.query_params:
+        try:
+            page, next_cursor = keyset_page(
+                cattle,
+                cursor=request.query_params.get('cursor'),
+                page_size=parse_page_size(request.query_params.get('page_size'))
+            )
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = CattleSerializer(page, many=True, context={'request': request})
+        return Response({"next_cursor": next_cursor, "results": serializer.data})
+
     serializer = CattleSerializer(cattle, many=True, context={'request': request})
-    return Response({"count": cattle.count(), "results": serializer.data})
+    return Response({"count": len(serializer.data), "results": serializer.data})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_cattle_view(request):
+    """
+    Search the farm's cattle by ear tag, breed, dam or sire.
+    Query params: q (required), page (default 1), page_size (default 50).
+    Prefix matches rank first, then fuzzy (trigram) matches by similarity.
+    """
+    q = request.query_params.get('q', '').strip()
+    if not q:
+        return Response({'error': 'Search query q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        page = max(1, int(request.query_params.get('page', 1)))
+    except ValueError:
+        return Response({'error': 'page must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    page_size = parse_page_size(request.query_params.get('page_size'))
+
+    # One extra row tells whether there is a next page
+    matches = search_cattle(request.user.farm, q, offset=(page - 1) * page_size, limit=page_size + 1)
+    has_next = len(matches) > page_size
+    matches = matches[:page_size]
+
+    results = CattleSerializer(matches, many=True, context={'request': request}).data
+    for data, animal in zip(results, matches):
+        data['rank'] = animal.rank
+        data['score'] = round(animal.score, 3)
+    return Response({
+        'query': q,
+        'page': page,
+        'next_page': page + 1 if has_next else None,
+        'results': results
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -60,41 +137,13 @@ def list_gestation_data(request):
     """
     Get comprehensive gestation data for all pregnant cattle in the farm.
     Includes gestation progress, milestones, health checks, and Gantt chart data.
+    The payload is cached per farm and day until one of those records changes,
+    only when the cache is Redis; with the local-memory fallback it is rebuilt
+    on every request (see core.gestation).
     """
     try:
-        # Get all pregnant/calving cattle
-        cattle = Cattle.objects.filter(
-            farm=request.user.farm,
-            gestation_status__in=['pregnant', 'calving']
-        ).prefetch_related(
-            'gestation_milestones',
-            'gestation_checks',
-            'treatment_records',
-            'vaccination_records',
-            'periodic_treatment_records',
-            'periodic_vaccination_records',
-            'alerts'
-        ).order_by('expected_calving_date')
-
-        # Prepare data for each cattle
-        gestation_data = []
-        for cow in cattle:
-            data = {
-                'cattle': cow,
-                'treatment_records': cow.treatment_records.all(),
-                'vaccination_records': cow.vaccination_records.all(),
-                'periodic_treatment_records': cow.periodic_treatment_records.all(),
-                'periodic_vaccination_records': cow.periodic_vaccination_records.all(),
-                'alerts': cow.alerts.filter(read=False)
-            }
-            gestation_data.append(data)
-
-        # Serialize the data with request context
-        serializer = GestationDataSerializer(gestation_data, many=True, context={'request': request})
-        return Response({
-            "count": len(gestation_data),
-            "results": serializer.data
-        })
+        # Served from the farm's cached dashboard snapshot
+        return Response(gestation_dashboard(request.user.farm, request))
     except Exception as e:
         print(f"Error in list_gestation_data: {str(e)}")
         return Response(
@@ -166,6 +215,73 @@ def update_cattle(request, pk):
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+BULK_UPDATE_LIMIT = 500
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def bulk_update_cattle(request):
+    """
+    Update many cattle in one request.
+    Body: a list (or {"updates": [...]}) of {"id": <cattle id>, "fields": {...}}.
+    Nothing is saved unless every update is valid.
+    """
+    items = request.data if isinstance(request.data, list) else request.data.get('updates')
+    if not isinstance(items, list) or not items:
+        return Response(
+            {'error': 'Provide a non-empty list of {"id", "fields"} updates'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > BULK_UPDATE_LIMIT:
+        return Response(
+            {'error': f'At most {BULK_UPDATE_LIMIT} cattle can be updated per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    ids = []
+    for item in items:
+        try:
+            ids.append(int(item['id']))
+        except (KeyError, TypeError, ValueError):
+            ids.append(None)
+    cattle_by_id = Cattle.objects.filter(farm=request.user.farm).in_bulk([pk for pk in ids if pk is not None])
+
+    changes, errors, seen = [], [], set()
+    for index, (pk, item) in enumerate(zip(ids, items)):
+        fields = item.get('fields') if isinstance(item, dict) else None
+        if pk is None or not isinstance(fields, dict):
+            errors.append({'index': index, 'errors': 'Each update needs an id and a fields object'})
+            continue
+        cattle = cattle_by_id.get(pk)
+        if cattle is None:
+            errors.append({'index': index, 'id': pk, 'errors': 'Cattle not found or not in your farm'})
+            continue
+        if pk in seen:
+            errors.append({'index': index, 'id': pk, 'errors': 'Cattle listed more than once'})
+            continue
+        seen.add(pk)
+
+        serializer = CattleBulkUpdateSerializer(cattle, data=fields, partial=True)
+        unknown = set(fields) - set(serializer.fields)
+        if unknown:
+            errors.append({'index': index, 'id': pk, 'errors': f"Fields cannot be bulk updated: {', '.join(sorted(unknown))}"})
+        elif serializer.is_valid():
+            changes.append((cattle, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'id': pk, 'errors': serializer.errors})
+
+    if errors:
+        return Response(
+            {'error': 'Invalid data provided', 'details': errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    updated = Cattle.bulk_apply_changes(changes)
+    bump_gestation_version(request.user.farm.id)
+    return Response({
+        'updated': len(updated),
+        'results': CattleSerializer(updated, many=True, context={'request': request}).data
+    })
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_cattle(request, pk):
@@ -183,15 +299,8 @@ def generate_cattle_alerts(request, cattle_id):
         cattle = Cattle.objects.get(pk=cattle_id, farm=request.user.farm)
     except Cattle.DoesNotExist:
         return Response({'error': 'Cattle not found'}, status=status.HTTP_404_NOT_FOUND)
-    alerts = cattle.generate_alerts()
-    for alert in alerts:
-        Alert.objects.create(
-            cattle=cattle,
-            message=alert['message'],
-            due_date=alert['due_date'],
-            priority=alert['priority']
-        )
-    serializer = AlertSerializer(Alert.objects.filter(cattle=cattle, is_read=False), many=True)
+    sweep_alerts(request.user.farm, herd=Cattle.objects.filter(pk=cattle.pk))
+    serializer = AlertSerializer(Alert.objects.filter(cattle=cattle, read=False), many=True)
     return Response({'alerts': serializer.data})
 
 # TreatmentRecord Views
@@ -207,11 +316,14 @@ def create_treatment_record(request):
     serializer = TreatmentRecordSerializer(data=data)
     if serializer.is_valid():
         treatment = serializer.save()
-        Alert.objects.create(
-            cattle=cattle,
-            message=f"Treatment '{treatment.treatment_name}' administered to {cattle.ear_tag_no} on {treatment.treatment_date}.",
-            due_date=timezone.now().date(),
-            priority='Low'
+        Alert.raise_alert(
+            cattle, 'treatment_administered',
+            title=f"Treatment '{treatment.treatment_name}' administered",
+            description=f"Treatment '{treatment.treatment_name}' administered to {cattle.ear_tag_no} on {treatment.treatment_date}.",
+            due_date=treatment.treatment_date,
+            priority='low',
+            alert_type='health',
+            source=treatment
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -268,11 +380,14 @@ def create_vaccination_record(request):
     serializer = VaccinationRecordSerializer(data=data)
     if serializer.is_valid():
         vaccination = serializer.save()
-        Alert.objects.create(
-            cattle=cattle,
-            message=f"Vaccination '{vaccination.vaccination_name}' administered to {cattle.ear_tag_no} on {vaccination.vaccination_date}.",
-            due_date=timezone.now().date(),
-            priority='Low'
+        Alert.raise_alert(
+            cattle, 'vaccination_administered',
+            title=f"Vaccination '{vaccination.vaccination_name}' administered",
+            description=f"Vaccination '{vaccination.vaccination_name}' administered to {cattle.ear_tag_no} on {vaccination.vaccination_date}.",
+            due_date=vaccination.vaccination_date,
+            priority='low',
+            alert_type='health',
+            source=vaccination
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -337,22 +452,11 @@ def create_periodic_vaccination_record(request):
     if serializer.is_valid():
         record = serializer.save()
         if record.is_due_for_vaccination():
-            if record.is_farm_wide:
-                # Create alerts for all cattle in the farm
-                for cattle in Cattle.objects.filter(farm=request.user.farm):
-                    Alert.objects.create(
-                        cattle=cattle,
-                        message=f"Farm-wide periodic vaccination '{record.vaccination_name}' due on {record.next_vaccination_date}.",
-                        due_date=record.next_vaccination_date,
-                        priority='High'
-                    )
-            else:
-                Alert.objects.create(
-                    cattle=cattle,
-                    message=f"Periodic vaccination '{record.vaccination_name}' due for {cattle.ear_tag_no} on {record.next_vaccination_date}.",
-                    due_date=record.next_vaccination_date,
-                    priority='High'
-                )
+            herd = Cattle.objects.filter(farm=request.user.farm) if record.is_farm_wide else Cattle.objects.filter(pk=cattle.pk)
+            # Same rule and keys as the alert sweep, so the sweep won't raise these again
+            Alert.upsert(list(ALERT_RULES['periodic_vaccination'](
+                request.user.farm, herd, timezone.now().date(), records=[record]
+            )))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -427,22 +531,11 @@ def create_periodic_treatment_record(request):
     if serializer.is_valid():
         record = serializer.save()
         if record.is_due_for_treatment():
-            if record.is_farm_wide:
-                # Create alerts for all cattle in the farm
-                for cattle in Cattle.objects.filter(farm=request.user.farm):
-                    Alert.objects.create(
-                        cattle=cattle,
-                        message=f"Farm-wide periodic treatment '{record.treatment_name}' due on {record.next_treatment_date}.",
-                        due_date=record.next_treatment_date,
-                        priority='High'
-                    )
-            else:
-                Alert.objects.create(
-                    cattle=cattle,
-                    message=f"Periodic treatment '{record.treatment_name}' due for {cattle.ear_tag_no} on {record.next_treatment_date}.",
-                    due_date=record.next_treatment_date,
-                    priority='High'
-                )
+            herd = Cattle.objects.filter(farm=request.user.farm) if record.is_farm_wide else Cattle.objects.filter(pk=cattle.pk)
+            # Same rule and keys as the alert sweep, so the sweep won't raise these again
+            Alert.upsert(list(ALERT_RULES['periodic_treatment'](
+                request.user.farm, herd, timezone.now().date(), records=[record]
+            )))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -499,6 +592,7 @@ def delete_periodic_treatment_record(request, pk):
 # Insemination Views
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_collection('inseminations', 'cattle')
 def list_inseminations(request):
     inseminations = Insemination.objects.filter(cattle__farm=request.user.farm)
     serializer = InseminationSerializer(inseminations, many=True)
@@ -561,12 +655,12 @@ def create_insemination(request):
             
             # Create calving preparation alert if pregnancy is confirmed
             if insemination.pregnancy_check_status == 'confirmed':
-                Alert.objects.create(
-                    cattle=cattle,
-                    message=f"Prepare for calving - Expected date: {insemination.expected_calving_date}",
+                Alert.raise_alert(
+                    cattle, 'calving_preparation',
+                    title=f"Prepare for calving - Expected date: {insemination.expected_calving_date}",
+                    description=f"Calving preparation required for cattle {cattle.ear_tag_no}",
                     due_date=insemination.expected_calving_date - timedelta(days=14),
-                    priority='High',
-                    alert_type='general'
+                    priority='high'
                 )
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -584,51 +678,19 @@ def create_insemination(request):
         )
 
 def send_alert_email(user, subject, message, priority):
-    """Utility function to send alert emails"""
-    html_message = f"""
-    <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #2563eb;">Loonko Alert: {subject}</h2>
-                <div style="margin: 20px 0; padding: 15px; border-radius: 5px; background-color: {
-                    '#fee2e2' if priority == 'High' else '#fef3c7' if priority == 'Medium' else '#f3f4f6'
-                };">
-                    <p style="margin: 0; color: {
-                        '#dc2626' if priority == 'High' else '#d97706' if priority == 'Medium' else '#374151'
-                    };">
-                        Priority: {priority}
-                    </p>
-                    <p>{message}</p>
-                </div>
-                <hr style="border: none; border-top: 1px solid #e5e7eb; margin: 20px 0;">
-                <p style="color: #6b7280; font-size: 0.875rem;">This is an automated message from Loonko Farm Management System.</p>
-            </div>
-        </body>
-    </html>
-    """
-    
-    # Plain text version
-    plain_message = f"""
-    Loonko Alert: {subject}
-    Priority: {priority}
-
-    {message}
+    """Utility function to queue alert emails in the outbox"""
+    plain_message, html_message = render_alert_email(subject, message, priority)
 
-    This is an automated message from Loonko Farm Management System.
-    """
-    
     try:
-        result = send_mail(
+        OutboundEmail.queue(
             subject=f"Loonko Alert: {subject}",
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False
+            body=plain_message,
+            to=[user.email],
+            html_body=html_message,
         )
-        return result > 0  # Return True if email was sent successfully
+        return True  # Queued; the outbox worker delivers it
     except Exception as e:
-        print(f"Failed to send email alert: {str(e)}")
+        print(f"Failed to queue email alert: {str(e)}")
         return False
 
 @api_view(['PUT'])
@@ -822,6 +884,7 @@ def delete_insemination(request, pk):
 # BirthRecord Views
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_collection('birth_records', 'cattle')
 def list_birth_records(request):
     """List all birth records for the farm"""
     birth_records = BirthRecord.objects.filter(cattle__farm=request.user.farm)
@@ -861,7 +924,7 @@ def create_birth_record(request):
             # If a calf was registered successfully, include its alerts too
             if birth_record.calving_outcome == 'successful':
                 calf_alerts = Alert.objects.filter(
-                    cattle__ear_tag_no=birth_record.calf_ear_tag,
+                    cattle__birth_link__birth_record=birth_record,
                     created_at__gte=birth_record.created_at
                 )
                 alerts = alerts | calf_alerts
@@ -871,10 +934,9 @@ def create_birth_record(request):
                 'alerts': AlertSerializer(alerts, many=True).data
             }
             return Response(response_data, status=status.HTTP_201_CREATED)
-            # return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        
-            # except Cattle.DoesNotExist:
-            #     return Response({'error': 'Cattle not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    except Cattle.DoesNotExist:
+        return Response({'error': 'Cattle not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response(
             {'error': f'Failed to create birth record: {str(e)}'},
@@ -897,13 +959,7 @@ def update_birth_record(request, pk):
         # If complications were added, create a new alert
         if (request.data.get('complications') or 
             request.data.get('calving_outcome') in ['complications', 'stillborn', 'died_shortly_after']):
-            Alert.objects.create(
-                cattle=updated_record.cattle,
-                message=f"New complications reported for calving on {updated_record.calving_date}",
-                due_date=timezone.now().date(),
-                priority='High',
-                alert_type='general'
-            )
+            Alert.upsert([updated_record.complications_alert()])
         
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -918,18 +974,13 @@ def delete_birth_record(request, pk):
         return Response({'error': 'Birth record not found'}, status=status.HTTP_404_NOT_FOUND)
     
     # Store calf information before deletion
-    calf_ear_tags = birth_record.calf_ear_tag.split(',')
+    calf_ids = list(birth_record.calves.values_list('calf_id', flat=True))
     
     # Delete the birth record
     birth_record.delete()
     
-    # Also delete the associated calf records if they exist
-    for ear_tag in calf_ear_tags:
-        try:
-            calf = Cattle.objects.get(ear_tag_no=ear_tag.strip())
-            calf.delete()
-        except Cattle.DoesNotExist:
-            continue
+    # Also delete the associated calf records
+    Cattle.objects.filter(pk__in=calf_ids).delete()
     
     return Response(
         {'message': 'Birth record and associated calf records deleted successfully'},
@@ -946,12 +997,12 @@ def get_cattle_birth_history(request, cattle_id):
         # Get records where this cattle is the mother
         as_mother = BirthRecord.objects.filter(cattle=cattle)
         
-        # Get this cattle's own birth record (if it exists)
-        try:
-            own_birth = BirthRecord.objects.get(calf_ear_tag__contains=cattle.ear_tag_no)
-            own_birth_data = BirthRecordSerializer(own_birth).data
-        except BirthRecord.DoesNotExist:
-            own_birth_data = None
+        # Get this cattle's own birth record (if it exists) and its siblings from that birth
+        own_birth = BirthRecord.objects.filter(calves__calf=cattle).select_related('cattle').first()
+        own_birth_data = BirthRecordSerializer(own_birth).data if own_birth else None
+        siblings = Cattle.objects.filter(
+            birth_link__birth_record=own_birth
+        ).exclude(pk=cattle.pk).values('id', 'ear_tag_no', 'gender') if own_birth else []
         
         response_data = {
             'cattle_info': {
@@ -960,50 +1011,139 @@ def get_cattle_birth_history(request, cattle_id):
                 'gender': cattle.gender,
             },
             'as_mother': BirthRecordSerializer(as_mother, many=True).data,
-            'own_birth_record': own_birth_data
+            'own_birth_record': own_birth_data,
+            'mother': {'id': own_birth.cattle.id, 'ear_tag_no': own_birth.cattle.ear_tag_no} if own_birth else None,
+            'siblings': list(siblings)
         }
         return Response(response_data)
     
     except Cattle.DoesNotExist:
         return Response({'error': 'Cattle not found'}, status=status.HTTP_404_NOT_FOUND)
 
+def parse_generations(value, default=3):
+    """Clamp the requested number of generations to 1..MAX_GENERATIONS."""
+    try:
+        generations = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(generations, MAX_GENERATIONS))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_cattle_ancestors(request, cattle_id):
+    """Ancestors of a cattle up to ?generations=N back (default 3), from the farm pedigree"""
+    try:
+        cattle = Cattle.objects.get(pk=cattle_id, farm=request.user.farm)
+    except Cattle.DoesNotExist:
+        return Response({'error': 'Cattle not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    generations = parse_generations(request.query_params.get('generations'))
+    pedigree = Pedigree.for_farm(request.user.farm)
+    return Response({
+        'ear_tag_no': cattle.ear_tag_no,
+        'generations': generations,
+        'inbreeding_coefficient': pedigree.inbreeding(cattle.ear_tag_no),
+        'ancestors': pedigree.ancestors(cattle.ear_tag_no, generations)
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_cattle_descendants(request, cattle_id):
+    """Descendants of a cattle up to ?generations=N forward (default 3), from the farm pedigree"""
+    try:
+        cattle = Cattle.objects.get(pk=cattle_id, farm=request.user.farm)
+    except Cattle.DoesNotExist:
+        return Response({'error': 'Cattle not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    generations = parse_generations(request.query_params.get('generations'))
+    pedigree = Pedigree.for_farm(request.user.farm)
+    return Response({
+        'ear_tag_no': cattle.ear_tag_no,
+        'generations': generations,
+        'descendants': pedigree.descendants(cattle.ear_tag_no, generations)
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_mating_inbreeding(request):
+    """
+    Wright inbreeding coefficient of a calf from a proposed mating.
+    Query params: sire and dam ear tags (the sire may be an AI bull outside the herd).
+    """
+    sire = request.query_params.get('sire', '').strip()
+    dam = request.query_params.get('dam', '').strip()
+    if not sire or not dam:
+        return Response({'error': 'Both sire and dam ear tags are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    pedigree = Pedigree.for_farm(request.user.farm)
+    if dam not in pedigree.animals:
+        return Response({'error': 'Dam not found in your farm'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'sire': sire,
+        'dam': dam,
+        'sire_known': sire in pedigree,
+        'inbreeding_coefficient': pedigree.mating_inbreeding(sire, dam),
+        'sire_inbreeding': pedigree.inbreeding(sire),
+        'dam_inbreeding': pedigree.inbreeding(dam),
+        'common_ancestors': pedigree.common_ancestors(sire, dam)
+    })
+
 # Alert Views
+def alert_list_queryset(farm, params):
+    """Alerts of the farm filtered by the type, read and priority query params."""
+    alerts = Alert.objects.filter(farm=farm)
+
+    # Apply filters if provided
+    alert_type = params.get('type')
+    if alert_type:
+        alerts = alerts.filter(type=alert_type)
+
+    read_status = params.get('read')
+    if read_status is not None:
+        is_read = read_status.lower() == 'true'
+        alerts = alerts.filter(read=is_read)
+
+    priority = params.get('priority')
+    if priority:
+        alerts = alerts.filter(priority=priority.lower())
+    return alerts
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_collection('alerts')
 def list_alerts(request):
     """
-    Get all alerts for the user's farm.
+    Get all alerts for the user's farm, high priority first, then newest.
     Supports filtering by:
     - type (query param)
     - read status (query param)
     - priority (query param)
+    and page / page_size (query params) to fetch one page at a time.
     """
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        alerts = Alert.objects.filter(cattle__farm=request.user.farm)
-
-        # Apply filters if provided
-        alert_type = request.query_params.get('type')
-        if alert_type:
-            alerts = alerts.filter(type=alert_type)
-
-        read_status = request.query_params.get('read')
-        if read_status is not None:
-            is_read = read_status.lower() == 'true'
-            alerts = alerts.filter(read=is_read)
-
-        priority = request.query_params.get('priority')
-        if priority:
-            alerts = alerts.filter(priority=priority)
-
-        # Order by priority (High to Low) and then by date (newest first)
-        priority_order = {'high': 0, 'medium': 1, 'low': 2}
-        alerts = sorted(alerts, key=lambda x: (priority_order.get(x.priority.lower(), 3), -x.created_at.timestamp()))
+        alerts = alert_list_queryset(request.user.farm, request.query_params)
+        counts = Alert.priority_counts(alerts)
+        count = sum(counts.values())
+        response = {"count": count}
+        offset, limit = 0, None
+        if 'page' in request.query_params or 'page_size' in request.query_params:
+            try:
+                page = max(1, int(request.query_params.get('page', 1)))
+            except ValueError:
+                return Response({'error': 'page must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            limit = parse_page_size(request.query_params.get('page_size'))
+            offset = (page - 1) * limit
+            response.update({
+                "page": page,
+                "next_page": page + 1 if offset + limit < count else None,
+            })
 
-        serializer = AlertSerializer(alerts, many=True)
-        return Response({
-            "count": len(alerts),
-            "results": serializer.data
-        })
+        alerts = [alert for segment in Alert.priority_segments(alerts, counts, offset, limit) for alert in segment]
+        response["results"] = AlertSerializer(alerts, many=True).data
+        return Response(response)
     except Exception as e:
         print(f"Error in list_alerts: {str(e)}")  # Add debug logging
         return Response(
@@ -1017,8 +1157,8 @@ def get_unread_alerts(request):
     """Get all unread alerts for the user's farm."""
     try:
         alerts = Alert.objects.filter(
-            cattle__farm=request.user.farm,
-            is_read=False
+            farm=request.user.farm,
+            read=False
         ).order_by('-created_at')
         
         serializer = AlertSerializer(alerts, many=True)
@@ -1032,14 +1172,55 @@ def get_unread_alerts(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_archived_alerts(request):
+    """
+    Alerts moved out of the live table by the retention job, newest first.
+    Query params: from / to (YYYY-MM-DD, on the alert's creation date),
+    cursor and page_size (keyset pagination, default 50 per page).
+    """
+    alerts = AlertArchive.objects.filter(farm=request.user.farm)
+    try:
+        if request.query_params.get('from'):
+            alerts = alerts.filter(created_at__date__gte=datetime.strptime(request.query_params['from'], "%Y-%m-%d").date())
+        if request.query_params.get('to'):
+            alerts = alerts.filter(created_at__date__lte=datetime.strptime(request.query_params['to'], "%Y-%m-%d").date())
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page, next_cursor = keyset_page(
+            alerts,
+            cursor=request.query_params.get('cursor'),
+            page_size=parse_page_size(request.query_params.get('page_size'))
+        )
+    except ValueError:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'next_cursor': next_cursor,
+        'results': AlertArchiveSerializer(page, many=True).data
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_unread_alert_count(request):
+    """Number of unread alerts for the user's farm, served from a cached counter."""
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'count': Alert.unread_count(request.user.farm.id)})
+
 @api_view(['PATCH'])
 @permission_classes([IsAuthenticated])
 def mark_alert_as_read(request, alert_id):
     """Mark a specific alert as read."""
     try:
-        alert = get_object_or_404(Alert, id=alert_id, cattle__farm=request.user.farm)
+        alert = get_object_or_404(Alert, id=alert_id, farm=request.user.farm)
+        was_unread = not alert.read
         alert.read = True
         alert.save()
+        if was_unread:
+            Alert.adjust_unread_count(alert.farm_id, -1)
         serializer = AlertSerializer(alert)
         return Response(serializer.data)
     except Exception as e:
@@ -1054,7 +1235,9 @@ def mark_alert_as_read(request, alert_id):
 def mark_all_alerts_as_read(request):
     """Mark all alerts for the user's farm as read."""
     try:
-        Alert.objects.filter(cattle__farm=request.user.farm).update(read=True)
+        marked = Alert.objects.filter(farm=request.user.farm, read=False).update(read=True, updated_at=timezone.now())
+        Alert.adjust_unread_count(request.user.farm.id, -marked)
+        bump_gestation_version(request.user.farm.id)
         return Response({"message": "All alerts marked as read"})
     except Exception as e:
         print(f"Error in mark_all_alerts_as_read: {str(e)}")  # Add debug logging
@@ -1068,7 +1251,7 @@ def mark_all_alerts_as_read(request):
 def delete_alert(request, alert_id):
     """Delete a specific alert."""
     try:
-        alert = get_object_or_404(Alert, id=alert_id, cattle__farm=request.user.farm)
+        alert = get_object_or_404(Alert, id=alert_id, farm=request.user.farm)
         alert.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     except Exception as e:
@@ -1085,6 +1268,128 @@ def get_farms(request):
     serializer = FarmSerializer(farms, many=True)
     return Response(serializer.data)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_herd_summary(request):
+    """
+    Herd composition counts for the user's farm (by life stage, gestation
+    status, health status and gender), read from the HerdSummary table.
+    """
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
+    summary = HerdSummary.for_farm(request.user.farm)
+    return Response(summary.to_dict())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_reproduction_analytics(request):
+    """
+    Reproductive KPIs for the user's farm: days open, calving to first
+    service, services per conception, conception rate by insemination method,
+    heat detection rate and 21-day pregnancy rate.
+    Query params: from / to (YYYY-MM-DD, default the last 365 days) and breed.
+    """
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        date_to = request.query_params.get('to')
+        date_to = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else timezone.now().date()
+        date_from = request.query_params.get('from')
+        date_from = datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else date_to - timedelta(days=365)
+    except ValueError:
+        return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    if date_from > date_to:
+        return Response({'error': "'from' must not be after 'to'"}, status=status.HTTP_400_BAD_REQUEST)
+    if (date_to - date_from).days > MAX_ANALYTICS_RANGE_DAYS:
+        return Response(
+            {'error': f'The range may span at most {MAX_ANALYTICS_RANGE_DAYS} days'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    breed = request.query_params.get('breed', '').strip() or None
+    return Response(reproduction_kpis(request.user.farm, date_from, date_to, breed))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_farm_calendar(request):
+    """
+    Upcoming farm events (gestation milestones and checks, expected calving
+    and insemination, periodic vaccinations and treatments) in date order.
+    Query params: from / to (YYYY-MM-DD, default the next 30 days) and an
+    optional comma-separated list of event types.
+    """
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        date_from, date_to = parse_range(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    types = [t for t in request.query_params.get('types', '').split(',') if t]
+    unknown = set(types) - set(EVENT_SOURCES)
+    if unknown:
+        return Response(
+            {'error': f"Unknown event types: {', '.join(sorted(unknown))}. Use any of: {', '.join(EVENT_SOURCES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    events = list(farm_events(request.user.farm, date_from, date_to, types))
+    return Response({'from': date_from, 'to': date_to, 'count': len(events), 'results': events})
+
+@api_view(['GET'])
+@authentication_classes([QueryTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+@permission_classes([IsAuthenticated])
+def farm_calendar_ics(request):
+    """
+    The farm calendar as a streamed iCalendar feed for phone calendar apps.
+    Subscribe with ?token=<API token>; from / to default to 30 days back
+    through the next year.
+    """
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        date_from, date_to = parse_range(request.query_params, ICAL_PAST_DAYS, ICAL_FUTURE_DAYS)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    farm = request.user.farm
+    response = StreamingHttpResponse(
+        ical_events(farm, farm_events(farm, date_from, date_to)), content_type='text/calendar; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'inline; filename="farm-calendar.ics"'
+    return response
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_records(request, kind):
+    """
+    Bulk import cattle, milk, income or expense records from an uploaded
+    CSV/XLSX file (multipart field ``file``). Rows are validated and saved in
+    chunks; the response lists every rejected row with its errors.
+    Pass ``dry_run=true`` to validate without saving.
+    """
+    if kind not in IMPORTERS:
+        return Response(
+            {'error': f"Unknown import type, use one of: {', '.join(IMPORTERS)}"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    if not request.user.farm:
+        return Response({'error': 'User is not assigned to a farm'}, status=status.HTTP_400_BAD_REQUEST)
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    try:
+        report = run_import(
+            kind, upload.file, upload.name, request.user.farm, request.user,
+            chunk_size=DEFAULT_CHUNK_SIZE, dry_run=dry_run
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    report['dry_run'] = dry_run
+    return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_farm(request):
@@ -1183,11 +1488,14 @@ def create_gestation_check(request):
             
             # Create alert if health status needs attention
             if check.health_status in ['attention', 'critical']:
-                Alert.objects.create(
-                    cattle=cattle,
-                    message=f"Health check on {check.check_date} requires attention: {check.notes}",
+                Alert.raise_alert(
+                    cattle, 'gestation_check_attention',
+                    title=f"Health check on {check.check_date} requires attention",
+                    description=f"Health check on {check.check_date} requires attention: {check.notes}",
                     priority='high' if check.health_status == 'critical' else 'medium',
-                    due_date=timezone.now().date() + timedelta(days=1)
+                    due_date=check.check_date + timedelta(days=1),
+                    alert_type='health',
+                    source=check
                 )
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
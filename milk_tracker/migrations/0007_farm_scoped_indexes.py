@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('milk_tracker', '0006_alter_milk_record_options_milk_record_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='milk_record',
+            index=models.Index(fields=['date', 'cattle_tag'], name='milk_record_date_cattle_idx'),
+        ),
+    ]
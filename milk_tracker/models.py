@@ -21,6 +21,10 @@ class Milk_record(models.Model):
     class Meta:
         ordering = ['-date', '-time']
         unique_together = ['cattle_tag', 'date', 'shift']
+        # (cattle_tag, date) lookups use the unique index above; farm totals for a day start from the date
+        indexes = [
+            models.Index(fields=['date', 'cattle_tag'], name='milk_record_date_cattle_idx'),
+        ]
 
     def clean(self):
         if not self.cattle_tag.can_record_milk():
@@ -38,7 +42,10 @@ class Milk_record(models.Model):
                 'shift': f'Milk record already exists for {self.shift} shift on {self.date}'
             })
 
-        # Validate shift against cattle's milking schedule
+        self.validate_milking_time()
+
+    def validate_milking_time(self):
+        """Reject a recording time more than 2 hours from the cattle's milking schedule"""
         schedule = self.cattle_tag.get_milking_schedule()
         current_time = self.time.strftime('%H:%M')
         
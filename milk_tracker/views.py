@@ -8,8 +8,8 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Sum, Q
-from core.models import Cattle
+from django.db.models import Count, Sum, Q
+from core.models import Cattle, HerdSummary
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -351,25 +351,18 @@ def get_today_production_stats(request):
             date=today
         )
         
-        # Calculate total production
-        total_production = today_records.aggregate(
-            total=Sum('quantity')
-        )['total'] or 0
+        # Calculate total production and record count in one query
+        totals = today_records.aggregate(
+            total=Sum('quantity'),
+            records=Count('id')
+        )
         
-        # Get active milking cattle count
-        active_cattle = Cattle.objects.filter(
-            farm=request.user.farm,
-            gender='female',
-            life_stage='cow'
-        ).exclude(
-            gestation_status='dry_off'
-        ).filter(
-            last_calving_date__isnull=False
-        ).count()
+        # Active milking cattle count comes from the maintained herd summary
+        active_cattle = HerdSummary.for_farm(request.user.farm).active_milking
         
         return Response({
-            'total_production': float(total_production),
-            'records_count': today_records.count(),
+            'total_production': float(totals['total'] or 0),
+            'records_count': totals['records'],
             'active_milking_cattle': active_cattle
         })
     except Exception as e:
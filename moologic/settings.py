@@ -76,6 +76,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'moologic.wsgi.application'
+ASGI_APPLICATION = 'moologic.asgi.application'
 
 # Database
 DATABASES = {
@@ -85,6 +86,44 @@ DATABASES = {
     }
 }
 
+# Cache: Redis when DJANGO_REDIS_URL is set (shared by all workers, e.g. the
+# unread alert counters), otherwise per-process memory for local development.
+# Redis is required for caching the gestation dashboard: with the per-process
+# cache it is rebuilt from the database on every request
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Channel layer for WebSocket alert pushes. The in-memory layer only reaches
+# sockets served by the same process, so use Redis whenever several workers
+# (or Celery) create alerts
+if os.environ.get('DJANGO_REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.environ['DJANGO_REDIS_URL']]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
+
+# Read alerts older than this many days move to the alert archive
+ALERT_RETENTION_DAYS = int(os.environ.get('ALERT_RETENTION_DAYS', '90'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
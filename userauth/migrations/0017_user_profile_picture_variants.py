@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauth', '0016_alter_user_email_verification_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userauth', '0017_user_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='alert_digest_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='email_digest_frequency',
+            field=models.CharField(choices=[('immediate', 'Immediate'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='hourly', max_length=10),
+        ),
+    ]
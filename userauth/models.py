@@ -34,6 +34,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     full_name = models.CharField(max_length=255, blank=True, default='')
     phone_number = models.CharField(max_length=15, blank=True, default='')
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)  # Resized copies, see core.images
     bio = models.TextField(blank=True, default='')
 
     # Email verification fields
@@ -69,6 +70,16 @@ class User(AbstractBaseUser, PermissionsMixin):
     get_push_notifications = models.BooleanField(default=False)
     get_sms_notifications = models.BooleanField(default=False)
 
+    # High priority alerts are always emailed at once; the rest wait for the digest
+    EMAIL_DIGEST_CHOICES = (
+        ('immediate', 'Immediate'),
+        ('hourly', 'Hourly digest'),
+        ('daily', 'Daily digest'),
+    )
+    email_digest_frequency = models.CharField(max_length=10, choices=EMAIL_DIGEST_CHOICES, default='hourly')
+    # Alerts created up to this time have been included in a digest
+    alert_digest_sent_at = models.DateTimeField(null=True, blank=True)
+
     oversite_access = models.BooleanField(default=False)
 
     is_active = models.BooleanField(default=True)
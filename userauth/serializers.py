@@ -1,19 +1,27 @@
 from rest_framework import serializers
+from core.images import variant_url
 from .models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
+    profile_picture_thumbnail = serializers.SerializerMethodField()
+
     class Meta:
         model = User
         fields = (
             'id', 'email', 'username', 'full_name', 'phone_number', 
-            'profile_picture', 'role', 'worker_role', 'farm', 'bio',
+            'profile_picture', 'profile_picture_thumbnail', 'role', 'worker_role', 'farm', 'bio',
             'get_email_notifications', 'get_push_notifications', 
-            'get_sms_notifications', 'oversite_access', 'language',
+            'get_sms_notifications', 'email_digest_frequency', 'oversite_access', 'language',
             'email_verified'
         )
         read_only_fields = ('id', 'date_joined', 'last_login', 'email_verified')
 
+    def get_profile_picture_thumbnail(self, obj):
+        return variant_url(
+            obj, 'profile_picture', 'profile_picture_variants', 'thumbnail', self.context.get('request')
+        )
+
     def create(self, validated_data):
         password = validated_data.pop('password', None)
         user = super().create(validated_data)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.images import schedule_image_variants
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='profile_picture_variants')
+def generate_profile_picture_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_image_variants(instance, 'profile_picture', 'profile_picture_variants')
@@ -6,12 +6,11 @@ from rest_framework.authtoken.models import Token
 from rest_framework import status
 from django.conf import settings
 
-from core.models import Farm
+from core.models import Farm, OutboundEmail
 from .models import User
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.utils.encoding import force_bytes
 from django.contrib.auth import update_session_auth_hash
 from django.utils import timezone
@@ -153,12 +152,10 @@ def request_password_reset(request):
     reset_url = f"{settings.FRONTEND_URL}/reset-password/{user.id}/{token}"
 
     try:
-        send_mail(
+        OutboundEmail.queue(
             'Reset your password',
             f'Click this link to reset your password: {reset_url}',
-            settings.DEFAULT_FROM_EMAIL,
             [email],
-            fail_silently=False,
         )
         return Response({
             'message': 'Password reset email sent'
@@ -465,13 +462,11 @@ def send_verification_email(request):
     """
     
     try:
-        send_mail(
+        OutboundEmail.queue(
             subject='Verify your MooLogic email address',
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
+            body=plain_message,
+            to=[user.email],
+            html_body=html_message,
         )
         return Response({
             'message': 'Verification email sent successfully'
@@ -589,6 +584,12 @@ def update_profile(request):
         user.get_push_notifications = data['get_push_notifications']
     if 'get_sms_notifications' in data:
         user.get_sms_notifications = data['get_sms_notifications']
+    if 'email_digest_frequency' in data:
+        if data['email_digest_frequency'] not in dict(User.EMAIL_DIGEST_CHOICES):
+            return Response({
+                'error': 'Invalid email digest frequency'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        user.email_digest_frequency = data['email_digest_frequency']
 
     # Update worker role if applicable
     if user.role == 'worker' and 'worker_role' in data: